@@ -15,6 +15,7 @@
         'views/sale_order_form_view.xml',
         'views/sale_order_views.xml',
         'views/car_booking_wizard_views.xml',
+        'views/car_booking_clone_wizard_views.xml',
         'views/account_move_view.xml',
         'data/car_extra_service_data.xml',
         'views/car_extra_service_view.xml',
@@ -22,8 +23,20 @@
         'views/fleet_vehicle.xml',
         'views/car_airport.xml',
         'views/car_booking_line_view.xml',
+        'views/car_booking_archive_views.xml',
+        'views/car_flight_status_views.xml',
+        'views/type_of_service_views.xml',
+        'data/type_of_service_data.xml',
+        'views/car_booking_rate_card_views.xml',
+        'views/car_booking_state_report_views.xml',
+        'views/invoice_mass_print_views.xml',
+        'views/telematics_views.xml',
+        'views/geo_location_views.xml',
+        'views/demand_forecast_views.xml',
+        'views/credit_control_views.xml',
         'data/sequence_data.xml',
         'data/paper_format.xml',
+        'data/ir_cron_data.xml',
         'reports/custom_quotation_template.xml',
         'reports/car_booking_quotation_template.xml',
         'reports/car_booking_invoice_template.xml',
@@ -36,6 +49,9 @@
             'aw_car_booking/static/src/font/Droid Arabic Naskh Regular/Droid Arabic Naskh Regular.ttf',
         ],
     },
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     'installable': True,
     'application': True,
     'license': 'LGPL-3',
@@ -1 +1,6 @@
-from . import car_booking_controller
+from . import dispatch_board
+from . import main
+from . import mass_print
+from . import quote
+from . import driver_sync
+from . import telematics
@@ -0,0 +1,22 @@
+from odoo import http
+from odoo.http import request
+
+
+class DispatchBoardController(http.Controller):
+
+    @http.route('/car_booking/dispatch_board', type='json', auth='user')
+    def dispatch_board(self, branch_id=None, day=None, since=None):
+        """Compact per-day, per-branch board; pass back 'token' as since for deltas"""
+        branch_id = int(branch_id) if branch_id else request.env.company.id
+        return request.env['car.booking.dispatch.board'].get_board(branch_id, day, since=since)
+
+    @http.route('/car_booking/timeline', type='json', auth='user')
+    def timeline(self, start, stop, resource='vehicle', branch_id=None):
+        """Lines intersecting [start, stop) grouped by vehicle or driver"""
+        return request.env['car.booking.line'].get_timeline(start, stop, resource=resource, branch_id=branch_id)
+
+    @http.route('/car_booking/timeline/reschedule', type='json', auth='user')
+    def timeline_reschedule(self, line_id, start, end, vehicle_id=None, driver_id=None):
+        """Drag-and-drop move; raises if the vehicle or driver is busy"""
+        line = request.env['car.booking.line'].browse(int(line_id))
+        return line.reschedule(start, end, vehicle_id=vehicle_id, driver_id=driver_id)
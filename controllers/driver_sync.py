@@ -0,0 +1,33 @@
+import gzip
+import json
+
+from odoo import http
+from odoo.http import request
+
+# Payloads smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
+
+
+class DriverSyncController(http.Controller):
+
+    def _json_response(self, payload):
+        """JSON body, gzipped when the phone accepts it"""
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        headers = [('Content-Type', 'application/json')]
+        if len(body) >= GZIP_MIN_SIZE and 'gzip' in request.httprequest.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            headers.append(('Content-Encoding', 'gzip'))
+        headers.append(('Vary', 'Accept-Encoding'))
+        return request.make_response(body, headers)
+
+    @http.route('/car_booking/driver/sync', type='http', auth='user', methods=['POST'], csrf=False)
+    def sync(self, **kwargs):
+        """Lines of the logged-in driver changed since {"token": ...}; pass back 'token' next time"""
+        data = request.get_json_data() if request.httprequest.data else {}
+        return self._json_response(request.env['car.booking.line'].get_driver_sync(token=data.get('token')))
+
+    @http.route('/car_booking/driver/status', type='http', auth='user', methods=['POST'], csrf=False)
+    def status(self, **kwargs):
+        """Batched status updates: {"updates": [{"line_id", "version", "status", ...}]}"""
+        data = request.get_json_data()
+        return self._json_response(request.env['car.booking.line'].apply_driver_updates(data.get('updates', [])))
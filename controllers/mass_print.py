@@ -0,0 +1,25 @@
+import os
+
+from odoo import http
+from odoo.http import request, Stream
+
+
+class InvoiceMassPrintController(http.Controller):
+
+    @http.route('/car_booking/mass_print/<int:job_id>', type='http', auth='user')
+    def download(self, job_id):
+        """Stream the finished file of a mass print job from disk"""
+        job = request.env['car.booking.invoice.print.job'].browse(job_id).exists()
+        if not job or job.state != 'done' or not job.output_path or not os.path.isfile(job.output_path):
+            raise request.not_found()
+        job.check_access('read')
+        extension = os.path.splitext(job.output_path)[1]
+        stream = Stream(
+            type='path',
+            path=job.output_path,
+            mimetype='application/zip' if extension == '.zip' else 'application/pdf',
+            download_name=f"car_booking_invoices_{job.id}{extension}",
+            size=os.path.getsize(job.output_path),
+            as_attachment=True,
+        )
+        return stream.get_response()
@@ -0,0 +1,86 @@
+from odoo import fields, http
+from odoo.http import request
+
+from odoo.addons.aw_car_booking.models import booking_kernel
+from odoo.addons.aw_car_booking.models.lru_cache import TTLCache
+
+# Worker-local memo of resolved rate cards and taxes for the quote endpoint.
+# Rate entries are keyed on the rate cards' cache generation, so an edited
+# card is priced right away; the TTL only bounds memory.
+_rate_cache = TTLCache(maxsize=4096, ttl=60)
+_tax_cache = TTLCache(maxsize=256, ttl=300)
+
+
+class CarBookingQuoteController(http.Controller):
+    """Stateless price quotes for sales agents, without creating a car.booking."""
+
+    @staticmethod
+    def _resolve_rate(env, service_type_id, company_id, date, key_values):
+        """(unit_price, extra_hour_charges) of the best rate card, memoized per worker"""
+        # The generation moves on every rate card change, in every worker
+        generation = env['car.booking.rate.card']._get_cache_generation()
+        cache_key = (env.cr.dbname, generation, service_type_id, company_id, date, key_values)
+        card = _rate_cache.get(cache_key, False)
+        if card is False:
+            card = env['car.booking.rate.card']._match_card(service_type_id, company_id, date, key_values)
+            card = (card[4], card[5] or 0.0) if card else None
+            _rate_cache.set(cache_key, card)
+        return card
+
+    @staticmethod
+    def _resolve_taxes(env, company, tax_ids):
+        """[(tax id, amount_type, amount)] of the requested or default sales taxes, memoized per worker"""
+        cache_key = (env.cr.dbname, company.id, tuple(sorted(tax_ids or ())))
+
+        def compute():
+            taxes = env['account.tax'].browse(tax_ids).exists() if tax_ids else company.account_sale_tax_id
+            return [(tax.id, tax.amount_type, tax.amount) for tax in taxes]
+        return _tax_cache.get_or_set(cache_key, compute)
+
+    @http.route('/car_booking/quote', type='json', auth='user')
+    def quote(self, service_type_id, start_date, end_date=None, car_model_id=None, city_id=None,
+              partner_id=None, business_type=None, full_day_type=None, qty=1, extra_hour=0,
+              unit_price=None, extra_hour_charges=None, tax_ids=None, **kwargs):
+        env = request.env
+        company = env.company
+        Line = env['car.booking.line']
+        start = fields.Datetime.to_datetime(start_date)
+        end = fields.Datetime.to_datetime(end_date) if end_date else start
+        city = env['booking.city'].browse(int(city_id)) if city_id else env['booking.city']
+
+        if unit_price is None:
+            key_values = (
+                int(partner_id) if partner_id else None,
+                int(car_model_id) if car_model_id else None,
+                None,
+                city.id or None,
+                city.region or None,
+                business_type or None,
+                full_day_type or None,
+            )
+            rate = self._resolve_rate(env, int(service_type_id), company.id, start.date(), key_values)
+            if rate is None:
+                return {'error': 'No rate card matches this quote.'}
+            unit_price = rate[0]
+            if extra_hour_charges is None:
+                extra_hour_charges = rate[1]
+
+        duration = Line._get_line_duration(start, end)
+        amount = Line._get_line_amount(qty, unit_price, duration, extra_hour, extra_hour_charges or 0.0)
+
+        taxes = self._resolve_taxes(env, company, tax_ids)
+        vat = booking_kernel.booking_line_vat(
+            amount, [tax_amount for _tax_id, amount_type, tax_amount in taxes if amount_type == 'percent'])
+        other_taxes = [tax_id for tax_id, amount_type, _tax_amount in taxes if amount_type != 'percent']
+        if other_taxes:
+            vat += env['car.booking']._get_vat_amount(amount, env['account.tax'].browse(other_taxes), company.currency_id)
+
+        return {
+            'unit_price': unit_price,
+            'extra_hour_charges': extra_hour_charges or 0.0,
+            'duration': duration,
+            'amount': amount,
+            'vat': vat,
+            'amount_total': amount + vat,
+            'currency': company.currency_id.name,
+        }
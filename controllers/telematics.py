@@ -0,0 +1,23 @@
+import gzip
+import io
+
+from odoo import http
+from odoo.http import request
+
+
+class TelematicsController(http.Controller):
+
+    @http.route('/car_booking/telematics/upload', type='http', auth='user', methods=['POST'], csrf=False)
+    def upload(self, file, **kwargs):
+        """Load an uploaded CSV or NDJSON (optionally gzipped) GPS log; read as a stream, never whole"""
+        stream = file.stream
+        if file.filename.endswith('.gz'):
+            stream = gzip.GzipFile(fileobj=stream)
+        text_stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        telematics_import = request.env['car.booking.telematics.import'].ingest_stream(text_stream, file.filename)
+        return request.make_json_response({
+            'id': telematics_import.id,
+            'points': telematics_import.point_count,
+            'skipped': telematics_import.skipped_count,
+            'lines': telematics_import.line_count,
+        })
@@ -1,5 +1,13 @@
 from . import fleet_vehicle
 from . import car_booking
+from . import car_booking_search
+from . import dispatch_board
+from . import car_booking_auto_assign
+from . import car_booking_timeline
+from . import reservation_status
+from . import car_booking_state_log
+from . import car_booking_clone
+from . import flight_status
 from . import booking_cities
 from . import car_extra_service
 
@@ -7,6 +15,14 @@ from . import year_model
 from . import year_car_brand_and_type
 from . import business_point
 from . import type_of_service
+from . import car_booking_rate_card
+from . import car_booking_recompute
+from . import analytics_export
+from . import driver_sync
+from . import telematics
+from . import geo_location
+from . import demand_forecast
+from . import credit_control
 from . import trip_profile
 from . import res_partner
 from . import res_company
@@ -16,6 +32,8 @@ from . import res_users
 try:
     from . import account_move
     from . import account_move_line
+    from . import invoice_mass_print
+    from . import invoice_pdf_cache
 except ImportError:
     pass
 
@@ -23,6 +41,7 @@ try:
     from . import sale_order
     from . import sale_order_line
     from . import car_booking_wizard
+    from . import car_booking_archive
 except ImportError:
     pass
 
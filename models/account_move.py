@@ -1,5 +1,7 @@
 from odoo import models, fields, api
 
+from . import booking_kernel
+
 # Module-level flag to track posting process
 _posting_in_progress = False
 
@@ -13,6 +15,13 @@ class AccountMove(models.Model):
         help='Related car booking for this invoice'
     )
     
+    car_booking_archive_id = fields.Many2one(
+        'car.booking.archive',
+        string='Archived Car Booking',
+        readonly=True,
+        help='Archive stub of the car booking once it has been moved to cold storage'
+    )
+    
     booking_ref = fields.Char(
         string='Booking Reference',
         help='Reference to the original car booking'
@@ -72,13 +81,7 @@ class AccountMove(models.Model):
     @api.depends('date_start', 'date_end')
     def _compute_duration(self):
         for record in self:
-            if record.date_start and record.date_end:
-                start_date = fields.Date.from_string(record.date_start)
-                end_date = fields.Date.from_string(record.date_end)
-                delta = end_date - start_date
-                record.duration = max(delta.days, 0)
-            else:
-                record.duration = 0.0
+            record.duration = booking_kernel.exclusive_days(record.date_start, record.date_end)
 
     @api.depends('line_ids.price_subtotal', 'additional_charges')
     def _compute_amounts_with_charges(self):
@@ -387,13 +390,7 @@ class AccountMoveLine(models.Model):
     @api.depends('date_start', 'date_end')
     def _compute_duration_line(self):
         for record in self:
-            if record.date_start and record.date_end:
-                start_date = fields.Date.from_string(record.date_start)
-                end_date = fields.Date.from_string(record.date_end)
-                delta = end_date - start_date
-                record.duration = int(max(delta.days, 0))
-            else:
-                record.duration = 0
+            record.duration = booking_kernel.exclusive_days(record.date_start, record.date_end)
     
     @api.depends('quantity', 'price_unit', 'additional_charges')
     def _compute_price_subtotal_with_charges(self):
@@ -1,5 +1,7 @@
 from odoo import models, fields, api
 
+from . import booking_kernel
+
 
 class AccountMoveLine(models.Model):
     _inherit = 'account.move.line'
@@ -73,11 +75,7 @@ class AccountMoveLine(models.Model):
     @api.depends('date_start', 'date_end')
     def _compute_duration(self):
         for record in self:
-            if record.date_start and record.date_end:
-                delta = record.date_end - record.date_start
-                record.duration = delta.days + delta.seconds / 86400
-            else:
-                record.duration = 0.0
+            record.duration = booking_kernel.fractional_days(record.date_start, record.date_end)
 
     def _compute_totals(self):
         """Override standard _compute_totals to include additional charges"""
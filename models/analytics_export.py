@@ -0,0 +1,268 @@
+import csv
+import logging
+import os
+from datetime import datetime, timedelta
+
+from odoo import models, fields, api
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+_logger = logging.getLogger(__name__)
+
+EXPORT_PARAM_PREFIX = 'aw_car_booking.export_'
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_LAG_MINUTES = 5
+EPOCH = datetime(1970, 1, 1)
+
+# Column types that stay out of the columnar files
+SKIPPED_FIELD_TYPES = ('binary', 'html', 'text', 'json', 'properties')
+
+# Datasets written to the export directory. Bookings and lines carry every
+# plain stored column; orders and invoices only their totals, restricted to
+# the ones linked to a booking.
+EXPORT_ENTITIES = {
+    'car_booking': {
+        'model': 'car.booking',
+    },
+    'car_booking_line': {
+        'model': 'car.booking.line',
+    },
+    'sale_order': {
+        'model': 'sale.order',
+        'fields': ['name', 'state', 'partner_id', 'date_order', 'currency_id',
+                   'amount_untaxed', 'amount_tax', 'amount_total', 'write_date'],
+        'where': """t.id IN (SELECT sale_order_id FROM car_booking WHERE sale_order_id IS NOT NULL
+                             UNION
+                             SELECT quotation_id FROM car_booking WHERE quotation_id IS NOT NULL)""",
+    },
+    'account_move': {
+        'model': 'account.move',
+        'fields': ['name', 'move_type', 'state', 'payment_state', 'partner_id', 'invoice_date',
+                   'currency_id', 'car_booking_id', 'amount_untaxed', 'amount_tax', 'amount_total',
+                   'amount_residual', 'write_date'],
+        'where': "t.car_booking_id IS NOT NULL",
+    },
+}
+DELETIONS_ENTITY = 'deleted'
+
+
+class CarBookingExportWatermark(models.Model):
+    """Incremental analytics export of bookings, lines, orders and invoices.
+
+    Each dataset remembers the (write_date, id) of the last row written out.
+    Changed rows are streamed past it through a server-side cursor and
+    written in chunks as date partitioned Parquet files (CSV without
+    pyarrow); the watermark is committed after every chunk, so an
+    interrupted run resumes where it stopped. File names derive from the
+    first row of their chunk, so a replayed chunk overwrites its own file.
+    Consumers keep the latest row per id and drop ids listed in `deleted`.
+    """
+    _name = 'car.booking.export.watermark'
+    _description = 'Car Booking Analytics Export Watermark'
+    _order = 'entity'
+
+    entity = fields.Selection(
+        [(entity, entity) for entity in [*EXPORT_ENTITIES, DELETIONS_ENTITY]],
+        string='Dataset', required=True, readonly=True
+    )
+    last_write_date = fields.Datetime(string='Exported Up To')
+    last_id = fields.Integer(string='Last Record ID')
+    last_run = fields.Datetime(string='Last Run', readonly=True)
+    row_count = fields.Integer(string='Rows Exported', readonly=True)
+
+    _sql_constraints = [
+        ('entity_uniq', 'unique(entity)', 'Each dataset has a single watermark.'),
+    ]
+
+    # ------------------------------------------------------------------
+    #  Configuration
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_export_param(self, key, default=None):
+        return self.env['ir.config_parameter'].sudo().get_param(EXPORT_PARAM_PREFIX + key, default)
+
+    @api.model
+    def _get_export_format(self):
+        requested = self._get_export_param('format', 'parquet')
+        if requested == 'parquet' and pyarrow is None:
+            return 'csv'
+        return requested
+
+    @api.model
+    def _get_export_columns(self, entity):
+        spec = EXPORT_ENTITIES[entity]
+        if 'fields' in spec:
+            return ['id'] + [fname for fname in spec['fields'] if fname != 'id']
+        model = self.env[spec['model']]
+        return ['id'] + [
+            fname for fname, field in model._fields.items()
+            if fname != 'id' and field.store and field.column_type
+            and field.type not in SKIPPED_FIELD_TYPES and not field.translate
+        ]
+
+    @api.model
+    def _get_export_query(self, entity):
+        """SQL and its columns selecting the rows of a dataset past a watermark, in watermark order"""
+        if entity == DELETIONS_ENTITY:
+            columns = ['id', 'entity', 'res_id', 'deleted_at']
+            query = f"""
+                SELECT {', '.join(f't.{column}' for column in columns)}, t.deleted_at AS _watermark
+                  FROM car_booking_export_tombstone t
+                 WHERE (t.deleted_at, t.id) > (%s, %s) AND t.deleted_at < %s
+                 ORDER BY t.deleted_at, t.id
+            """
+            return query, columns
+        spec = EXPORT_ENTITIES[entity]
+        table = self.env[spec['model']]._table
+        columns = self._get_export_columns(entity)
+        where = f"{spec['where']} AND " if spec.get('where') else ''
+        query = f"""
+            SELECT {', '.join(f't."{column}"' for column in columns)}, t.write_date AS _watermark
+              FROM "{table}" t
+             WHERE {where}(t.write_date, t.id) > (%s, %s) AND t.write_date < %s
+             ORDER BY t.write_date, t.id
+        """
+        return query, columns
+
+    # ------------------------------------------------------------------
+    #  Export
+    # ------------------------------------------------------------------
+    @api.model
+    def _cron_export(self):
+        export_dir = self._get_export_param('dir')
+        if not export_dir:
+            return False
+        for entity in [*EXPORT_ENTITIES, DELETIONS_ENTITY]:
+            self._export_entity(entity, export_dir)
+        return True
+
+    @api.model
+    def _export_entity(self, entity, export_dir):
+        chunk_size = max(int(self._get_export_param('chunk_size', DEFAULT_CHUNK_SIZE)), 1)
+        lag = timedelta(minutes=int(self._get_export_param('lag_minutes', DEFAULT_LAG_MINUTES)))
+        output_format = self._get_export_format()
+        # Rows written in the last minutes may belong to transactions that are
+        # still open with an older write_date; leave them to the next run.
+        until = fields.Datetime.now() - lag
+        query, columns = self._get_export_query(entity)
+
+        # Watermarks are committed on their own cursor after each chunk while
+        # the rows keep streaming from the snapshot of the main transaction.
+        with self.env.registry.cursor() as watermark_cr:
+            watermark = api.Environment(watermark_cr, self.env.uid, self.env.context)[self._name].search(
+                [('entity', '=', entity)])
+            if not watermark:
+                watermark = watermark.create({'entity': entity})
+                watermark_cr.commit()
+            last_key = (watermark.last_write_date or EPOCH, watermark.last_id)
+            exported = 0
+            with self.env.cr._cnx.cursor(f'car_booking_export_{entity}') as cursor:
+                cursor.execute(query, (*last_key, until))
+                while rows := cursor.fetchmany(chunk_size):
+                    self._write_chunk(export_dir, entity, columns, rows, output_format)
+                    last_key = (rows[-1][-1], rows[-1][0])
+                    exported += len(rows)
+                    watermark.write({
+                        'last_write_date': last_key[0],
+                        'last_id': last_key[1],
+                        'row_count': watermark.row_count + len(rows),
+                    })
+                    watermark_cr.commit()
+            watermark.last_run = fields.Datetime.now()
+            watermark_cr.commit()
+        _logger.info("Car booking export: %s rows of %s written to %s", exported, entity, export_dir)
+        return exported
+
+    @api.model
+    def _write_chunk(self, export_dir, entity, columns, rows, output_format):
+        """Write one chunk as one file per day of its watermark column"""
+        first_key, first_id = rows[0][-1], rows[0][0]
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row[-1].date(), []).append(row[:-1])
+        for day, day_rows in by_day.items():
+            directory = os.path.join(export_dir, entity, f'date={day.isoformat()}')
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{first_key:%Y%m%dT%H%M%S%f}-{first_id}.{output_format}")
+            # Written aside then renamed so a crash never leaves half a file behind
+            tmp_path = path + '.tmp'
+            if output_format == 'parquet':
+                table = pyarrow.table({column: [row[index] for row in day_rows] for index, column in enumerate(columns)})
+                pyarrow.parquet.write_table(table, tmp_path)
+            else:
+                with open(tmp_path, 'w', newline='', encoding='utf-8') as csv_file:
+                    writer = csv.writer(csv_file)
+                    writer.writerow(columns)
+                    writer.writerows(day_rows)
+            os.replace(tmp_path, path)
+
+
+class CarBookingExportTombstone(models.Model):
+    """Ids of exported records deleted since, written with plain INSERTs"""
+    _name = 'car.booking.export.tombstone'
+    _description = 'Car Booking Analytics Export Deletion'
+    _order = 'deleted_at, id'
+    _log_access = False
+
+    entity = fields.Char(string='Dataset', required=True, readonly=True)
+    res_id = fields.Integer(string='Record ID', required=True, readonly=True)
+    deleted_at = fields.Datetime(string='Deleted On', required=True, readonly=True)
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS car_booking_export_tombstone_deleted_at_id_idx
+                ON car_booking_export_tombstone (deleted_at, id)
+        """)
+
+    @api.model
+    def _record_deletions(self, entity, ids):
+        if not ids:
+            return
+        self.env.cr.execute("""
+            INSERT INTO car_booking_export_tombstone (entity, res_id, deleted_at)
+            SELECT %s, unnest(%s::int[]), NOW() AT TIME ZONE 'UTC'
+        """, (entity, list(ids)))
+
+
+class CarBooking(models.Model):
+    _inherit = 'car.booking'
+
+    def unlink(self):
+        self.env['car.booking.export.tombstone']._record_deletions('car_booking', self.ids)
+        return super().unlink()
+
+
+class CarBookingLine(models.Model):
+    _inherit = 'car.booking.line'
+
+    def unlink(self):
+        self.env['car.booking.export.tombstone']._record_deletions('car_booking_line', self.ids)
+        return super().unlink()
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    def unlink(self):
+        if self:
+            self.env.cr.execute("""
+                SELECT sale_order_id FROM car_booking WHERE sale_order_id = ANY(%s)
+                UNION
+                SELECT quotation_id FROM car_booking WHERE quotation_id = ANY(%s)
+            """, (self.ids, self.ids))
+            linked = [row[0] for row in self.env.cr.fetchall()]
+            self.env['car.booking.export.tombstone']._record_deletions('sale_order', linked)
+        return super().unlink()
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def unlink(self):
+        linked = self.filtered('car_booking_id')
+        self.env['car.booking.export.tombstone']._record_deletions('account_move', linked.ids)
+        return super().unlink()
@@ -0,0 +1,108 @@
+"""Greedy interval-scheduling solver used to auto-assign vehicles and drivers.
+
+Plain Python on purpose: no ORM access, so it can be profiled on synthetic
+data. Times are plain numbers (e.g. minutes since the start of the day) and
+locations are free-text strings, compared case-insensitively.
+"""
+from bisect import bisect_left
+
+# Cost (in minutes) charged when the previous drop-off differs from the next pickup.
+DEADHEAD_PENALTY = 30
+# Cost charged for putting an idle resource into service, so chaining jobs on
+# a resource already out is preferred unless it would sit idle longer than this.
+NEW_RESOURCE_COST = 240
+
+
+def normalize_location(location):
+    return (location or '').strip().lower()
+
+
+class ResourceCalendar:
+    """Sorted, non-overlapping busy intervals of a single vehicle or driver"""
+
+    __slots__ = ('resource_id', 'starts', 'intervals')
+
+    def __init__(self, resource_id, busy=()):
+        self.resource_id = resource_id
+        self.starts = []
+        self.intervals = []
+        for start, end, location_to in sorted(busy, key=lambda interval: interval[:2]):
+            self.add(start, end, location_to)
+
+    def add(self, start, end, location_to):
+        index = bisect_left(self.starts, start)
+        self.starts.insert(index, start)
+        self.intervals.insert(index, (start, end, normalize_location(location_to)))
+
+    def is_free(self, start, end):
+        """Whether [start, end) overlaps no busy interval.
+
+        Only the intervals right before and at start are looked at, so the
+        busy intervals are assumed not to overlap each other: the solver
+        only adds free slots, and the existing assignments passed in must
+        not double-book the resource. An overlapping pair can hide a long
+        interval behind a shorter one that starts later.
+        """
+        index = bisect_left(self.starts, start)
+        if index < len(self.intervals) and self.intervals[index][0] < end:
+            return False
+        return not (index and self.intervals[index - 1][1] > start)
+
+    def previous(self, start):
+        """The last busy interval ending at or before start, if any"""
+        index = bisect_left(self.starts, start)
+        return self.intervals[index - 1] if index else None
+
+
+def assignment_cost(calendar, start, location_from,
+                    deadhead_penalty=DEADHEAD_PENALTY, new_resource_cost=NEW_RESOURCE_COST):
+    previous = calendar.previous(start)
+    if previous is None:
+        return new_resource_cost
+    idle = start - previous[1]
+    if previous[2] and normalize_location(location_from) != previous[2]:
+        idle += deadhead_penalty
+    return idle
+
+
+def solve(jobs, resources, busy=None, deadhead_penalty=DEADHEAD_PENALTY,
+          new_resource_cost=NEW_RESOURCE_COST):
+    """Assign jobs to resources without overlaps.
+
+    :param jobs: iterable of (job_id, group, start, end, location_from, location_to);
+        a job may only go to a resource of the same group (None matches any).
+    :param resources: iterable of (resource_id, group)
+    :param busy: {resource_id: [(start, end, location_to), ...]} already booked
+    :return: ({job_id: resource_id}, [unassigned job ids])
+
+    Jobs are taken in (start, end, id) order and each goes to the free
+    resource with the lowest idle-plus-deadhead cost, ties broken by resource
+    id, which makes the result deterministic.
+    """
+    busy = busy or {}
+    calendars_by_group = {}
+    all_calendars = []
+    for resource_id, group in sorted(resources, key=lambda resource: resource[0]):
+        calendar = ResourceCalendar(resource_id, busy.get(resource_id, ()))
+        calendars_by_group.setdefault(group, []).append(calendar)
+        all_calendars.append(calendar)
+
+    assignment = {}
+    unassigned = []
+    for job_id, group, start, end, location_from, location_to in sorted(
+            jobs, key=lambda job: (job[2], job[3], job[0])):
+        candidates = all_calendars if group is None else calendars_by_group.get(group, ())
+        best = None
+        best_cost = None
+        for calendar in candidates:
+            if not calendar.is_free(start, end):
+                continue
+            cost = assignment_cost(calendar, start, location_from, deadhead_penalty, new_resource_cost)
+            if best is None or cost < best_cost:
+                best, best_cost = calendar, cost
+        if best is None:
+            unassigned.append(job_id)
+            continue
+        best.add(start, end, location_to)
+        assignment[job_id] = best.resource_id
+    return assignment, unassigned
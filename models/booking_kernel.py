@@ -0,0 +1,104 @@
+"""Pricing and duration rules shared by bookings, sale orders and invoices.
+
+Plain Python on purpose: no ORM access, so the rules can be checked and
+profiled without a database. Every scalar function has a batch form taking
+a list of tuples, which is what the computes of a whole recordset call.
+
+Duration conventions (kept as they were per document, named explicitly):
+- booking lines count calendar days inclusively, at least 1;
+- invoices count calendar days exclusively, never negative;
+- invoice lines count elapsed time in fractional days.
+"""
+from datetime import datetime
+
+SECONDS_PER_DAY = 86400.0
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+# ----------------------------------------------------------------------
+#  Durations
+# ----------------------------------------------------------------------
+def inclusive_days(start, end):
+    """Calendar days from start to end, both counted (at least 1); 0.0 if a bound is missing"""
+    if not (start and end):
+        return 0.0
+    return max((_as_date(end) - _as_date(start)).days + 1, 1)
+
+
+def exclusive_days(start, end):
+    """Calendar days from start to end, end not counted (never negative); 0.0 if a bound is missing"""
+    if not (start and end):
+        return 0.0
+    return max((_as_date(end) - _as_date(start)).days, 0)
+
+
+def fractional_days(start, end):
+    """Elapsed time from start to end in days; 0.0 if a bound is missing"""
+    if not (start and end):
+        return 0.0
+    delta = end - start
+    return delta.days + delta.seconds / SECONDS_PER_DAY
+
+
+def elapsed_hours(start, end):
+    """Elapsed time from start to end in hours; 0.0 if a bound is missing"""
+    if not (start and end):
+        return 0.0
+    return (end - start).total_seconds() / 3600.0
+
+
+def durations(rule, rows):
+    """Apply one duration rule to [(start, end), ...]"""
+    return [rule(start, end) for start, end in rows]
+
+
+# ----------------------------------------------------------------------
+#  Amounts
+# ----------------------------------------------------------------------
+def extra_hour_amount(extra_hour, extra_hour_charges):
+    return (extra_hour or 0) * (extra_hour_charges or 0) if extra_hour else 0
+
+
+def line_amount(qty, unit_price, duration, extra_hour, extra_hour_charges):
+    """qty × unit_price × duration + extra_hour × extra_hour_charges, with qty and duration defaulting to 1"""
+    base_amount = (qty or 1) * (unit_price or 0) * (duration or 1)
+    return base_amount + extra_hour_amount(extra_hour, extra_hour_charges)
+
+
+def line_amounts(rows):
+    """line_amount() over [(qty, unit_price, duration, extra_hour, extra_hour_charges), ...]"""
+    return [line_amount(*row) for row in rows]
+
+
+def order_line_subtotal(duration, qty, price_unit, additional_charges, discount):
+    """(duration or 1) × qty × price_unit + additional charges, less the discount percentage"""
+    subtotal = (duration or 1) * (qty or 0.0) * (price_unit or 0.0) + (additional_charges or 0.0)
+    return subtotal - subtotal * ((discount or 0.0) / 100.0)
+
+
+def order_line_subtotals(rows):
+    """order_line_subtotal() over [(duration, qty, price_unit, additional_charges, discount), ...]"""
+    return [order_line_subtotal(*row) for row in rows]
+
+
+# ----------------------------------------------------------------------
+#  VAT
+# ----------------------------------------------------------------------
+def excluded_tax(amount, percents):
+    """Percentage taxes on an untaxed amount, as Price Excluded (added on top)"""
+    return sum(amount * (percent / 100.0) for percent in percents)
+
+
+def booking_line_vat(amount, percents):
+    """VAT of a booking line: nothing is charged on zero or negative amounts"""
+    if amount <= 0:
+        return 0.0
+    return excluded_tax(amount, percents)
+
+
+def booking_line_vats(rows):
+    """booking_line_vat() over [(amount, percents), ...]"""
+    return [booking_line_vat(amount, percents) for amount, percents in rows]
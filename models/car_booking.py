@@ -2,6 +2,9 @@ from odoo import models, fields, api
 from odoo.exceptions import ValidationError, AccessError, UserError
 from datetime import timedelta
 
+from . import booking_kernel
+from .dispatch_board import invalidate_board_cache
+
 class CarBooking(models.Model):
     _name = 'car.booking'
     _description = 'Car Booking'
@@ -119,29 +122,26 @@ class CarBooking(models.Model):
     total_tax = fields.Monetary(string="Vat Total Tax", compute='_compute_total_tax', store=True)
     currency_id = fields.Many2one('res.currency', string='Currency', required=True, default=lambda self: self.env.company.currency_id)
 
+    @api.model
+    def _get_vat_amount(self, line_amount, taxes, currency):
+        """VAT on an untaxed line amount, always as Price Excluded (added on top)"""
+        if not taxes or line_amount <= 0:
+            return 0.0
+        percent_taxes = taxes.filtered(lambda tax: tax.amount_type == 'percent')
+        total_tax = booking_kernel.booking_line_vat(line_amount, percent_taxes.mapped('amount'))
+        for tax in taxes - percent_taxes:
+            # For other tax types, use the standard computation
+            result = tax.compute_all(line_amount, currency, 1, product=None, partner=None)
+            total_tax += sum(t.get('amount', 0.0) for t in result.get('taxes', []))
+        return total_tax
+
     @api.depends('car_booking_lines.tax_ids', 'car_booking_lines.unit_price', 'car_booking_lines.amount', 'car_booking_lines.qty', 'car_booking_lines.duration')
     def _compute_total_tax(self):
         for booking in self:
-            total_tax = 0.0
-            
-            for line in booking.car_booking_lines:
-                # Use the actual line amount (which is the untaxed amount)
-                line_amount = line.amount or 0.0
-                
-                if line.tax_ids and line_amount > 0:
-                    # For VAT calculation, we want to ensure it's calculated as Price Excluded
-                    # If the tax is configured as Price Included, we need to adjust the calculation
-                    for tax in line.tax_ids:
-                        if tax.amount_type == 'percent':
-                            # Calculate VAT as Price Excluded (add on top)
-                            tax_amount = line_amount * (tax.amount / 100.0)
-                            total_tax += tax_amount
-                        else:
-                            # For other tax types, use the standard computation
-                            taxes = tax.compute_all(line_amount, booking.currency_id, 1, product=None, partner=None)
-                            total_tax += sum(t.get('amount', 0.0) for t in taxes.get('taxes', []))
-            
-            booking.total_tax = total_tax
+            booking.total_tax = sum(
+                self._get_vat_amount(line.amount or 0.0, line.tax_ids, booking.currency_id)
+                for line in booking.car_booking_lines
+            )
 
     booking_date = fields.Datetime(string='Booking Date')
     reservation_status =  fields.Selection([
@@ -511,92 +511,66 @@ class CarBooking(models.Model):
         except Exception:
             return False
 
-    @api.model
-    def create(self, vals):
-        # Defensive: Ensure all Many2one fields are valid or None
-        relational_fields = [
-            'location_id', 'branch_id', 'company_id', 'trip_profile_id', 'sale_order_id',
-            'customer_name', 'car_id', 'driver_name', 'project_name', 'airport_id',
-            'customer_domain_category_id',  # Add this field to the safety check
-        ]
-        for field in relational_fields:
-            if field in vals and not vals[field]:
-                vals[field] = None
-        
-        # Ensure customer_domain_category_id is properly set if business_type is provided
-        if vals.get('business_type') and not vals.get('customer_domain_category_id'):
-            try:
-                category_mapping = {
-                    'corporate': 'Corporate',
-                    'hotels': 'Hotels', 
-                    'government': 'Government',
-                    'individuals': 'Individuals',
-                    'rental': 'Rental',
-                    'others': 'Others'
-                }
-                category_name = category_mapping.get(vals['business_type'])
-                if category_name:
-                    category = self.env['res.partner.category'].search([('name', '=', category_name)], limit=1)
-                    if not category:
-                        category = self.env['res.partner.category'].create({
-                            'name': category_name,
-                            'color': 1
-                        })
-                    if category and category.exists():
-                        vals['customer_domain_category_id'] = category.id
-            except Exception as e:
-                print(f"Error setting customer_domain_category_id in create: {e}")
-                vals['customer_domain_category_id'] = None
-        
-        # Set default branch if not provided
-        if not vals.get('location_id'):
-            default_branch = self._get_default_branch()
-            if default_branch:
-                vals['location_id'] = default_branch
-        
-        # Set default company branch if not provided
-        if not vals.get('branch_id'):
-            default_branch = self._get_default_company_branch()
-            if default_branch:
-                vals['branch_id'] = default_branch
-        
-        # Generate sequence number only when creating the record
-        if vals.get('name', 'New') == 'New':
-            # Determine sequence code based on booking type
-            if vals.get('booking_type') == 'with_driver':
-                seq_code = 'car.booking.with_driver'
-            elif vals.get('booking_type') == 'rental':
-                seq_code = 'car.booking.rental'
-            else:
-                seq_code = 'car.booking'  # fallback if needed
-
-            # Try to get existing sequence or create new one
-            sequence = self.env['ir.sequence'].next_by_code(seq_code)
-            if sequence:
-                vals['name'] = sequence
-            else:
-                # If sequence doesn't exist, try to find the highest existing number
-                existing_bookings = self.env['car.booking'].search([('name', '!=', 'New')])
-                if existing_bookings:
-                    # Extract numbers from existing booking names
-                    numbers = []
-                    for booking in existing_bookings:
-                        if booking.name and '/' in booking.name:
-                            try:
-                                num_part = booking.name.split('/')[-1]
-                                numbers.append(int(num_part))
-                            except (ValueError, IndexError):
-                                continue
-                    
-                    if numbers:
-                        next_number = max(numbers) + 1
-                        vals['name'] = f"DSL/{str(next_number).zfill(5)}"
-                    else:
-                        vals['name'] = "DSL/00001"
-                else:
-                    vals['name'] = "DSL/00001"
-        
-        return super(CarBooking, self).create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            # Defensive: Ensure all Many2one fields are valid or None
+            relational_fields = [
+                'location_id', 'branch_id', 'company_id', 'trip_profile_id', 'sale_order_id',
+                'customer_name', 'car_id', 'driver_name', 'project_name', 'airport_id',
+                'customer_domain_category_id',  # Add this field to the safety check
+            ]
+            for field in relational_fields:
+                if field in vals and not vals[field]:
+                    vals[field] = None
+        
+            # Ensure customer_domain_category_id is properly set if business_type is provided
+            if vals.get('business_type') and not vals.get('customer_domain_category_id'):
+                try:
+                    category_mapping = {
+                        'corporate': 'Corporate',
+                        'hotels': 'Hotels', 
+                        'government': 'Government',
+                        'individuals': 'Individuals',
+                        'rental': 'Rental',
+                        'others': 'Others'
+                    }
+                    category_name = category_mapping.get(vals['business_type'])
+                    if category_name:
+                        category = self.env['res.partner.category'].search([('name', '=', category_name)], limit=1)
+                        if not category:
+                            category = self.env['res.partner.category'].create({
+                                'name': category_name,
+                                'color': 1
+                            })
+                        if category and category.exists():
+                            vals['customer_domain_category_id'] = category.id
+                except Exception as e:
+                    print(f"Error setting customer_domain_category_id in create: {e}")
+                    vals['customer_domain_category_id'] = None
+        
+            # Set default branch if not provided
+            if not vals.get('location_id'):
+                default_branch = self._get_default_branch()
+                if default_branch:
+                    vals['location_id'] = default_branch
+        
+            # Set default company branch if not provided
+            if not vals.get('branch_id'):
+                default_branch = self._get_default_company_branch()
+                if default_branch:
+                    vals['branch_id'] = default_branch
+        
+        # Generate sequence numbers only when creating the records, one block per sequence
+        unnamed = [vals for vals in vals_list if vals.get('name', 'New') == 'New']
+        vals_by_code = {}
+        for vals in unnamed:
+            vals_by_code.setdefault(self._get_sequence_code(vals.get('booking_type')), []).append(vals)
+        for seq_code, code_vals in vals_by_code.items():
+            for vals, name in zip(code_vals, self._reserve_booking_names(seq_code, len(code_vals))):
+                vals['name'] = name
+
+        return super(CarBooking, self).create(vals_list)
     
     @api.depends('car_booking_lines.amount', 'car_booking_lines.extra_hour', 'car_booking_lines.extra_hour_charges', 'total_tax')
     def _compute_amounts(self):
@@ -748,17 +722,73 @@ class CarBooking(models.Model):
 
     
     def _create_trip_profile(self):
-        """Create or update a trip.profile and its trip.vehicle.line lines
-        so that it mirrors this booking."""
+        """Create or refresh the trip profile of each booking in the recordset.
+
+        trip.profile belongs to the trip module, which owns how a booking maps
+        to a profile and its vehicle lines: each booking goes through its
+        create_from_booking_with_save API, one booking at a time.
+        """
+        TripProfile = self.env['trip.profile']
+        trip_profiles = TripProfile
         for booking in self:
-            # Use the new method that ensures proper saving
-            trip_profile = self.env['trip.profile'].create_from_booking_with_save(booking)
-            return trip_profile
-    
-    
+            trip_profiles |= TripProfile.create_from_booking_with_save(booking)
+        return trip_profiles
 
+    @api.model
+    def _get_sequence_code(self, booking_type):
+        """Sequence code used for booking references of booking_type"""
+        if booking_type == 'with_driver':
+            return 'car.booking.with_driver'
+        if booking_type == 'rental':
+            return 'car.booking.rental'
+        return 'car.booking'
 
-    
+    @api.model
+    def _reserve_booking_names(self, seq_code, count):
+        """Reserve count consecutive references from seq_code in one round trip"""
+        if count <= 0:
+            return []
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', seq_code),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            # Same fallback as create(): continue numbering after the highest DSL/ reference
+            self.env.cr.execute("""
+                SELECT COALESCE(MAX(SUBSTRING(name FROM '/([0-9]+)$')::integer), 0)
+                FROM car_booking
+                WHERE name LIKE '%/%'
+            """)
+            last_number = self.env.cr.fetchone()[0]
+            return [f"DSL/{str(last_number + i).zfill(5)}" for i in range(1, count + 1)]
+        if sequence.use_date_range:
+            return [sequence.next_by_id() for _i in range(count)]
+        if sequence.implementation == 'standard':
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                ('ir_sequence_%03d' % sequence.id, count),
+            )
+            numbers = [row[0] for row in self.env.cr.fetchall()]
+        else:
+            self.env.cr.execute(
+                "SELECT number_next FROM ir_sequence WHERE id = %s FOR UPDATE NOWAIT",
+                (sequence.id,),
+            )
+            number_next = self.env.cr.fetchone()[0]
+            self.env.cr.execute(
+                "UPDATE ir_sequence SET number_next = number_next + %s WHERE id = %s",
+                (sequence.number_increment * count, sequence.id),
+            )
+            sequence.invalidate_recordset(['number_next'])
+            numbers = [number_next + i * sequence.number_increment for i in range(count)]
+        return [sequence.get_next_char(number) for number in numbers]
+
+    def _assign_booking_references(self):
+        """Give every booking still named 'New' a reference, one sequence block per code"""
+        unnamed = self.filtered(lambda b: not b.name or b.name == 'New')
+        for seq_code, bookings in unnamed.grouped(lambda b: self._get_sequence_code(b.booking_type)).items():
+            for booking, name in zip(bookings, self._reserve_booking_names(seq_code, len(bookings))):
+                booking.name = name
 
     def _get_driver_id(self, booking):
         """Map driver_name (res.partner) to driver_id (hr.employee)."""
@@ -1280,52 +1310,16 @@ Sample Partners:
     def action_ensure_service_types_before_trip(self):
         """Ensure car booking lines have service types set before creating trip profile"""
         self.ensure_one()
-        
-        print(f"DEBUG: Ensuring service types for booking: {self.name}")
-        updated_count = 0
-        
-        for booking_line in self.car_booking_lines:
-            if not booking_line.type_of_service_id:
-                print(f"DEBUG: Booking line {booking_line.id} missing type_of_service_id")
-                
-                # Try to find appropriate service type based on booking context
-                service_type = None
-                
-                # First try to find by booking type
-                if self.booking_type == 'with_driver':
-                    service_type = self.env['type.of.service'].search([
-                        '|', ('name', 'ilike', 'transfer'),
-                        ('name', 'ilike', 'with driver')
-                    ], limit=1)
-                elif self.booking_type == 'rental':
-                    service_type = self.env['type.of.service'].search([
-                        '|', ('name', 'ilike', 'rental'),
-                        ('name', 'ilike', 'without driver')
-                    ], limit=1)
-                
-                # If not found by booking type, try to find by product
-                if not service_type and booking_line.product_id:
-                    service_type = self.env['type.of.service'].search([
-                        ('name', 'ilike', booking_line.product_id.name)
-                    ], limit=1)
-                
-                # If still not found, get the first available service type
-                if not service_type:
-                    service_type = self.env['type.of.service'].search([], limit=1)
-                
-                if service_type:
-                    booking_line.type_of_service_id = service_type.id
-                    updated_count += 1
-                    print(f"DEBUG: Set service type for booking line {booking_line.id}: {service_type.name}")
-                else:
-                    print(f"DEBUG: No service type found for booking line {booking_line.id}")
-        
-        if updated_count > 0:
-            # Force save the booking lines
-            self.car_booking_lines._compute_amount_values()
-            print(f"DEBUG: Updated {updated_count} booking lines with service types")
-        
-        return updated_count
+
+        resolved = self.env['type.of.service'].resolve_for_lines(self.car_booking_lines)
+        lines_by_service_type = {}
+        for line_id, service_type_id in resolved.items():
+            if service_type_id:
+                lines_by_service_type.setdefault(service_type_id, []).append(line_id)
+        for service_type_id, line_ids in lines_by_service_type.items():
+            self.env['car.booking.line'].browse(line_ids).write({'type_of_service_id': service_type_id})
+
+        return sum(len(line_ids) for line_ids in lines_by_service_type.values())
 
     def action_create_trip_with_service_check(self):
         """Create trip profile with service type verification"""
@@ -1351,21 +1345,6 @@ Sample Partners:
             }
 
     # Rest of the existing methods (unchanged)
-    def duplicate_booking(self):
-        self.ensure_one()
-        new_booking_vals = {
-            'customer_name': self.customer_name,
-            'state': 'draft',
-        }
-        new_booking = self.create(new_booking_vals)
-        return {
-            'type': 'ir.actions.act_window',
-            'res_model': 'car.booking',
-            'view_mode': 'form',
-            'res_id': new_booking.id,
-            'target': 'current',
-        }
-
     @api.onchange('region')
     def _onchange_region(self):
         if self.region:
@@ -1401,48 +1380,12 @@ Sample Partners:
             
             
     def action_confirm(self):
-        for record in self:
-            if record.state == 'draft':
-                # Generate sequence number if not already set
-                if not record.name or record.name == 'New':
-                    # Determine sequence code based on booking type
-                    if record.booking_type == 'with_driver':
-                        seq_code = 'car.booking.with_driver'
-                    elif record.booking_type == 'rental':
-                        seq_code = 'car.booking.rental'
-                    else:
-                        seq_code = 'car.booking'
-                    
-                    # Try to get existing sequence or create new one
-                    sequence = self.env['ir.sequence'].next_by_code(seq_code)
-                    if sequence:
-                        record.name = sequence
-                    else:
-                        # If sequence doesn't exist, try to find the highest existing number
-                        existing_bookings = self.env['car.booking'].search([('name', '!=', 'New')])
-                        if existing_bookings:
-                            # Extract numbers from existing booking names
-                            numbers = []
-                            for booking in existing_bookings:
-                                if booking.name and '/' in booking.name:
-                                    try:
-                                        num_part = booking.name.split('/')[-1]
-                                        numbers.append(int(num_part))
-                                    except (ValueError, IndexError):
-                                        continue
-                            
-                            if numbers:
-                                next_number = max(numbers) + 1
-                                record.name = f"DSL/{str(next_number).zfill(5)}"
-                            else:
-                                record.name = "DSL/00001"
-                        else:
-                            record.name = "DSL/00001"
-                
-                record.state = 'confirm'
-                self._create_trip_profile()
-            else:
-                raise ValidationError("Can only request Confirm from Draft state.")
+        not_draft = self.filtered(lambda b: b.state != 'draft')
+        if not_draft:
+            raise ValidationError("Can only request Confirm from Draft state.")
+        self._assign_booking_references()
+        self.write({'state': 'confirm'})
+        self._create_trip_profile()
     
     def action_reset_draft(self):
         for record in self:
@@ -1563,18 +1506,43 @@ class CarBookingLine(models.Model):
 
     tax_ids = fields.Many2many('account.tax', string="Vat Taxes")
 
+    def init(self):
+        # Dispatch board and day views filter lines of one branch by start date
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS car_booking_line_branch_start_idx
+                ON car_booking_line (branch_id, start_date)
+        """)
+
+    def _invalidate_dispatch_board(self):
+        branch_ids = set(self.sudo().mapped('branch_id').ids)
+        if branch_ids:
+            invalidate_board_cache(self.env.cr.dbname, branch_ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._invalidate_dispatch_board()
+        return lines
+
+    def write(self, vals):
+        self._invalidate_dispatch_board()
+        result = super().write(vals)
+        self._invalidate_dispatch_board()
+        return result
+
+    def unlink(self):
+        self._invalidate_dispatch_board()
+        return super().unlink()
+
     @api.depends('start_date', 'end_date')
     def _compute_total_hours(self):
         for record in self:
-            if record.start_date and record.end_date:
-                delta = record.end_date - record.start_date
-                record.total_hours = delta.total_seconds() / 3600.0  # convert seconds to hours
-            else:
-                record.total_hours = 0.0
+            record.total_hours = booking_kernel.elapsed_hours(record.start_date, record.end_date)
     
     car_booking_id = fields.Many2one(
         'car.booking',
         string="Car Booking",
+        index=True,
         help="Reference to the main car booking record."
     )
     duration = fields.Float(
@@ -1803,34 +1771,26 @@ class CarBookingLine(models.Model):
     #             amount_val = record.qty * record.unit_price * record.duration
     #             record.amount = (record.extra_hour_charges * record.extra_hour ) + amount_val
 
+    @api.model
+    def _get_line_amount(self, qty, unit_price, duration, extra_hour, extra_hour_charges):
+        """qty × unit_price × duration + extra_hour × extra_hour_charges, with qty and duration defaulting to 1"""
+        return booking_kernel.line_amount(qty, unit_price, duration, extra_hour, extra_hour_charges)
+
     @api.depends('qty', 'unit_price', 'duration', 'extra_hour', 'extra_hour_charges')
     def _compute_amount(self):
         """Compute amount based on qty * unit_price * duration + extra charges"""
-        for record in self:
-            qty = record.qty or 1
-            unit_price = record.unit_price or 0
-            duration = record.duration or 1
-            extra_hour = record.extra_hour or 0
-            extra_hour_charges = record.extra_hour_charges or 0
-
-            # Calculate base amount: qty * unit_price * duration
-            base_amount = qty * unit_price * duration
-            extra_amount = extra_hour * extra_hour_charges if extra_hour else 0
-            record.amount = base_amount + extra_amount
-            
-            print(f"DEBUG: Line calculation - qty: {qty}, unit_price: {unit_price}, duration: {duration}")
-            print(f"DEBUG: extra_hour: {extra_hour}, extra_hour_charges: {extra_hour_charges}")
-            print(f"DEBUG: base_amount: {base_amount}, extra_amount: {extra_amount}, total: {record.amount}")
-            print(f"DEBUG: Formula: ({qty} × {unit_price} × {duration}) + ({extra_hour} × {extra_hour_charges}) = {record.amount}")
+        amounts = booking_kernel.line_amounts([
+            (record.qty, record.unit_price, record.duration, record.extra_hour, record.extra_hour_charges)
+            for record in self
+        ])
+        for record, amount in zip(self, amounts):
+            record.amount = amount
 
     @api.depends('extra_hour', 'extra_hour_charges')
     def _compute_extra_hour_total(self):
         """Compute total extra hour charges"""
         for record in self:
-            extra_hour = record.extra_hour or 0
-            extra_hour_charges = record.extra_hour_charges or 0
-            record.extra_hour_total_amount = extra_hour * extra_hour_charges
-            print(f"DEBUG: Extra hour total: {extra_hour} × {extra_hour_charges} = {record.extra_hour_total_amount}")
+            record.extra_hour_total_amount = booking_kernel.extra_hour_amount(record.extra_hour, record.extra_hour_charges)
 
     @api.onchange('qty', 'unit_price', 'duration', 'extra_hour_charges', 'extra_hour')
     def _onchange_amount(self):
@@ -1841,60 +1801,29 @@ class CarBookingLine(models.Model):
     @api.onchange('product_id', 'car_booking_id')
     def _onchange_auto_set_service_type(self):
         """Auto-set service type based on product or booking type"""
-        if self.product_id and not self.type_of_service_id:
-            # Try to find service type by product name
-            service_type = self.env['type.of.service'].search([
-                ('name', 'ilike', self.product_id.name)
-            ], limit=1)
-            
-            if service_type:
-                self.type_of_service_id = service_type.id
-                print(f"DEBUG: Auto-set service type from product: {service_type.name}")
-        
-        # If still no service type and we have a booking reference
-        if not self.type_of_service_id and self.car_booking_id:
-            booking = self.car_booking_id
-            service_type = None
-            
-            # Try to find by booking type
-            if booking.booking_type == 'with_driver':
-                service_type = self.env['type.of.service'].search([
-                    '|', ('name', 'ilike', 'transfer'),
-                    ('name', 'ilike', 'with driver')
-                ], limit=1)
-            elif booking.booking_type == 'rental':
-                service_type = self.env['type.of.service'].search([
-                    '|', ('name', 'ilike', 'rental'),
-                    ('name', 'ilike', 'without driver')
-                ], limit=1)
-            
-            # If still not found, get the first available service type
-            if not service_type:
-                service_type = self.env['type.of.service'].search([], limit=1)
-            
-            if service_type:
-                self.type_of_service_id = service_type.id
-                print(f"DEBUG: Auto-set service type from booking type: {service_type.name}")
+        if not self.type_of_service_id and (self.product_id or self.car_booking_id):
+            service_type_id = self.env['type.of.service']._resolve_service_type_id(
+                self.product_id, self.car_booking_id.booking_type)
+            if service_type_id:
+                self.type_of_service_id = service_type_id
 
     @api.onchange('car_booking_id')
     def _onchange_car_booking_id_date_of_service(self):
         if self.car_booking_id and self.car_booking_id.date_of_service:
             self.name = self.car_booking_id.date_of_service
 
+    @api.model
+    def _get_line_duration(self, start_date, end_date):
+        """Days between start and end, counted inclusively (at least 1)"""
+        return booking_kernel.inclusive_days(start_date, end_date)
+
     @api.depends('start_date', 'end_date')
     def _compute_duration(self):
         """Compute duration for each line based on start_date and end_date."""
-        for record in self:
-            if record.start_date and record.end_date:
-                # Convert datetime to date for proper calculation
-                start_date = record.start_date.date()
-                end_date = record.end_date.date()
-                delta = end_date - start_date
-                # Ensure duration is non-negative and add 1 for inclusive counting
-                record.duration = max(delta.days + 1, 1)
-            else:
-                record.duration = 0.0
-            print(f"DEBUG: Duration calculated: {record.duration} days")
+        durations = booking_kernel.durations(
+            booking_kernel.inclusive_days, [(record.start_date, record.end_date) for record in self])
+        for record, duration in zip(self, durations):
+            record.duration = duration
     
     def _generate_booking_line_name(self):
         """Generate a proper name for car booking line"""
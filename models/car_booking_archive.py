@@ -0,0 +1,310 @@
+import logging
+from datetime import timedelta
+
+from markupsafe import Markup, escape
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+ARCHIVE_HORIZON_PARAM = 'aw_car_booking.archive_horizon_days'
+ARCHIVE_BATCH_PARAM = 'aw_car_booking.archive_batch_size'
+DEFAULT_ARCHIVE_HORIZON_DAYS = 365
+DEFAULT_ARCHIVE_BATCH_SIZE = 500
+
+# Fields never copied into a snapshot: ORM bookkeeping and values that are
+# recomputed when the booking is restored.
+SNAPSHOT_SKIP_FIELDS = {'id', 'create_uid', 'create_date', 'write_uid', 'write_date', 'display_name'}
+
+
+class CarBookingArchive(models.Model):
+    _name = 'car.booking.archive'
+    _description = 'Archived Car Booking'
+    _order = 'date_of_service desc, id desc'
+
+    # Lightweight stub columns kept in the clear so archived bookings can
+    # still be searched, grouped and referenced by invoices/quotations.
+    name = fields.Char(string='Booking Ref', readonly=True, index=True)
+    original_booking_id = fields.Integer(string='Original Booking ID', readonly=True, index=True)
+    customer_name = fields.Many2one('res.partner', string='Customer Name', readonly=True, index=True)
+    guest_name = fields.Many2one('res.partner', string='Guest Name', readonly=True)
+    branch_id = fields.Many2one('res.company', string='Branch', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True, index=True)
+    booking_type = fields.Selection([
+        ('with_driver', 'Car with Driver(Limousine)'),
+        ('rental', 'Rental')
+    ], string='Type of Booking', readonly=True)
+    state = fields.Char(string='Trip Status', readonly=True)
+    reservation_status = fields.Char(string='Reservation Status', readonly=True)
+    date_of_service = fields.Date(string='Date of Booking', readonly=True)
+    amount_total = fields.Float(string='Total Amount', readonly=True)
+    currency_id = fields.Many2one('res.currency', string='Currency', readonly=True)
+    invoice_id = fields.Many2one('account.move', string='Invoice', readonly=True)
+    quotation_id = fields.Many2one('sale.order', string='Quotation', readonly=True)
+    sale_order_id = fields.Many2one('sale.order', string='Sales Order', readonly=True)
+    line_count = fields.Integer(string='Lines', readonly=True)
+    attachment_count = fields.Integer(string='Attachments', readonly=True)
+    archived_date = fields.Datetime(string='Archived On', readonly=True, default=fields.Datetime.now)
+
+    # Full header, lines and attachment metadata. Stored as jsonb, which
+    # PostgreSQL compresses out of line (TOAST) for anything non-trivial.
+    snapshot = fields.Json(string='Snapshot', readonly=True, copy=False)
+    snapshot_html = fields.Html(string='Archived Booking', compute='_compute_snapshot_html', sanitize=False)
+
+    @api.depends('snapshot')
+    def _compute_snapshot_html(self):
+        """Render the archived lines as a read-only table for the viewer"""
+        columns = [
+            ('start_date', 'Start Date'),
+            ('end_date', 'End Date'),
+            ('duration', 'Duration'),
+            ('qty', 'Qty'),
+            ('unit_price', 'Price'),
+            ('extra_hour', 'Extra Hour'),
+            ('extra_hour_charges', 'Extra Hour Charges'),
+            ('amount', 'Amount'),
+        ]
+        for record in self:
+            lines = (record.snapshot or {}).get('lines', [])
+            if not lines:
+                record.snapshot_html = False
+                continue
+            head = Markup('').join(Markup('<th>%s</th>') % label for _key, label in columns)
+            body = Markup('')
+            for line in lines:
+                cells = Markup('').join(
+                    Markup('<td>%s</td>') % escape(line.get(key) if line.get(key) not in (None, False) else '')
+                    for key, _label in columns
+                )
+                body += Markup('<tr>%s</tr>') % cells
+            record.snapshot_html = Markup(
+                '<table class="table table-sm o_main_table"><thead><tr>%s</tr></thead><tbody>%s</tbody></table>'
+            ) % (head, body)
+
+    # ------------------------------------------------------------------
+    #  Snapshot helpers
+    # ------------------------------------------------------------------
+    @api.model
+    def _snapshot_field_names(self, model_name):
+        """Stored, non-computed fields that fully describe a record of model_name"""
+        model = self.env[model_name]
+        names = []
+        for name, field in model._fields.items():
+            if name in SNAPSHOT_SKIP_FIELDS or field.compute or field.related:
+                continue
+            if field.type == 'one2many' or not (field.store or field.type == 'many2many'):
+                continue
+            names.append(name)
+        return names
+
+    @api.model
+    def _serialize_values(self, model_name, values):
+        """Turn read(load=False) output into JSON friendly values"""
+        model = self.env[model_name]
+        result = {}
+        for name, value in values.items():
+            field = model._fields.get(name)
+            if field is None:
+                continue
+            if field.type == 'many2one':
+                value = value or False
+            elif field.type in ('date', 'datetime') and value:
+                value = fields.Datetime.to_string(value) if field.type == 'datetime' else fields.Date.to_string(value)
+            elif field.type == 'binary' and value:
+                value = value.decode() if isinstance(value, bytes) else value
+            result[name] = value
+        return result
+
+    @api.model
+    def _deserialize_values(self, model_name, values):
+        """Turn snapshot values back into create() values, dropping dangling references"""
+        model = self.env[model_name]
+        result = {}
+        for name, value in values.items():
+            field = model._fields.get(name)
+            if field is None or field.compute or field.related:
+                continue
+            if field.type == 'many2one':
+                value = value if value and self.env[field.comodel_name].browse(value).exists() else False
+            elif field.type == 'many2many':
+                value = [(6, 0, self.env[field.comodel_name].browse(value or []).exists().ids)]
+            result[name] = value
+        return result
+
+    # ------------------------------------------------------------------
+    #  Archive
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_archive_horizon(self):
+        params = self.env['ir.config_parameter'].sudo()
+        days = int(params.get_param(ARCHIVE_HORIZON_PARAM, DEFAULT_ARCHIVE_HORIZON_DAYS))
+        batch_size = int(params.get_param(ARCHIVE_BATCH_PARAM, DEFAULT_ARCHIVE_BATCH_SIZE))
+        return days, batch_size
+
+    @api.model
+    def _get_archivable_domain(self, horizon_days):
+        cutoff = fields.Date.today() - timedelta(days=horizon_days)
+        return [
+            ('state', 'in', ('completed', 'invoiced')),
+            ('reservation_status', 'in', ('paid', 'finished')),
+            ('date_of_service', '<', cutoff),
+        ]
+
+    @api.model
+    def _cron_archive_bookings(self):
+        """Move bookings older than the configured horizon into the archive"""
+        horizon_days, batch_size = self._get_archive_horizon()
+        bookings = self.env['car.booking'].search(self._get_archivable_domain(horizon_days), order='id')
+        archived = self.env['car.booking.archive']
+        for start in range(0, len(bookings), batch_size):
+            archived |= self._archive_bookings(bookings[start:start + batch_size])
+            self.env.cr.commit()
+        _logger.info("Car booking archive: moved %s bookings older than %s days", len(archived), horizon_days)
+        return archived
+
+    @api.model
+    def _archive_bookings(self, bookings):
+        """Snapshot bookings with their lines and attachments, then drop them from the hot tables"""
+        if not bookings:
+            return self.browse()
+        booking_fields = self._snapshot_field_names('car.booking')
+        line_fields = self._snapshot_field_names('car.booking.line')
+
+        booking_rows = {row['id']: row for row in bookings.read(booking_fields, load=False)}
+        lines = bookings.car_booking_lines
+        lines_by_booking = {}
+        for row in lines.read(line_fields, load=False):
+            lines_by_booking.setdefault(row['car_booking_id'], []).append(row)
+
+        # Invoice and quotation lines pointing at booking lines are relinked on restore.
+        order_lines = self.env['sale.order.line'].search_read(
+            [('car_booking_line_id', 'in', lines.ids)], ['car_booking_line_id'], load=False)
+        move_lines = self.env['account.move.line'].search_read(
+            [('car_booking_line_id', 'in', lines.ids)], ['car_booking_line_id'], load=False)
+        order_lines_by_line = {}
+        for row in order_lines:
+            order_lines_by_line.setdefault(row['car_booking_line_id'], []).append(row['id'])
+        move_lines_by_line = {}
+        for row in move_lines:
+            move_lines_by_line.setdefault(row['car_booking_line_id'], []).append(row['id'])
+
+        attachments = self.env['ir.attachment'].search([
+            ('res_model', '=', 'car.booking'), ('res_id', 'in', bookings.ids),
+        ])
+        attachments |= bookings.attachment_ids
+        attachments_by_booking = {}
+        for attachment in attachments.read(['res_id', 'name', 'mimetype', 'file_size', 'checksum'], load=False):
+            attachments_by_booking.setdefault(attachment['res_id'], []).append(attachment)
+
+        vals_list = []
+        for booking in bookings:
+            row = booking_rows[booking.id]
+            line_snapshots = []
+            for line_row in lines_by_booking.get(booking.id, []):
+                line_snapshot = self._serialize_values('car.booking.line', line_row)
+                line_snapshot['_id'] = line_row['id']
+                line_snapshot['_sale_order_line_ids'] = order_lines_by_line.get(line_row['id'], [])
+                line_snapshot['_move_line_ids'] = move_lines_by_line.get(line_row['id'], [])
+                line_snapshot.pop('car_booking_id', None)
+                line_snapshots.append(line_snapshot)
+            booking_attachments = attachments_by_booking.get(booking.id, [])
+            vals_list.append({
+                'name': booking.name,
+                'original_booking_id': booking.id,
+                'customer_name': booking.customer_name.id,
+                'guest_name': booking.guest_name.id,
+                'branch_id': booking.branch_id.id,
+                'company_id': booking.company_id.id,
+                'booking_type': booking.booking_type,
+                'state': booking.state,
+                'reservation_status': booking.reservation_status,
+                'date_of_service': booking.date_of_service,
+                'amount_total': booking.amount_total,
+                'currency_id': booking.currency_id.id,
+                'invoice_id': booking.invoice_id.id,
+                'quotation_id': booking.quotation_id.id,
+                'sale_order_id': booking.sale_order_id.id,
+                'line_count': len(line_snapshots),
+                'attachment_count': len(booking_attachments),
+                'snapshot': {
+                    'booking': self._serialize_values('car.booking', row),
+                    'lines': line_snapshots,
+                    'attachments': booking_attachments,
+                },
+            })
+        archives = self.create(vals_list)
+        archive_by_booking = {archive.original_booking_id: archive for archive in archives}
+
+        # Point references from invoices/quotations at the stub instead of the booking.
+        for model_name in ('account.move', 'sale.order'):
+            records = self.env[model_name].search([('car_booking_id', 'in', bookings.ids)])
+            for booking_id, group in records.grouped('car_booking_id').items():
+                group.write({'car_booking_archive_id': archive_by_booking[booking_id.id].id})
+
+        # Keep the binary data: attachments simply follow the archive record.
+        for attachment in attachments:
+            archive = archive_by_booking.get(attachment.res_id)
+            if archive and attachment.res_model == 'car.booking':
+                attachment.write({'res_model': self._name, 'res_id': archive.id})
+
+        lines.unlink()
+        bookings.unlink()
+        return archives
+
+    # ------------------------------------------------------------------
+    #  Restore
+    # ------------------------------------------------------------------
+    def action_restore(self):
+        """Recreate the bookings, lines and references from their snapshots"""
+        bookings = self.env['car.booking']
+        for archive in self:
+            snapshot = archive.snapshot or {}
+            if not snapshot.get('booking'):
+                raise UserError(f"Archive {archive.name} has no snapshot to restore.")
+            booking_vals = self._deserialize_values('car.booking', snapshot['booking'])
+            booking = self.env['car.booking'].create(booking_vals)
+
+            line_vals_list = []
+            for line_snapshot in snapshot.get('lines', []):
+                line_vals = self._deserialize_values('car.booking.line', {
+                    key: value for key, value in line_snapshot.items() if not key.startswith('_')
+                })
+                line_vals['car_booking_id'] = booking.id
+                line_vals_list.append(line_vals)
+            new_lines = self.env['car.booking.line'].create(line_vals_list)
+            for line_snapshot, new_line in zip(snapshot.get('lines', []), new_lines):
+                self.env['sale.order.line'].browse(line_snapshot.get('_sale_order_line_ids', [])).exists().write(
+                    {'car_booking_line_id': new_line.id})
+                self.env['account.move.line'].browse(line_snapshot.get('_move_line_ids', [])).exists().write(
+                    {'car_booking_line_id': new_line.id})
+
+            attachment_ids = [att['id'] for att in snapshot.get('attachments', [])]
+            attachments = self.env['ir.attachment'].browse(attachment_ids).exists()
+            attachments.filtered(lambda a: a.res_model == self._name).write(
+                {'res_model': 'car.booking', 'res_id': booking.id})
+
+            for model_name in ('account.move', 'sale.order'):
+                self.env[model_name].search([('car_booking_archive_id', '=', archive.id)]).write({
+                    'car_booking_id': booking.id,
+                    'car_booking_archive_id': False,
+                })
+            bookings |= booking
+
+        self.unlink()
+        if len(bookings) == 1:
+            return {
+                'type': 'ir.actions.act_window',
+                'res_model': 'car.booking',
+                'view_mode': 'form',
+                'res_id': bookings.id,
+                'target': 'current',
+            }
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Restored Bookings',
+            'res_model': 'car.booking',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', bookings.ids)],
+            'target': 'current',
+        }
@@ -0,0 +1,164 @@
+import logging
+from datetime import datetime, time
+
+from odoo import models, fields, api
+
+from . import assignment_solver
+
+_logger = logging.getLogger(__name__)
+
+
+class CarBookingAutoAssign(models.AbstractModel):
+    _name = 'car.booking.auto.assign'
+    _description = 'Car Booking Vehicle and Driver Auto-Assignment'
+
+    @api.model
+    def _to_minutes(self, value, origin):
+        return (value - origin).total_seconds() / 60.0
+
+    @api.model
+    def _get_branch_domain(self, branch):
+        """Records of branch, or shared by every branch (no company set)"""
+        return [('company_id', 'in', [branch.id, False])]
+
+    @api.model
+    def _get_vehicle_pool(self, branch, car_models):
+        return self.env['fleet.vehicle'].search(
+            [('model_id', 'in', car_models.ids)] + self._get_branch_domain(branch), order='id')
+
+    @api.model
+    def _get_driver_pool(self, branch):
+        """Partners of branch flagged as drivers; customers with a national ID are not drivers"""
+        return self.env['res.partner'].search(
+            [('is_driver', '=', True)] + self._get_branch_domain(branch), order='id')
+
+    @api.model
+    def _get_busy_intervals(self, field_name, start, stop, exclude_ids, origin):
+        """Already assigned lines of the window, per vehicle or driver, in one read"""
+        rows = self.env['car.booking.line'].search_read([
+            (field_name, '!=', False),
+            ('id', 'not in', exclude_ids),
+            ('start_date', '<', stop),
+            ('end_date', '>', start),
+            ('booking_state', '!=', 'cancelled'),
+        ], [field_name, 'start_date', 'end_date', 'location_to'], load=False)
+        busy = {}
+        for row in rows:
+            busy.setdefault(row[field_name], []).append((
+                self._to_minutes(row['start_date'], origin),
+                self._to_minutes(row['end_date'], origin),
+                row['location_to'],
+            ))
+        return busy
+
+    @api.model
+    def _line_jobs(self, lines, origin, group_field=None):
+        jobs = []
+        for line in lines:
+            group = line[group_field].id if group_field else None
+            jobs.append((
+                line.id,
+                group,
+                self._to_minutes(line.start_date, origin),
+                self._to_minutes(line.end_date, origin),
+                line.location_from,
+                line.location_to,
+            ))
+        return jobs
+
+    @api.model
+    def auto_assign(self, branch_id, day, assign_vehicles=True, assign_drivers=True):
+        """Assign vehicles of the required car model and drivers to the unassigned
+        lines of branch_id starting on day. Returns counts of what was assigned."""
+        start, stop = self.env['car.booking.dispatch.board']._get_day_bounds(fields.Date.to_date(day))
+        lines = self.env['car.booking.line'].search([
+            ('branch_id', '=', branch_id),
+            ('start_date', '>=', start),
+            ('start_date', '<', stop),
+            ('end_date', '!=', False),
+            ('booking_state', 'not in', ('cancelled', 'completed', 'invoiced')),
+        ], order='start_date, id')
+        return self.assign_lines(lines, assign_vehicles=assign_vehicles, assign_drivers=assign_drivers)
+
+    @api.model
+    def _assign(self, lines, field_name, resources, origin, group_field=None):
+        """Run the solver for one resource type and write results grouped per resource"""
+        todo = lines.filtered(lambda line: not line[field_name] and line.start_date and line.end_date)
+        if group_field:
+            todo = todo.filtered(lambda line: line[group_field])
+        if not todo:
+            return self.env['car.booking.line'], todo
+        window_start = min(todo.mapped('start_date'))
+        window_stop = max(todo.mapped('end_date'))
+        busy = self._get_busy_intervals(field_name, window_start, window_stop, todo.ids, origin)
+        assignment, unassigned = assignment_solver.solve(self._line_jobs(todo, origin, group_field), resources, busy)
+
+        by_resource = {}
+        for line_id, resource_id in assignment.items():
+            by_resource.setdefault(resource_id, []).append(line_id)
+        Line = self.env['car.booking.line']
+        for resource_id, line_ids in by_resource.items():
+            vals = {field_name: resource_id}
+            if field_name == 'driver_name':
+                driver = self.env['res.partner'].browse(resource_id)
+                vals.update({
+                    'id_no': driver.national_identity_number,
+                    'mobile_no': driver.customized_mobile,
+                })
+            Line.browse(line_ids).write(vals)
+        return Line.browse(list(assignment)), Line.browse(unassigned)
+
+    @api.model
+    def assign_lines(self, lines, assign_vehicles=True, assign_drivers=True):
+        """Assign vehicles and drivers to the unassigned lines among lines, branch by branch"""
+        result = {'vehicles': 0, 'drivers': 0, 'unassigned': 0}
+        for branch, branch_lines in lines.grouped('branch_id').items():
+            if not branch:
+                # Without a branch there is no pool the lines may draw from
+                result['unassigned'] += len(branch_lines)
+                continue
+            for key, value in self._assign_branch_lines(branch, branch_lines, assign_vehicles, assign_drivers).items():
+                result[key] += value
+        _logger.info("Car booking auto-assign: %s", result)
+        return result
+
+    @api.model
+    def _assign_branch_lines(self, branch, lines, assign_vehicles, assign_drivers):
+        lines = lines.filtered(lambda line: line.start_date and line.end_date)
+        result = {'vehicles': 0, 'drivers': 0, 'unassigned': 0}
+        if not lines:
+            return result
+        origin = datetime.combine(min(lines.mapped('start_date')).date(), time.min)
+
+        if assign_vehicles:
+            vehicles = self._get_vehicle_pool(branch, lines.car_model_id)
+            resources = [(vehicle.id, vehicle.model_id.id) for vehicle in vehicles]
+            assigned, unassigned = self._assign(lines, 'fleet_vehicle_id', resources, origin, 'car_model_id')
+            result['vehicles'] = len(assigned)
+            result['unassigned'] += len(unassigned)
+
+        if assign_drivers:
+            resources = [(driver.id, None) for driver in self._get_driver_pool(branch)]
+            assigned, unassigned = self._assign(lines, 'driver_name', resources, origin)
+            result['drivers'] = len(assigned)
+            result['unassigned'] += len(unassigned)
+        return result
+
+
+class CarBookingLine(models.Model):
+    _inherit = 'car.booking.line'
+
+    def action_auto_assign(self):
+        """Auto-assign vehicles and drivers of their branch to the selected lines"""
+        result = self.env['car.booking.auto.assign'].assign_lines(self)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Auto Assignment',
+                'message': f"Assigned {result['vehicles']} vehicles and {result['drivers']} drivers. "
+                           f"{result['unassigned']} assignments could not be made.",
+                'type': 'success' if not result['unassigned'] else 'warning',
+                'sticky': False,
+            }
+        }
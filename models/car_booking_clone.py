@@ -0,0 +1,158 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import models, fields
+from odoo.exceptions import UserError
+
+BOOKING_DATE_FIELDS = ['date_of_service', 'from_date', 'to_date', 'service_start_date', 'service_end_date']
+LINE_DATE_FIELDS = ['start_date', 'end_date']
+
+
+class CarBooking(models.Model):
+    _inherit = 'car.booking'
+
+    def _get_clone_reference_date(self):
+        """Day a booking is anchored on when cloning to target dates"""
+        self.ensure_one()
+        if self.date_of_service:
+            return self.date_of_service
+        starts = [start for start in self.car_booking_lines.mapped('start_date') if start]
+        if starts:
+            return min(starts).date()
+        return self.from_date or fields.Date.to_date(self.create_date)
+
+    def _prepare_clone_vals(self, shift):
+        self.ensure_one()
+        vals = self.copy_data({
+            'name': 'New',
+            'state': 'draft',
+            'reservation_status': 'created',
+            'trip_profile_id': False,
+            'sale_order_id': False,
+            'attachment_ids': [(5, 0, 0)],
+        })[0]
+        for fname in BOOKING_DATE_FIELDS:
+            if self[fname]:
+                vals[fname] = self[fname] + shift
+        return vals
+
+    def _prepare_clone_line_vals(self, line, booking_id, shift):
+        vals = line.copy_data({
+            'car_booking_id': booking_id,
+            'trip_vehicle_line_id': False,
+        })[0]
+        for fname in LINE_DATE_FIELDS:
+            if line[fname]:
+                vals[fname] = line[fname] + shift
+        return vals
+
+    def _clone_attachments(self, sources, clones):
+        """Give every clone its own copy of its source's attachments, in one create()"""
+        vals_list = []
+        for (booking, shift), clone in zip(sources, clones):
+            vals_list += [
+                dict(vals, res_model='car.booking', res_id=clone.id)
+                for vals in booking.attachment_ids.copy_data()
+            ]
+        attachments_by_clone = defaultdict(list)
+        for attachment in self.env['ir.attachment'].create(vals_list):
+            attachments_by_clone[attachment.res_id].append(attachment.id)
+        for clone in clones:
+            if attachments_by_clone[clone.id]:
+                clone.attachment_ids = [(6, 0, attachments_by_clone[clone.id])]
+
+    def clone_bookings(self, shifts, check_availability=False):
+        """Copy every booking with its lines once per shift (timedelta or days).
+
+        Bookings and lines are each created with one batched create(); the
+        new bookings get their references from one sequence block. Each
+        clone gets its own copy of the attachments, so deleting or editing
+        one on a clone leaves the original alone. With check_availability,
+        the copies are rejected if a vehicle or driver is already busy in a
+        new window.
+        """
+        shifts = [shift if isinstance(shift, timedelta) else timedelta(days=shift) for shift in shifts]
+        if not self or not shifts:
+            return self.browse()
+        sources = [(booking, shift) for shift in shifts for booking in self]
+        clones = self.create([booking._prepare_clone_vals(shift) for booking, shift in sources])
+
+        line_vals_list = []
+        for (booking, shift), clone in zip(sources, clones):
+            line_vals_list += [self._prepare_clone_line_vals(line, clone.id, shift) for line in booking.car_booking_lines]
+        lines = self.env['car.booking.line'].create(line_vals_list)
+        self._clone_attachments(sources, clones)
+        if check_availability:
+            lines._check_availability()
+        return clones
+
+    def clone_to_dates(self, target_dates, check_availability=False):
+        """Clone the bookings so the earliest of them falls on each target date; the others keep their offset"""
+        anchor = min(booking._get_clone_reference_date() for booking in self)
+        shifts = [fields.Date.to_date(target) - anchor for target in target_dates]
+        return self.clone_bookings(shifts, check_availability=check_availability)
+
+    def duplicate_booking(self):
+        self.ensure_one()
+        new_booking = self.clone_bookings([0])
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'car.booking',
+            'view_mode': 'form',
+            'res_id': new_booking.id,
+            'target': 'current',
+        }
+
+    def action_open_clone_wizard(self):
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Clone Bookings',
+            'res_model': 'car.booking.clone.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {'default_booking_ids': self.ids},
+        }
+
+
+class CarBookingCloneWizard(models.TransientModel):
+    _name = 'car.booking.clone.wizard'
+    _description = 'Clone Car Bookings'
+
+    booking_ids = fields.Many2many('car.booking', string='Bookings', required=True)
+    mode = fields.Selection([
+        ('date', 'From a Date'),
+        ('shift', 'Shift by Days'),
+    ], string='Schedule', default='date', required=True)
+    target_date = fields.Date(
+        string='First Date',
+        help="Date the earliest selected booking is copied to; the others keep their offset."
+    )
+    shift_days = fields.Integer(string='Shift (Days)', default=7)
+    interval_days = fields.Integer(string='Repeat Every (Days)', default=7)
+    occurrences = fields.Integer(string='Copies', default=1)
+    check_availability = fields.Boolean(
+        string='Check Vehicle Availability',
+        default=True,
+        help="Refuse the copies if an assigned vehicle or driver is busy in a new window."
+    )
+
+    def action_clone(self):
+        self.ensure_one()
+        if self.occurrences < 1:
+            raise UserError("Make at least one copy.")
+        if self.mode == 'date':
+            if not self.target_date:
+                raise UserError("Set the date of the first copy.")
+            target_dates = [self.target_date + timedelta(days=self.interval_days * i) for i in range(self.occurrences)]
+            clones = self.booking_ids.clone_to_dates(target_dates, check_availability=self.check_availability)
+        else:
+            shifts = [self.shift_days + self.interval_days * i for i in range(self.occurrences)]
+            clones = self.booking_ids.clone_bookings(shifts, check_availability=self.check_availability)
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Cloned Bookings',
+            'res_model': 'car.booking',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', clones.ids)],
+            'target': 'current',
+        }
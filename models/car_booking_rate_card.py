@@ -0,0 +1,197 @@
+import itertools
+
+from odoo import models, fields, api, tools
+
+# Match keys in decreasing order of specificity: a card matching the customer
+# beats one matching the car model, and so on. (card field, line value getter)
+RATE_CARD_KEYS = [
+    ('partner_id', lambda line: line.car_booking_id.customer_name.id),
+    ('car_model_id', lambda line: line.car_model_id.id),
+    ('year_car_brand_and_type_id', lambda line: line.car_booking_id.year_car_brand_and_type_id.id),
+    ('city_id', lambda line: line.car_booking_id.city.id),
+    ('region', lambda line: line.car_booking_id.region),
+    ('business_type', lambda line: line.car_booking_id.business_type),
+    ('full_day_type', lambda line: line.car_booking_id.full_day_type),
+]
+RATE_CARD_FIELDS = [key for key, _getter in RATE_CARD_KEYS]
+
+_cache_generations = itertools.count(1)
+
+
+class CarBookingRateCard(models.Model):
+    _name = 'car.booking.rate.card'
+    _description = 'Car Booking Rate Card'
+    _order = 'type_of_service_id, sequence, id'
+
+    name = fields.Char(string='Name')
+    active = fields.Boolean(default=True)
+    sequence = fields.Integer(string='Sequence', default=10)
+    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
+
+    type_of_service_id = fields.Many2one('type.of.service', string='Type of Service', required=True, index=True)
+    car_model_id = fields.Many2one('fleet.vehicle.model', string='Car Model')
+    year_car_brand_and_type_id = fields.Many2one('year.car.brand.and.type', string='Car Brand_And Type')
+    city_id = fields.Many2one('booking.city', string='City')
+    region = fields.Selection([
+        ('north', 'North'),
+        ('south', 'South'),
+        ('west', 'West'),
+        ('east', 'East'),
+        ('central', 'Central'),
+    ], string='Region')
+    business_type = fields.Selection([
+        ('corporate', 'Corporate'),
+        ('hotels', 'Hotels'),
+        ('government', 'Government'),
+        ('individuals', 'Individuals'),
+        ('rental', 'Rental'),
+        ('others', 'Others'),
+    ], string='Business Type')
+    partner_id = fields.Many2one('res.partner', string='Customer')
+    full_day_type = fields.Selection([
+        ('6hour', '6 Hour'),
+        ('12hour', '12 Hour'),
+        ('24hour', '24 Hour'),
+    ], string='Full Day Type')
+    date_from = fields.Date(string='Valid From')
+    date_to = fields.Date(string='Valid To')
+
+    unit_price = fields.Float(string='Price', required=True)
+    extra_hour_charges = fields.Float(string='Extra Hour Charges')
+
+    _sql_constraints = [
+        ('date_range_check', 'CHECK (date_to IS NULL OR date_from IS NULL OR date_to >= date_from)',
+         'Valid To cannot be earlier than Valid From.'),
+    ]
+
+    def init(self):
+        # Candidate lookup is always by service type (and usually car model) among active cards
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS car_booking_rate_card_lookup_idx
+                ON car_booking_rate_card (type_of_service_id, car_model_id, date_from, date_to)
+             WHERE active
+        """)
+
+    @api.model
+    @tools.ormcache('service_type_id')
+    def _get_service_type_cards(self, service_type_id):
+        """Active cards of one service type as plain tuples, most specific first"""
+        self.env.cr.execute("""
+            SELECT id, company_id, date_from, date_to, unit_price, extra_hour_charges, {}
+              FROM car_booking_rate_card
+             WHERE active AND type_of_service_id = %s
+          ORDER BY sequence, id
+        """.format(', '.join(RATE_CARD_FIELDS)), (service_type_id,))
+        cards = self.env.cr.fetchall()
+        key_count = len(RATE_CARD_FIELDS)
+        # More specific cards (set keys, earlier keys weigh more) come first
+        return tuple(sorted(cards, key=lambda card: tuple(card[6 + i] is None for i in range(key_count))))
+
+    @api.model
+    @tools.ormcache()
+    def _get_cache_generation(self):
+        """Number that changes whenever the cards do (every change clears the ormcache),
+        for caches kept outside of it"""
+        return next(_cache_generations)
+
+    @api.model
+    def _match_card(self, service_type_id, company_id, date, key_values):
+        for card in self._get_service_type_cards(service_type_id):
+            card_company, date_from, date_to = card[1], card[2], card[3]
+            if card_company and company_id and card_company != company_id:
+                continue
+            if date and ((date_from and date < date_from) or (date_to and date > date_to)):
+                continue
+            if all(card_value is None or card_value == value
+                   for card_value, value in zip(card[6:], key_values)):
+                return card
+        return None
+
+    @api.model
+    def resolve_prices(self, lines):
+        """{line id: (unit_price, extra_hour_charges)} for lines that have a matching card.
+
+        Lines sharing the same match keys are resolved once (per-call memo)
+        and each service type's cards are loaded once, then kept in the
+        ormcache until a card changes.
+        """
+        lines.car_booking_id.mapped('customer_name')
+        memo = {}
+        result = {}
+        for line in lines:
+            if not line.type_of_service_id:
+                continue
+            booking = line.car_booking_id
+            date = (line.start_date and line.start_date.date()) or booking.date_of_service
+            key_values = tuple(getter(line) or None for _field, getter in RATE_CARD_KEYS)
+            memo_key = (line.type_of_service_id.id, booking.company_id.id, date, key_values)
+            if memo_key not in memo:
+                memo[memo_key] = self._match_card(line.type_of_service_id.id, booking.company_id.id, date, key_values)
+            card = memo[memo_key]
+            if card:
+                result[line.id] = (card[4], card[5] or 0.0)
+            elif line.fleet_vehicle_id.rental_price:
+                result[line.id] = (line.fleet_vehicle_id.rental_price, line.extra_hour_charges or 0.0)
+        return result
+
+    @api.model
+    def price_lines(self, lines, overwrite=False):
+        """Price lines from the rate cards, writing once per distinct price pair"""
+        if not overwrite:
+            lines = lines.filtered(lambda line: not line.unit_price)
+        lines_by_price = {}
+        for line_id, prices in self.resolve_prices(lines).items():
+            lines_by_price.setdefault(prices, []).append(line_id)
+        for (unit_price, extra_hour_charges), line_ids in lines_by_price.items():
+            self.env['car.booking.line'].browse(line_ids).write({
+                'unit_price': unit_price,
+                'extra_hour_charges': extra_hour_charges,
+            })
+        return sum(len(line_ids) for line_ids in lines_by_price.values())
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
+
+
+class CarBookingLine(models.Model):
+    _inherit = 'car.booking.line'
+
+    @api.onchange('type_of_service_id', 'car_model_id', 'start_date')
+    def _onchange_rate_card_price(self):
+        """Suggest the rate card price while the line has no price yet"""
+        if self.unit_price or not self.type_of_service_id:
+            return
+        prices = self.env['car.booking.rate.card'].resolve_prices(self)
+        if self.id in prices:
+            self.unit_price, self.extra_hour_charges = prices[self.id]
+
+
+class CarBooking(models.Model):
+    _inherit = 'car.booking'
+
+    def action_apply_rate_cards(self):
+        """Reprice every line of the bookings from the rate cards"""
+        count = self.env['car.booking.rate.card'].price_lines(self.car_booking_lines, overwrite=True)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Rate Cards',
+                'message': f'Priced {count} booking lines from rate cards.',
+                'type': 'success' if count else 'warning',
+                'sticky': False,
+            }
+        }
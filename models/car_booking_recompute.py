@@ -0,0 +1,215 @@
+import logging
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 20000
+DEFAULT_SAMPLE_SIZE = 200
+TOLERANCE = 0.01
+
+LINE_FIELDS = ['duration', 'total_hours', 'extra_hour_total_amount', 'amount']
+BOOKING_FIELDS = [
+    'duration', 'total_tax', 'without_vat_price', 'vat',
+    'extra_hour_total', 'extra_hour_charges_total', 'amount_total',
+]
+
+
+class CarBookingRecompute(models.AbstractModel):
+    """Set-wise recompute of the stored amounts of bookings and booking lines.
+
+    Meant for after imports and migrations, from a shell:
+        env['car.booking.recompute'].recompute_stored_fields(commit=True)
+    Each UPDATE mirrors the rules of booking_kernel used by the Python computes.
+    """
+    _name = 'car.booking.recompute'
+    _description = 'Car Booking Stored Fields Recompute'
+
+    @api.model
+    def _id_chunks(self, table, chunk_size):
+        self.env.cr.execute(f"SELECT MIN(id), MAX(id) FROM {table}")
+        min_id, max_id = self.env.cr.fetchone()
+        if min_id is None:
+            return
+        for start in range(min_id, max_id + 1, chunk_size):
+            yield start, start + chunk_size
+
+    @api.model
+    def _recompute_lines_sql(self, start, stop):
+        """Line duration (inclusive days), total hours, extra hour total and amount"""
+        self.env.cr.execute("""
+            UPDATE car_booking_line l
+               SET duration = v.duration,
+                   total_hours = v.total_hours,
+                   extra_hour_total_amount = v.extra_total,
+                   amount = v.amount
+              FROM (
+                    SELECT d.id, d.duration, d.total_hours, d.extra_total,
+                           COALESCE(NULLIF(d.qty, 0), 1) * COALESCE(d.unit_price, 0)
+                               * COALESCE(NULLIF(d.duration, 0), 1) + d.extra_total AS amount
+                      FROM (
+                            SELECT id, qty, unit_price,
+                                   CASE WHEN start_date IS NULL OR end_date IS NULL THEN 0
+                                        ELSE GREATEST(end_date::date - start_date::date + 1, 1)
+                                   END AS duration,
+                                   CASE WHEN start_date IS NULL OR end_date IS NULL THEN 0
+                                        ELSE EXTRACT(EPOCH FROM end_date - start_date) / 3600.0
+                                   END AS total_hours,
+                                   COALESCE(extra_hour, 0) * COALESCE(extra_hour_charges, 0) AS extra_total
+                              FROM car_booking_line
+                             WHERE id >= %s AND id < %s
+                           ) d
+                   ) v
+             WHERE l.id = v.id
+               AND (l.duration IS DISTINCT FROM v.duration
+                    OR l.total_hours IS DISTINCT FROM v.total_hours
+                    OR l.extra_hour_total_amount IS DISTINCT FROM v.extra_total
+                    OR l.amount IS DISTINCT FROM v.amount)
+        """, (start, stop))
+        return self.env.cr.rowcount
+
+    @api.model
+    def _recompute_bookings_sql(self, start, stop):
+        """Booking totals from already recomputed lines, percentage VAT only.
+
+        Returns (updated row count, ids of bookings with non-percentage taxes),
+        the latter being left to the ORM.
+        """
+        tax_field = self.env['car.booking.line']._fields['tax_ids']
+        self.env.cr.execute(f"""
+            WITH line_tax AS (
+                SELECT l.id, l.car_booking_id, l.amount, l.duration, l.extra_hour, l.extra_hour_charges,
+                       COALESCE(SUM(t.amount) FILTER (WHERE t.amount_type = 'percent'), 0) AS percent,
+                       COALESCE(BOOL_OR(t.amount_type != 'percent'), false) AS other_taxes
+                  FROM car_booking_line l
+             LEFT JOIN {tax_field.relation} r ON r.{tax_field.column1} = l.id
+             LEFT JOIN account_tax t ON t.id = r.{tax_field.column2} AND t.active
+                 WHERE l.car_booking_id >= %s AND l.car_booking_id < %s
+              GROUP BY l.id
+            ), totals AS (
+                SELECT car_booking_id AS id,
+                       SUM(COALESCE(duration, 0)) AS duration,
+                       SUM(COALESCE(amount, 0)) AS untaxed,
+                       SUM(CASE WHEN amount > 0 THEN amount * percent / 100.0 ELSE 0 END) AS tax,
+                       SUM(CASE WHEN extra_hour > 0 THEN extra_hour ELSE 0 END) AS hours,
+                       SUM(CASE WHEN extra_hour > 0 AND extra_hour_charges != 0
+                                THEN extra_hour_charges ELSE 0 END) AS charges,
+                       BOOL_OR(other_taxes) AS other_taxes
+                  FROM line_tax
+              GROUP BY car_booking_id
+            ), computed AS (
+                SELECT b.id,
+                       COALESCE(s.duration, 0) AS duration,
+                       COALESCE(s.untaxed, 0) AS untaxed,
+                       COALESCE(ROUND((s.tax / c.rounding)::numeric) * c.rounding, 0) AS tax,
+                       COALESCE(s.hours, 0) AS hours,
+                       COALESCE(s.charges, 0) AS charges,
+                       COALESCE(b.mis_charges, 0) AS mis_charges,
+                       COALESCE(s.other_taxes, false) AS other_taxes
+                  FROM car_booking b
+             LEFT JOIN totals s ON s.id = b.id
+             LEFT JOIN res_currency c ON c.id = b.currency_id
+                 WHERE b.id >= %s AND b.id < %s
+            ), updated AS (
+                UPDATE car_booking b
+                   SET duration = v.duration,
+                       without_vat_price = v.untaxed,
+                       total_tax = v.tax,
+                       vat = v.tax,
+                       extra_hour_total = v.hours,
+                       extra_hour_charges_total = v.charges,
+                       amount_total = v.untaxed + v.tax + v.mis_charges
+                  FROM computed v
+                 WHERE b.id = v.id
+                   AND NOT v.other_taxes
+                   AND (b.duration IS DISTINCT FROM v.duration
+                        OR b.without_vat_price IS DISTINCT FROM v.untaxed
+                        OR b.total_tax IS DISTINCT FROM v.tax
+                        OR b.vat IS DISTINCT FROM v.tax
+                        OR b.extra_hour_total IS DISTINCT FROM v.hours
+                        OR b.extra_hour_charges_total IS DISTINCT FROM v.charges
+                        OR b.amount_total IS DISTINCT FROM v.untaxed + v.tax + v.mis_charges)
+             RETURNING b.id
+            )
+            SELECT (SELECT COUNT(*) FROM updated),
+                   ARRAY(SELECT id FROM computed WHERE other_taxes)
+        """, (start, stop, start, stop))
+        count, orm_ids = self.env.cr.fetchone()
+        return count, orm_ids
+
+    @api.model
+    def _recompute_with_orm(self, records, fnames):
+        for fname in fnames:
+            self.env.add_to_compute(records._fields[fname], records)
+        records.flush_recordset(fnames)
+
+    @api.model
+    def recompute_stored_fields(self, chunk_size=DEFAULT_CHUNK_SIZE, sample_size=DEFAULT_SAMPLE_SIZE, commit=False):
+        """Recompute stored line and booking amounts in chunked UPDATEs, then verify a sample"""
+        Line = self.env['car.booking.line']
+        Booking = self.env['car.booking']
+        self.env.flush_all()
+
+        line_count = 0
+        for start, stop in self._id_chunks('car_booking_line', chunk_size):
+            line_count += self._recompute_lines_sql(start, stop)
+            if commit:
+                self.env.cr.commit()
+        Line.invalidate_model(LINE_FIELDS)
+
+        booking_count = 0
+        orm_ids = []
+        for start, stop in self._id_chunks('car_booking', chunk_size):
+            count, chunk_orm_ids = self._recompute_bookings_sql(start, stop)
+            booking_count += count
+            orm_ids += chunk_orm_ids
+            if commit:
+                self.env.cr.commit()
+        Booking.invalidate_model(BOOKING_FIELDS)
+
+        # Fixed, division or group taxes go through compute_all(), so leave those to the ORM
+        for start in range(0, len(orm_ids), 1000):
+            self._recompute_with_orm(Booking.browse(orm_ids[start:start + 1000]), BOOKING_FIELDS)
+            if commit:
+                self.env.cr.commit()
+
+        result = {
+            'lines_updated': line_count,
+            'bookings_updated': booking_count,
+            'bookings_via_orm': len(orm_ids),
+            'line_mismatches': self._verify_sample(Line, LINE_FIELDS, sample_size),
+            'booking_mismatches': self._verify_sample(Booking, BOOKING_FIELDS, sample_size),
+        }
+        if commit:
+            self.env.cr.commit()
+        _logger.info("Car booking recompute: %s lines, %s bookings updated (%s via ORM), %s/%s mismatches in sample",
+                     line_count, booking_count, len(orm_ids),
+                     len(result['line_mismatches']), len(result['booking_mismatches']))
+        return result
+
+    @api.model
+    def _verify_sample(self, model, fnames, sample_size):
+        """Compare stored values of random records with the ORM compute.
+
+        Returns [(id, field, stored, computed)]; the ORM value is written back.
+        """
+        if not sample_size:
+            return []
+        self.env.cr.execute(f"SELECT id FROM {model._table} ORDER BY random() LIMIT %s", (sample_size,))
+        records = model.browse([row[0] for row in self.env.cr.fetchall()])
+        stored = {row['id']: row for row in records.read(fnames, load=False)}
+        records.invalidate_recordset(fnames)
+        for fname in fnames:
+            self.env.add_to_compute(model._fields[fname], records)
+
+        mismatches = []
+        for record in records:
+            for fname in fnames:
+                computed = record[fname] or 0.0
+                if abs(computed - (stored[record.id][fname] or 0.0)) > TOLERANCE:
+                    mismatches.append((record.id, fname, stored[record.id][fname], computed))
+        for mismatch in mismatches:
+            _logger.warning("Car booking recompute: %s %s.%s stored %s, computed %s",
+                            model._name, mismatch[0], mismatch[1], mismatch[2], mismatch[3])
+        records.flush_recordset(fnames)
+        return mismatches
@@ -0,0 +1,77 @@
+import re
+
+from odoo import models, fields, api
+from odoo.tools import SQL, escape_psql
+
+# Booking fields and partner names folded into the search document
+SEARCH_DOCUMENT_FIELDS = [
+    'name', 'flight_number', 'hotel_room_number', 'customer_ref_number',
+    'mobile', 'guest_phone', 'location_from', 'location_to',
+]
+PHONE_FIELDS = ['mobile', 'guest_phone']
+
+
+class CarBooking(models.Model):
+    _inherit = 'car.booking'
+
+    search_document = fields.Text(
+        string='Search Document',
+        compute='_compute_search_document',
+        store=True,
+        index='trigram',
+        help="Denormalized text searched by the Quick search filter."
+    )
+    quick_search = fields.Char(
+        string='Quick Search',
+        compute='_compute_quick_search',
+        search='_search_quick_search',
+    )
+
+    def init(self):
+        super().init()
+        # Word index next to the trigram index on search_document: the generated
+        # column follows every write of the document, so both stay in sync.
+        self.env.cr.execute("""
+            ALTER TABLE car_booking
+                ADD COLUMN IF NOT EXISTS search_tsv tsvector
+                GENERATED ALWAYS AS (to_tsvector('simple', COALESCE(search_document, ''))) STORED
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS car_booking_search_tsv_idx
+                ON car_booking USING gin (search_tsv)
+        """)
+
+    @api.depends(*SEARCH_DOCUMENT_FIELDS, 'customer_name.name', 'guest_name.name')
+    def _compute_search_document(self):
+        for booking in self:
+            terms = [booking[fname] for fname in SEARCH_DOCUMENT_FIELDS]
+            terms += [booking.customer_name.name, booking.guest_name.name]
+            # Digits-only phones so "0501234567" finds "+966 50 123 4567"
+            terms += [re.sub(r'\D', '', booking[fname]) for fname in PHONE_FIELDS if booking[fname]]
+            booking.search_document = ' '.join(term.strip().lower() for term in terms if term and term.strip()) or False
+
+    def _compute_quick_search(self):
+        self.quick_search = False
+
+    def _search_quick_search(self, operator, value):
+        """Every word must match the document.
+
+        Plain words must start a word of the document and only use the word
+        index ("0501" finds "0501234567", "4567" does not). The text parser
+        splits words with punctuation ("sv-1234", "+966") differently, so
+        those are matched anywhere in the document through the trigram index.
+        """
+        if operator not in ('ilike', '=') or not isinstance(value, str):
+            return [('search_document', operator, value)]
+        words = value.lower().split()
+        if not words:
+            return []
+        query = self.with_context(active_test=False)._search([])
+        document = SQL.identifier(query.table, 'search_document')
+        tsv = SQL.identifier(query.table, 'search_tsv')
+        for word in words:
+            if re.sub(r'[\W_]', '', word) == word:
+                query.add_where(SQL("%s @@ to_tsquery('simple', %s)", tsv, f"{word}:*"))
+            else:
+                query.add_where(SQL("%s ILIKE %s", document, f"%{escape_psql(word)}%"))
+        return [('id', 'in', query)]
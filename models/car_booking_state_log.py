@@ -0,0 +1,158 @@
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import UserError
+
+LOGGED_FIELDS = [
+    ('state', 'Trip Status'),
+    ('reservation_status', 'Reservation Status'),
+]
+# Trip statuses a booking normally stays in: the time spent there is not counted
+TERMINAL_STATES = ('invoiced', 'cancelled')
+
+
+class CarBookingStateLog(models.Model):
+    """Append-only history of booking status changes, written in bulk with plain INSERTs"""
+    _name = 'car.booking.state.log'
+    _description = 'Car Booking State Transition'
+    _order = 'timestamp desc, id desc'
+    _log_access = False
+
+    booking_id = fields.Many2one('car.booking', string='Booking', index=True, ondelete='set null', readonly=True)
+    # Denormalized so the history survives archiving of the booking: booking_id
+    # is emptied then, booking_ref keeps the id (the archive's original_booking_id)
+    booking_ref = fields.Integer(string='Booking ID', readonly=True, index=True)
+    branch_id = fields.Many2one('res.company', string='Branch', readonly=True)
+    booking_create_date = fields.Datetime(string='Booking Created On', readonly=True)
+    field_name = fields.Selection(LOGGED_FIELDS, string='Field', required=True, readonly=True)
+    from_state = fields.Char(string='From', readonly=True)
+    to_state = fields.Char(string='To', required=True, readonly=True)
+    user_id = fields.Many2one('res.users', string='User', readonly=True)
+    timestamp = fields.Datetime(string='Timestamp', required=True, readonly=True)
+
+    def init(self):
+        # Rows arrive in time order, so a BRIN index stays tiny and serves range scans
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS car_booking_state_log_timestamp_brin
+                ON car_booking_state_log USING brin (timestamp)
+        """)
+        # Rows logged before booking_ref existed, while their booking is still there
+        self.env.cr.execute("""
+            UPDATE car_booking_state_log
+               SET booking_ref = booking_id
+             WHERE booking_ref IS NULL
+               AND booking_id IS NOT NULL
+        """)
+
+    @api.model
+    def _log_transitions(self, transitions, timestamp=None):
+        """Insert [(booking id, field name, from state, to state)] in one statement"""
+        transitions = [row for row in transitions if row[2] != row[3]]
+        if not transitions:
+            return 0
+        timestamp = timestamp or fields.Datetime.now()
+        execute_values(self.env.cr._obj, """
+            INSERT INTO car_booking_state_log
+                   (booking_id, booking_ref, branch_id, booking_create_date, field_name, from_state, to_state,
+                    user_id, timestamp)
+            SELECT b.id, b.id, b.branch_id, b.create_date, v.field_name, v.from_state, v.to_state, v.user_id, v.timestamp
+              FROM (VALUES %s) AS v(booking_id, field_name, from_state, to_state, user_id, timestamp)
+              JOIN car_booking b ON b.id = v.booking_id
+        """, [row + (self.env.uid, timestamp) for row in transitions])
+        return len(transitions)
+
+    def write(self, vals):
+        raise UserError("Booking state history cannot be modified.")
+
+    def unlink(self):
+        raise UserError("Booking state history cannot be deleted.")
+
+
+class CarBookingStateReport(models.Model):
+    """Time spent in each trip status and confirmation latency, per branch"""
+    _name = 'car.booking.state.report'
+    _description = 'Car Booking State SLA Report'
+    _auto = False
+    _order = 'date_from desc'
+
+    booking_id = fields.Many2one('car.booking', string='Booking', readonly=True)
+    booking_ref = fields.Integer(string='Booking ID', readonly=True)
+    branch_id = fields.Many2one('res.company', string='Branch', readonly=True)
+    state = fields.Selection(selection=lambda self: self.env['car.booking']._fields['state'].selection,
+                             string='Trip Status', readonly=True)
+    user_id = fields.Many2one('res.users', string='Changed By', readonly=True)
+    date_from = fields.Datetime(string='Entered On', readonly=True)
+    date_to = fields.Datetime(string='Left On', readonly=True)
+    hours_in_state = fields.Float(string='Hours in State', readonly=True, aggregator='avg')
+    confirm_latency_hours = fields.Float(string='Confirm Latency (Hours)', readonly=True, aggregator='avg')
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                SELECT l.id,
+                       l.booking_id,
+                       l.booking_ref,
+                       l.branch_id,
+                       l.to_state AS state,
+                       l.user_id,
+                       l.timestamp AS date_from,
+                       LEAD(l.timestamp) OVER booking_history AS date_to,
+                       -- Still running for the current status, unless it is terminal
+                       CASE WHEN LEAD(l.timestamp) OVER booking_history IS NOT NULL
+                            THEN EXTRACT(EPOCH FROM LEAD(l.timestamp) OVER booking_history - l.timestamp) / 3600.0
+                            WHEN l.to_state NOT IN %(terminal_states)s
+                            THEN EXTRACT(EPOCH FROM (NOW() AT TIME ZONE 'UTC') - l.timestamp) / 3600.0
+                       END AS hours_in_state,
+                       CASE WHEN l.to_state = 'confirm' AND l.booking_create_date IS NOT NULL
+                            THEN EXTRACT(EPOCH FROM l.timestamp - l.booking_create_date) / 3600.0
+                       END AS confirm_latency_hours
+                  FROM car_booking_state_log l
+                 WHERE l.field_name = 'state'
+                   AND l.booking_ref IS NOT NULL
+                WINDOW booking_history AS (PARTITION BY l.booking_ref ORDER BY l.timestamp, l.id)
+            )
+        """, {'terminal_states': TERMINAL_STATES})
+
+
+class CarBooking(models.Model):
+    _inherit = 'car.booking'
+
+    def _get_logged_states(self):
+        return {booking.id: (booking.state, booking.reservation_status) for booking in self}
+
+    def _log_state_changes(self, before):
+        transitions = []
+        for booking in self:
+            old_state, old_status = before[booking.id]
+            transitions.append((booking.id, 'state', old_state, booking.state))
+            transitions.append((booking.id, 'reservation_status', old_status, booking.reservation_status))
+        self.flush_recordset(['state', 'reservation_status'])
+        self.env['car.booking.state.log']._log_transitions(transitions)
+
+    def action_confirm(self):
+        before = self._get_logged_states()
+        result = super().action_confirm()
+        self._log_state_changes(before)
+        return result
+
+    def action_cancel(self):
+        before = self._get_logged_states()
+        result = super().action_cancel()
+        self._log_state_changes(before)
+        return result
+
+    def action_reset_draft(self):
+        before = self._get_logged_states()
+        result = super().action_reset_draft()
+        self._log_state_changes(before)
+        return result
+
+    @api.model
+    def _advance_reservation_status(self, to_status, condition, now):
+        moved = super()._advance_reservation_status(to_status, condition, now)
+        self.env['car.booking.state.log']._log_transitions(
+            [(booking_id, 'reservation_status', old_status, to_status) for booking_id, old_status in moved],
+            timestamp=now,
+        )
+        return moved
@@ -0,0 +1,139 @@
+from odoo import models, fields, api
+from odoo.exceptions import AccessError, ValidationError
+
+# Color index (web client palette) of each booking state on the timeline
+STATE_COLORS = {
+    'draft': 0,
+    'request': 3,
+    'confirm': 4,
+    'scheduled': 2,
+    'departed': 1,
+    'completed': 10,
+    'invoiced': 7,
+    'cancelled': 9,
+}
+
+TIMELINE_RESOURCES = {
+    'vehicle': 'fleet_vehicle_id',
+    'driver': 'driver_name',
+}
+
+# Lines intersecting [start, stop), served by the GiST period index
+TIMELINE_QUERY = """
+    SELECT l.id, l.car_booking_id, l.fleet_vehicle_id, l.driver_name,
+           l.start_date, l.end_date, b.state
+      FROM car_booking_line l
+      JOIN car_booking b ON b.id = l.car_booking_id
+     WHERE tsrange(l.start_date, l.end_date) && tsrange(%(start)s, %(stop)s)
+       AND l.start_date <= l.end_date
+       AND b.state != 'cancelled'
+       AND l.branch_id = ANY(%(branch_ids)s)
+  ORDER BY l.start_date, l.id
+"""
+
+CONFLICT_QUERY = """
+    SELECT m.id, o.id
+      FROM car_booking_line m
+      JOIN car_booking_line o
+        ON o.id != m.id
+       AND tsrange(o.start_date, o.end_date) && tsrange(m.start_date, m.end_date)
+       AND o.start_date <= o.end_date
+       AND (o.fleet_vehicle_id = m.fleet_vehicle_id OR o.driver_name = m.driver_name)
+      JOIN car_booking b ON b.id = o.car_booking_id AND b.state != 'cancelled'
+     WHERE m.id IN %s
+       AND m.start_date <= m.end_date
+  ORDER BY m.id, o.id
+"""
+
+
+class CarBookingLine(models.Model):
+    _inherit = 'car.booking.line'
+
+    def init(self):
+        super().init()
+        # Timeline and availability checks look for lines overlapping a period
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS car_booking_line_period_idx
+                ON car_booking_line USING gist (tsrange(start_date, end_date))
+             WHERE start_date <= end_date
+        """)
+
+    @api.model
+    def get_timeline(self, start, stop, resource='vehicle', branch_id=None):
+        """Lines intersecting [start, stop) as compact rows for a timeline per vehicle or driver.
+
+        Lines of branch_id, or of every branch the user is allowed in when
+        it is not given. Returns {'resources': [[id, name], ...], 'lines':
+        [[id, booking id, vehicle id, driver id, start, end, color], ...]}.
+        """
+        self.check_access('read')
+        if resource not in TIMELINE_RESOURCES:
+            raise ValidationError(f"Unknown timeline resource '{resource}'.")
+        allowed_branch_ids = self.env.user.company_ids.ids
+        if branch_id:
+            if int(branch_id) not in allowed_branch_ids:
+                raise AccessError("You are not allowed to see the timeline of this branch.")
+            branch_ids = [int(branch_id)]
+        else:
+            branch_ids = allowed_branch_ids
+        self.env.cr.execute(TIMELINE_QUERY, {
+            'start': fields.Datetime.to_datetime(start),
+            'stop': fields.Datetime.to_datetime(stop),
+            'branch_ids': branch_ids,
+        })
+        lines = []
+        resource_ids = set()
+        resource_index = 2 if resource == 'vehicle' else 3
+        for line_id, booking_id, vehicle_id, driver_id, line_start, line_end, state in self.env.cr.fetchall():
+            lines.append([
+                line_id, booking_id, vehicle_id or False, driver_id or False,
+                fields.Datetime.to_string(line_start), fields.Datetime.to_string(line_end),
+                STATE_COLORS.get(state, 0),
+            ])
+            if lines[-1][resource_index]:
+                resource_ids.add(lines[-1][resource_index])
+        comodel = self.env[self._fields[TIMELINE_RESOURCES[resource]].comodel_name]
+        resources = [[record.id, record.display_name] for record in comodel.browse(sorted(resource_ids))]
+        return {'resources': resources, 'lines': lines}
+
+    def _get_availability_conflicts(self):
+        """{line id: [ids of other lines using the same vehicle or driver at the same time]}"""
+        if not self:
+            return {}
+        self.flush_recordset(['start_date', 'end_date', 'fleet_vehicle_id', 'driver_name'])
+        self.env.cr.execute(CONFLICT_QUERY, (tuple(self.ids),))
+        conflicts = {}
+        for line_id, other_id in self.env.cr.fetchall():
+            conflicts.setdefault(line_id, []).append(other_id)
+        return conflicts
+
+    def _check_availability(self):
+        conflicts = self._get_availability_conflicts()
+        if conflicts:
+            messages = []
+            for line in self.browse(list(conflicts)):
+                others = self.browse(conflicts[line.id])
+                messages.append(f"{line.display_name}: overlaps {', '.join(others.mapped('display_name'))}")
+            raise ValidationError("The vehicle or driver is not available:\n" + '\n'.join(messages))
+
+    def write(self, vals):
+        result = super().write(vals)
+        # Set by the calendar and timeline so drag-and-drop cannot double-book
+        if self.env.context.get('check_availability') and \
+                {'start_date', 'end_date', 'fleet_vehicle_id', 'driver_name'} & set(vals):
+            self._check_availability()
+        return result
+
+    def reschedule(self, start, end, vehicle_id=None, driver_id=None):
+        """Move a line on the timeline, rejecting it if the vehicle or driver is busy"""
+        self.ensure_one()
+        vals = {
+            'start_date': fields.Datetime.to_datetime(start),
+            'end_date': fields.Datetime.to_datetime(end),
+        }
+        if vehicle_id is not None:
+            vals['fleet_vehicle_id'] = vehicle_id or False
+        if driver_id is not None:
+            vals['driver_name'] = driver_id or False
+        self.with_context(check_availability=True).write(vals)
+        return True
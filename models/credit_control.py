@@ -0,0 +1,333 @@
+import logging
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Booking states whose amount is owed once confirmed and until invoiced
+EXPOSED_BOOKING_STATES = ('confirm', 'scheduled', 'departed', 'completed')
+DIRTY_PARTNERS_KEY = 'aw_car_booking.credit_exposure_dirty'
+RECOMPUTE_CHUNK_SIZE = 1000
+
+# Exposure of a set of commercial partners, upserted in one statement:
+# - confirmed bookings without a posted invoice,
+# - open quotations, unless a confirmed booking already counts them,
+# - residuals of posted customer invoices and credit notes.
+EXPOSURE_QUERY = """
+    WITH partners AS (
+        SELECT unnest(%(partner_ids)s::int[]) AS partner_id
+    ),
+    bookings AS (
+        SELECT p.commercial_partner_id AS partner_id, SUM(b.amount_total) AS amount
+          FROM car_booking b
+          JOIN res_partner p ON p.id = b.customer_name
+         WHERE p.commercial_partner_id = ANY(%(partner_ids)s)
+           AND b.state IN %(booking_states)s
+           AND b.id != ALL(%(exclude_booking_ids)s::int[])
+           AND NOT EXISTS (
+                   SELECT 1
+                     FROM account_move m
+                    WHERE (m.id = b.invoice_id OR m.car_booking_id = b.id)
+                      AND m.state = 'posted'
+               )
+      GROUP BY 1
+    ),
+    quotations AS (
+        SELECT p.commercial_partner_id AS partner_id, SUM(o.amount_total) AS amount
+          FROM sale_order o
+          JOIN res_partner p ON p.id = o.partner_id
+         WHERE p.commercial_partner_id = ANY(%(partner_ids)s)
+           AND o.state IN ('draft', 'sent')
+           AND o.id != ALL(%(exclude_order_ids)s::int[])
+           AND NOT EXISTS (
+                   SELECT 1
+                     FROM car_booking b
+                    WHERE (b.quotation_id = o.id OR b.sale_order_id = o.id)
+                      AND b.state IN %(booking_states)s
+               )
+      GROUP BY 1
+    ),
+    invoices AS (
+        SELECT m.commercial_partner_id AS partner_id, SUM(m.amount_residual_signed) AS amount
+          FROM account_move m
+         WHERE m.commercial_partner_id = ANY(%(partner_ids)s)
+           AND m.state = 'posted'
+           AND m.move_type IN ('out_invoice', 'out_refund')
+           AND m.amount_residual_signed != 0
+      GROUP BY 1
+    )
+    INSERT INTO car_booking_credit_exposure
+           (partner_id, booking_amount, quotation_amount, invoice_amount, total_amount, updated_at)
+    SELECT partners.partner_id,
+           COALESCE(bookings.amount, 0),
+           COALESCE(quotations.amount, 0),
+           COALESCE(invoices.amount, 0),
+           COALESCE(bookings.amount, 0) + COALESCE(quotations.amount, 0) + COALESCE(invoices.amount, 0),
+           NOW() AT TIME ZONE 'UTC'
+      FROM partners
+ LEFT JOIN bookings ON bookings.partner_id = partners.partner_id
+ LEFT JOIN quotations ON quotations.partner_id = partners.partner_id
+ LEFT JOIN invoices ON invoices.partner_id = partners.partner_id
+        ON CONFLICT (partner_id) DO UPDATE
+       SET booking_amount = EXCLUDED.booking_amount,
+           quotation_amount = EXCLUDED.quotation_amount,
+           invoice_amount = EXCLUDED.invoice_amount,
+           total_amount = EXCLUDED.total_amount,
+           updated_at = EXCLUDED.updated_at
+"""
+
+# Part of a customer's summary row made of the given open quotations (counted
+# there as long as no exposed booking holds them)
+QUOTATION_OVERLAP_QUERY = """
+    SELECT COALESCE(SUM(o.amount_total), 0)
+      FROM sale_order o
+      JOIN res_partner p ON p.id = o.partner_id
+     WHERE o.id = ANY(%(order_ids)s)
+       AND p.commercial_partner_id = %(partner_id)s
+       AND o.state IN ('draft', 'sent')
+       AND NOT EXISTS (
+               SELECT 1
+                 FROM car_booking b
+                WHERE (b.quotation_id = o.id OR b.sale_order_id = o.id)
+                  AND b.state IN %(booking_states)s
+           )
+"""
+
+
+class CarBookingCreditExposure(models.Model):
+    """Open credit of each customer, one row per commercial partner.
+
+    Rows are refreshed at the end of every transaction that touched one of
+    the customer's bookings, quotations or invoices (recounting only those
+    customers), so the check at booking time reads a single indexed row.
+    """
+    _name = 'car.booking.credit.exposure'
+    _description = 'Car Booking Customer Credit Exposure'
+    _order = 'total_amount desc'
+    _log_access = False
+
+    partner_id = fields.Many2one('res.partner', string='Customer', required=True, readonly=True, ondelete='cascade')
+    booking_amount = fields.Float(string='Unbilled Bookings', readonly=True)
+    quotation_amount = fields.Float(string='Open Quotations', readonly=True)
+    invoice_amount = fields.Float(string='Unpaid Invoices', readonly=True)
+    total_amount = fields.Float(string='Exposure', readonly=True)
+    credit_limit = fields.Float(related='partner_id.credit_limit', string='Credit Limit')
+    updated_at = fields.Datetime(string='Updated On', readonly=True)
+
+    _sql_constraints = [
+        ('partner_uniq', 'unique(partner_id)', 'A customer has a single credit exposure.'),
+    ]
+
+    # ------------------------------------------------------------------
+    #  Maintenance
+    # ------------------------------------------------------------------
+    @api.model
+    def _mark_dirty(self, partners):
+        """Recount the exposure of these customers before the transaction commits"""
+        partner_ids = set(partners.commercial_partner_id.ids)
+        if not partner_ids:
+            return
+        data = self.env.cr.precommit.data
+        if DIRTY_PARTNERS_KEY not in data:
+            data[DIRTY_PARTNERS_KEY] = set()
+            self.env.cr.precommit.add(self._recompute_dirty)
+        data[DIRTY_PARTNERS_KEY] |= partner_ids
+
+    @api.model
+    def _recompute_dirty(self):
+        partner_ids = self.env.cr.precommit.data.pop(DIRTY_PARTNERS_KEY, set())
+        if partner_ids:
+            self._recompute(partner_ids)
+
+    @api.model
+    def _recompute(self, partner_ids, exclude_bookings=None):
+        """Recount the exposure of commercial partner ids, set-wise"""
+        partner_ids = sorted(partner_ids)
+        self.env.flush_all()
+        exclude_bookings = exclude_bookings or self.env['car.booking']
+        for start in range(0, len(partner_ids), RECOMPUTE_CHUNK_SIZE):
+            self.env.cr.execute(EXPOSURE_QUERY, {
+                'partner_ids': partner_ids[start:start + RECOMPUTE_CHUNK_SIZE],
+                'booking_states': EXPOSED_BOOKING_STATES,
+                'exclude_booking_ids': exclude_bookings.ids,
+                'exclude_order_ids': exclude_bookings._get_open_orders().ids,
+            })
+        self.invalidate_model()
+
+    @api.model
+    def _cron_recompute_all(self):
+        """Full recount, correcting anything changed outside the ORM"""
+        self.env.cr.execute("""
+            SELECT DISTINCT p.commercial_partner_id
+              FROM res_partner p
+             WHERE p.id IN (SELECT customer_name FROM car_booking WHERE customer_name IS NOT NULL
+                            UNION SELECT partner_id FROM sale_order
+                            UNION SELECT partner_id FROM account_move
+                                   WHERE move_type IN ('out_invoice', 'out_refund') AND state = 'posted')
+        """)
+        partner_ids = [row[0] for row in self.env.cr.fetchall()]
+        self._recompute(partner_ids)
+        _logger.info("Car booking credit exposure: recounted %s customers", len(partner_ids))
+        return True
+
+    # ------------------------------------------------------------------
+    #  Check
+    # ------------------------------------------------------------------
+    @api.model
+    def _lock_exposure(self, partner):
+        """Total of the partner's summary row, locked until the transaction ends (None: no row)"""
+        self.env.cr.execute("""
+            SELECT total_amount FROM car_booking_credit_exposure WHERE partner_id = %s FOR UPDATE
+        """, (partner.id,))
+        row = self.env.cr.fetchone()
+        return row[0] if row else None
+
+    @api.model
+    def _get_exposure(self, partner, bookings):
+        """Exposure of a commercial partner without bookings and their quotations.
+
+        The summary row is locked, so concurrent checks of the same customer
+        run one after the other: the later one waits, then is retried on the
+        row the first one recounted, and sees its bookings.
+        """
+        pending = self.env.cr.precommit.data.get(DIRTY_PARTNERS_KEY, set())
+        exposure = self._lock_exposure(partner)
+        if exposure is None or partner.id in pending:
+            # Never counted, or changed earlier in this transaction: recount it
+            # now (creating the row to lock), leaving out the bookings being
+            # checked and their quotations (they are marked again once saved)
+            self._recompute({partner.id}, exclude_bookings=bookings)
+            pending.discard(partner.id)
+            return self._lock_exposure(partner) or 0.0
+        # The row still counts the open quotations of these bookings, which their amounts replace
+        orders = bookings._get_open_orders()
+        if orders:
+            self.env['sale.order'].flush_model(['state', 'amount_total', 'partner_id'])
+            self.env['car.booking'].flush_model(['state', 'quotation_id', 'sale_order_id'])
+            self.env.cr.execute(QUOTATION_OVERLAP_QUERY, {
+                'order_ids': orders.ids,
+                'partner_id': partner.id,
+                'booking_states': EXPOSED_BOOKING_STATES,
+            })
+            exposure -= self.env.cr.fetchone()[0]
+        return exposure
+
+
+class CarBooking(models.Model):
+    _inherit = 'car.booking'
+
+    credit_override = fields.Boolean(
+        string='Override Credit Limit',
+        copy=False,
+        groups='aw_car_booking.group_car_booking_manager',
+        help="Allow this booking even if it takes the customer over their credit limit."
+    )
+
+    def _get_open_orders(self):
+        """Draft or sent quotations/orders linked to the bookings"""
+        return (self.quotation_id | self.sale_order_id).filtered(lambda order: order.state in ('draft', 'sent'))
+
+    def _exposed(self):
+        # Draft and requested bookings are not owed yet: editing them leaves the exposure as is
+        return self.filtered(lambda booking: booking.state in EXPOSED_BOOKING_STATES)
+
+    def _check_credit_limit(self):
+        """Refuse credit bookings that take their customer over the credit limit.
+
+        The customer's current exposure comes from its summary row; the
+        amounts of these bookings, not counted there yet, are added to it.
+        """
+        exposures = self.env['car.booking.credit.exposure'].sudo()
+        checked = {}
+        for booking in self.sudo():
+            if booking.payment_type != 'credit' or not booking.customer_name or booking.credit_override:
+                continue
+            partner = booking.customer_name.commercial_partner_id
+            checked[partner] = checked.get(partner, booking.browse()) | booking
+        # Summary rows are locked in partner order, so concurrent checks cannot deadlock
+        for partner, bookings in sorted(checked.items(), key=lambda item: item[0].id):
+            limit = partner.with_company(self.env.company).credit_limit
+            amount = sum(bookings.mapped('amount_total'))
+            if not limit or not amount:
+                continue
+            exposure = exposures._get_exposure(partner, bookings)
+            if exposure + amount > limit:
+                raise UserError(
+                    f"{partner.display_name} would exceed its credit limit of {limit:,.2f}: "
+                    f"{exposure:,.2f} is already open and these bookings add {amount:,.2f}. "
+                    f"A Car Booking Manager can override the limit on the booking."
+                )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        bookings = super().create(vals_list)
+        bookings._check_credit_limit()
+        self.env['car.booking.credit.exposure']._mark_dirty(bookings._exposed().customer_name)
+        return bookings
+
+    def write(self, vals):
+        exposures = self.env['car.booking.credit.exposure']
+        tracked = {'state', 'customer_name', 'invoice_id', 'quotation_id', 'sale_order_id'}.intersection(vals)
+        if tracked:
+            exposures._mark_dirty(self.customer_name)
+        result = super().write(vals)
+        if tracked:
+            exposures._mark_dirty(self.customer_name)
+        return result
+
+    def unlink(self):
+        self.env['car.booking.credit.exposure']._mark_dirty(self.customer_name)
+        return super().unlink()
+
+    def _compute_amounts(self):
+        super()._compute_amounts()
+        self.env['car.booking.credit.exposure']._mark_dirty(self._exposed().customer_name)
+
+    def action_confirm(self):
+        self._check_credit_limit()
+        return super().action_confirm()
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    def _compute_amounts(self):
+        super()._compute_amounts()
+        self.env['car.booking.credit.exposure']._mark_dirty(self.partner_id)
+
+    def write(self, vals):
+        exposures = self.env['car.booking.credit.exposure']
+        if 'partner_id' in vals:
+            exposures._mark_dirty(self.partner_id)
+        result = super().write(vals)
+        if {'state', 'partner_id'}.intersection(vals):
+            exposures._mark_dirty(self.partner_id)
+        return result
+
+    def unlink(self):
+        self.env['car.booking.credit.exposure']._mark_dirty(self.partner_id)
+        return super().unlink()
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def _compute_amount(self):
+        # Payments and reconciliations change the residual through this compute
+        super()._compute_amount()
+        self.env['car.booking.credit.exposure']._mark_dirty(
+            self.filtered(lambda move: move.is_sale_document(include_receipts=False)).partner_id)
+
+    def write(self, vals):
+        exposures = self.env['car.booking.credit.exposure']
+        if 'partner_id' in vals:
+            exposures._mark_dirty(self.partner_id)
+        result = super().write(vals)
+        if {'state', 'partner_id', 'car_booking_id'}.intersection(vals):
+            exposures._mark_dirty(self.partner_id)
+        return result
+
+    def unlink(self):
+        self.env['car.booking.credit.exposure']._mark_dirty(self.partner_id)
+        return super().unlink()
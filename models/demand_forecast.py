@@ -0,0 +1,225 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+import pytz
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api
+
+from . import demand_forecast_kernel as kernel
+
+_logger = logging.getLogger(__name__)
+
+FORECAST_PARAM_PREFIX = 'aw_car_booking.forecast_'
+DEFAULT_HISTORY_DAYS = 3 * 365
+DEFAULT_HORIZON_DAYS = 28
+DEFAULT_REFRESH_DAYS = 7
+DEFAULT_SERVICE_LEVEL_Z = 1.28
+SERIES_KEYS = ['branch_id', 'city_id', 'type_of_service_id', 'car_model_id']
+
+# Vehicles in use per hour: every line counts its quantity in each hour it
+# overlaps, up to the current hour.
+SERIES_REFRESH_QUERY = """
+    INSERT INTO car_booking_demand_series (branch_id, city_id, type_of_service_id, car_model_id, hour, vehicles)
+    SELECT l.branch_id,
+           l.city,
+           l.type_of_service_id,
+           COALESCE(l.car_model_id, v.model_id),
+           h.hour,
+           SUM(GREATEST(COALESCE(l.qty, 1), 1))
+      FROM car_booking_line l
+      JOIN car_booking b ON b.id = l.car_booking_id
+ LEFT JOIN fleet_vehicle v ON v.id = l.fleet_vehicle_id
+     CROSS JOIN LATERAL generate_series(
+               date_trunc('hour', GREATEST(l.start_date, %(since)s)),
+               LEAST(l.end_date, %(until)s) - interval '1 microsecond',
+               interval '1 hour'
+           ) AS h(hour)
+     WHERE b.state != 'cancelled'
+       AND l.start_date < %(until)s
+       AND l.end_date > %(since)s
+       AND l.end_date > l.start_date
+  GROUP BY 1, 2, 3, 4, 5
+"""
+
+
+class CarBookingDemandSeries(models.Model):
+    """Hourly vehicles in use per branch, city, service type and car model"""
+    _name = 'car.booking.demand.series'
+    _description = 'Car Booking Demand History'
+    _order = 'hour desc'
+    _log_access = False
+
+    branch_id = fields.Many2one('res.company', string='Branch', readonly=True)
+    city_id = fields.Many2one('booking.city', string='City', readonly=True)
+    type_of_service_id = fields.Many2one('type.of.service', string='Type of Service', readonly=True)
+    car_model_id = fields.Many2one('fleet.vehicle.model', string='Car Model', readonly=True)
+    hour = fields.Datetime(string='Hour', required=True, readonly=True)
+    vehicles = fields.Float(string='Vehicles in Use', readonly=True, aggregator='max')
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS car_booking_demand_series_hour_brin
+                ON car_booking_demand_series USING brin (hour)
+        """)
+
+    # ------------------------------------------------------------------
+    #  Configuration
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_forecast_param(self, key, default):
+        return self.env['ir.config_parameter'].sudo().get_param(FORECAST_PARAM_PREFIX + key, default)
+
+    @api.model
+    def _get_forecast_tz(self):
+        return pytz.timezone(self.env.context.get('tz') or self.env.user.tz or 'UTC')
+
+    # ------------------------------------------------------------------
+    #  History
+    # ------------------------------------------------------------------
+    @api.model
+    def _refresh_series(self, now):
+        """Rebuild the recent hours of the history (all of it the first time), set-wise"""
+        until = now.replace(minute=0, second=0, microsecond=0)
+        self.env.cr.execute("SELECT MAX(hour) FROM car_booking_demand_series")
+        last_hour = self.env.cr.fetchone()[0]
+        if last_hour:
+            # Recent bookings are still edited; their hours are recounted
+            since = last_hour - timedelta(days=int(self._get_forecast_param('refresh_days', DEFAULT_REFRESH_DAYS)))
+        else:
+            since = until - timedelta(days=int(self._get_forecast_param('history_days', DEFAULT_HISTORY_DAYS)))
+        self.env['car.booking.line'].flush_model()
+        self.env['car.booking'].flush_model()
+        self.env.cr.execute("DELETE FROM car_booking_demand_series WHERE hour >= %s", (since,))
+        self.env.cr.execute("DELETE FROM car_booking_demand_series WHERE hour < %s", (
+            until - timedelta(days=int(self._get_forecast_param('history_days', DEFAULT_HISTORY_DAYS))),))
+        self.env.cr.execute(SERIES_REFRESH_QUERY, {'since': since, 'until': until})
+        return until
+
+    @api.model
+    def _load_history(self, origin_local, now_local, tz):
+        """(keys, (series, hour, value) arrays, now index) of every series since origin_local.
+
+        Hours are indexes on the local hourly grid; the values stay sparse and
+        are only made dense one chunk of series at a time by the fit.
+        """
+        self.env.cr.execute(f"""
+            SELECT DISTINCT {', '.join(SERIES_KEYS)}
+              FROM car_booking_demand_series
+             WHERE hour AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s >= %(origin)s
+             ORDER BY {', '.join(SERIES_KEYS)}
+        """, {'tz': tz.zone, 'origin': origin_local})
+        keys = self.env.cr.fetchall()
+        self.env.cr.execute(f"""
+            SELECT DENSE_RANK() OVER (ORDER BY {', '.join(SERIES_KEYS)}) - 1,
+                   (EXTRACT(EPOCH FROM (hour AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s) - %(origin)s) / 3600)::int,
+                   vehicles
+              FROM car_booking_demand_series
+             WHERE hour AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s >= %(origin)s
+        """, {'tz': tz.zone, 'origin': origin_local})
+        rows = kernel.np.array(self.env.cr.fetchall(), dtype=float).reshape(-1, 3)
+        now_index = int((now_local - origin_local).total_seconds() // 3600)
+        rows = rows[rows[:, 1] < now_index]
+        history = (rows[:, 0].astype(int), rows[:, 1].astype(int), rows[:, 2])
+        return keys, history, now_index
+
+    # ------------------------------------------------------------------
+    #  Forecast
+    # ------------------------------------------------------------------
+    @api.model
+    def _cron_forecast(self):
+        """Refresh the history, fit every series and store forecasts and fleet recommendations"""
+        started = time.perf_counter()
+        tz = self._get_forecast_tz()
+        now = fields.Datetime.now()
+        self._refresh_series(now)
+
+        history_days = int(self._get_forecast_param('history_days', DEFAULT_HISTORY_DAYS))
+        horizon_days = int(self._get_forecast_param('horizon_days', DEFAULT_HORIZON_DAYS))
+        z = float(self._get_forecast_param('service_level_z', DEFAULT_SERVICE_LEVEL_Z))
+        chunk_size = max(int(self._get_forecast_param('chunk_series', kernel.DEFAULT_CHUNK_SERIES)), 1)
+        now_local = pytz.utc.localize(now).astimezone(tz).replace(tzinfo=None)
+        today_local = now_local.date()
+        first_day = today_local - timedelta(days=history_days)
+        # The grid starts on a Monday so that hour t of it is hour t % 168 of the week
+        origin_local = datetime.combine(first_day - timedelta(days=first_day.weekday()), datetime.min.time())
+        keys, history, now_index = self._load_history(origin_local, now_local, tz)
+        if not keys:
+            return False
+
+        intercept, slope, season, sigma = kernel.fit_in_chunks(*history, len(keys), now_index, chunk_size)
+        # Forecasts start at the next local midnight, in whole days
+        start_day = today_local + timedelta(days=1)
+        start_index = (start_day - origin_local.date()).days * kernel.HOURS_PER_DAY
+        hours = horizon_days * kernel.HOURS_PER_DAY
+        forecasts = kernel.forecast(intercept, slope, season, start_index, hours)
+
+        group_keys = sorted({(key[0], key[3]) for key in keys}, key=lambda key: (key[0] or 0, key[1] or 0))
+        group_position = {key: position for position, key in enumerate(group_keys)}
+        group_index = kernel.np.array([group_position[(key[0], key[3])] for key in keys], dtype=int)
+        peaks, recommended = kernel.fleet_requirement(forecasts, sigma, group_index, len(group_keys), z)
+
+        self._store_results(keys, forecasts, group_keys, peaks, recommended, start_day, tz)
+        _logger.info("Car booking demand forecast: %s series over %s hours fitted in %.1fs",
+                     len(keys), now_index, time.perf_counter() - started)
+        return True
+
+    @api.model
+    def _store_results(self, keys, forecasts, group_keys, peaks, recommended, start_day, tz):
+        """Replace the previous run's forecasts (per day) and recommendations"""
+        days = [start_day + timedelta(days=offset) for offset in range(peaks.shape[1])]
+        # Daily peak of each series, kept for drilling down below the branch level
+        daily = forecasts.reshape(len(keys), len(days), kernel.HOURS_PER_DAY).max(axis=2)
+        run_date = fields.Datetime.now()
+        self.env.cr.execute("DELETE FROM car_booking_demand_forecast")
+        execute_values(self.env.cr._obj, """
+            INSERT INTO car_booking_demand_forecast
+                   (branch_id, city_id, type_of_service_id, car_model_id, date, vehicles, run_date)
+            VALUES %s
+        """, [
+            (*keys[row], days[column], float(daily[row, column]), run_date)
+            for row in range(len(keys)) for column in range(len(days))
+        ], page_size=1000)
+        self.env.cr.execute("DELETE FROM car_booking_fleet_recommendation")
+        execute_values(self.env.cr._obj, """
+            INSERT INTO car_booking_fleet_recommendation
+                   (branch_id, car_model_id, date, peak_vehicles, recommended_vehicles, run_date)
+            VALUES %s
+        """, [
+            (*group_keys[row], days[column], float(peaks[row, column]), int(recommended[row, column]), run_date)
+            for row in range(len(group_keys)) for column in range(len(days))
+        ], page_size=1000)
+        self.env['car.booking.demand.forecast'].invalidate_model()
+        self.env['car.booking.fleet.recommendation'].invalidate_model()
+
+
+class CarBookingDemandForecast(models.Model):
+    """Forecast daily peak of vehicles in use per series, from the last run"""
+    _name = 'car.booking.demand.forecast'
+    _description = 'Car Booking Demand Forecast'
+    _order = 'date, branch_id'
+    _log_access = False
+
+    branch_id = fields.Many2one('res.company', string='Branch', readonly=True)
+    city_id = fields.Many2one('booking.city', string='City', readonly=True)
+    type_of_service_id = fields.Many2one('type.of.service', string='Type of Service', readonly=True)
+    car_model_id = fields.Many2one('fleet.vehicle.model', string='Car Model', readonly=True)
+    date = fields.Date(string='Date', readonly=True)
+    vehicles = fields.Float(string='Forecast Peak Vehicles', readonly=True, aggregator='sum')
+    run_date = fields.Datetime(string='Forecast On', readonly=True)
+
+
+class CarBookingFleetRecommendation(models.Model):
+    """Vehicles to have available per branch, car model and day, from the last run"""
+    _name = 'car.booking.fleet.recommendation'
+    _description = 'Car Booking Fleet Recommendation'
+    _order = 'date, branch_id'
+    _log_access = False
+
+    branch_id = fields.Many2one('res.company', string='Branch', readonly=True)
+    car_model_id = fields.Many2one('fleet.vehicle.model', string='Car Model', readonly=True)
+    date = fields.Date(string='Date', readonly=True)
+    peak_vehicles = fields.Float(string='Forecast Peak', readonly=True, aggregator='max')
+    recommended_vehicles = fields.Integer(string='Recommended Vehicles', readonly=True, aggregator='max')
+    run_date = fields.Datetime(string='Forecast On', readonly=True)
@@ -0,0 +1,115 @@
+"""Seasonal demand forecasting used to size the fleet.
+
+Plain NumPy on purpose: no ORM access, so models can be fitted and profiled
+on synthetic data. Every function works on all series at once: a series is
+one row of an (S, T) matrix of hourly vehicle counts, on a local-time grid
+that starts on a Monday at midnight, with NaN where nothing is known (before
+the first booking of the series and after the current hour).
+
+The model is additive: a linear trend plus an hour-of-week profile, which
+covers both day-of-week and hour-of-day seasonality.
+"""
+import numpy as np
+
+HOURS_PER_WEEK = 168
+HOURS_PER_DAY = 24
+# Series fitted together: the fit holds about six (chunk, T) float matrices,
+# so 100 series over three years of hours stay around 125 MB
+DEFAULT_CHUNK_SERIES = 100
+
+
+def dense_series(series_index, hour_index, values, series_count, hour_count):
+    """(S, T) matrix from sparse (series, hour, value) triples; missing hours are 0"""
+    matrix = np.zeros((series_count, hour_count))
+    np.add.at(matrix, (series_index, hour_index), values)
+    return matrix
+
+
+def mask_unknown(matrix, series_index, hour_index, now_index):
+    """Set hours before each series' first observation, and from now_index on, to NaN"""
+    first = np.full(matrix.shape[0], matrix.shape[1])
+    np.minimum.at(first, series_index, hour_index)
+    hours = np.arange(matrix.shape[1])
+    unknown = (hours[None, :] < first[:, None]) | (hours[None, :] >= now_index)
+    return np.where(unknown, np.nan, matrix)
+
+
+def fit_seasonal_trend(matrix):
+    """Fit every row; return (intercept, slope, season (S, 168), sigma).
+
+    The trend is the least-squares line through the known hours, the season
+    the mean detrended value of each hour of the week (centred on zero) and
+    sigma the standard deviation of what is left.
+    """
+    series_count, hour_count = matrix.shape
+    weeks = -(-hour_count // HOURS_PER_WEEK)
+    if weeks * HOURS_PER_WEEK != hour_count:
+        padding = np.full((series_count, weeks * HOURS_PER_WEEK - hour_count), np.nan)
+        matrix = np.hstack([matrix, padding])
+    t = np.arange(matrix.shape[1], dtype=float)
+    known = ~np.isnan(matrix)
+    count = np.maximum(known.sum(axis=1), 1)
+    t_mean = (known * t).sum(axis=1) / count
+    y_mean = np.nansum(matrix, axis=1) / count
+    dt = np.where(known, t[None, :] - t_mean[:, None], 0.0)
+    dy = np.where(known, matrix - y_mean[:, None], 0.0)
+    slope = (dt * dy).sum(axis=1) / np.maximum((dt * dt).sum(axis=1), 1e-9)
+    intercept = y_mean - slope * t_mean
+
+    residual = matrix - (intercept[:, None] + slope[:, None] * t[None, :])
+    weekly = residual.reshape(series_count, weeks, HOURS_PER_WEEK)
+    known_weeks = (~np.isnan(weekly)).sum(axis=1)
+    season = np.nansum(weekly, axis=1) / np.maximum(known_weeks, 1)
+    season -= season.mean(axis=1, keepdims=True)
+
+    fitted = intercept[:, None] + slope[:, None] * t[None, :] + np.tile(season, weeks)
+    error = np.where(known, matrix - fitted, 0.0)
+    sigma = np.sqrt((error * error).sum(axis=1) / count)
+    return intercept, slope, season, sigma
+
+
+def fit_in_chunks(series_index, hour_index, values, series_count, now_index, chunk_size=DEFAULT_CHUNK_SERIES):
+    """Fit series from sparse (series, hour, value) triples, chunk_size rows at a time.
+
+    Same result as fit_seasonal_trend(mask_unknown(dense_series(...))), but only
+    one chunk is ever dense: memory is bounded by chunk_size x now_index
+    instead of series_count x now_index, plus the triples themselves.
+    """
+    order = np.argsort(series_index, kind='stable')
+    series_index, hour_index, values = series_index[order], hour_index[order], values[order]
+    parts = []
+    for first in range(0, series_count, chunk_size):
+        last = min(first + chunk_size, series_count)
+        low, high = np.searchsorted(series_index, [first, last])
+        rows = series_index[low:high] - first
+        hours = hour_index[low:high]
+        matrix = dense_series(rows, hours, values[low:high], last - first, now_index)
+        matrix = mask_unknown(matrix, rows, hours, now_index)
+        parts.append(fit_seasonal_trend(matrix))
+        del matrix
+    return tuple(np.concatenate(columns) for columns in zip(*parts))
+
+
+def forecast(intercept, slope, season, start_index, hours):
+    """(S, hours) expected vehicle counts from start_index on, never negative"""
+    t = np.arange(start_index, start_index + hours, dtype=float)
+    slots = np.arange(start_index, start_index + hours) % HOURS_PER_WEEK
+    values = intercept[:, None] + slope[:, None] * t[None, :] + season[:, slots]
+    return np.maximum(values, 0.0)
+
+
+def fleet_requirement(forecasts, sigma, group_index, group_count, z):
+    """Daily peak and recommended vehicles per group, as two (G, days) matrices.
+
+    Series are summed into their group hour by hour before the peak of each
+    day is taken; the recommendation covers the peak plus z standard
+    deviations of the summed series (assumed independent).
+    """
+    hours = forecasts.shape[1]
+    totals = np.zeros((group_count, hours))
+    np.add.at(totals, group_index, forecasts)
+    variance = np.zeros(group_count)
+    np.add.at(variance, group_index, sigma * sigma)
+    peaks = totals.reshape(group_count, hours // HOURS_PER_DAY, HOURS_PER_DAY).max(axis=2)
+    recommended = np.ceil(peaks + z * np.sqrt(variance)[:, None])
+    return peaks, recommended.astype(int)
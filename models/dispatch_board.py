@@ -0,0 +1,164 @@
+import threading
+from datetime import datetime, time, timedelta
+
+import pytz
+
+from odoo import models, fields, api
+from odoo.exceptions import AccessError
+
+# Per-process cache of board payloads: {(dbname, branch_id, day, tz): (signature, payload)}.
+# The signature is re-checked with one cheap indexed query so workers that did
+# not see a write still notice changes made elsewhere.
+_board_cache = {}
+_board_cache_lock = threading.Lock()
+BOARD_CACHE_SIZE = 256
+
+BOARD_QUERY = """
+    SELECT l.id,
+           l.car_booking_id,
+           b.name,
+           l.start_date,
+           l.end_date,
+           l.fleet_vehicle_id,
+           v.license_plate,
+           m.name AS car_model,
+           l.driver_name,
+           d.name AS driver,
+           l.mobile_no,
+           b.airport_id,
+           a.name AS airport,
+           b.flight_number,
+           b.guest_name,
+           g.name AS guest,
+           b.guest_phone,
+           b.hotel_room_number,
+           c.name AS customer,
+           b.location_from,
+           b.location_to,
+           b.state,
+           GREATEST(l.write_date, b.write_date)
+      FROM car_booking_line l
+      JOIN car_booking b ON b.id = l.car_booking_id
+ LEFT JOIN fleet_vehicle v ON v.id = l.fleet_vehicle_id
+ LEFT JOIN fleet_vehicle_model m ON m.id = COALESCE(l.car_model_id, v.model_id)
+ LEFT JOIN res_partner d ON d.id = l.driver_name
+ LEFT JOIN res_partner g ON g.id = b.guest_name
+ LEFT JOIN res_partner c ON c.id = b.customer_name
+ LEFT JOIN car_airport a ON a.id = b.airport_id
+     WHERE l.branch_id = %(branch_id)s
+       AND l.start_date >= %(start)s
+       AND l.start_date < %(stop)s
+       AND b.state != 'cancelled'
+  ORDER BY l.start_date, l.id
+"""
+
+BOARD_COLUMNS = [
+    'id', 'booking_id', 'booking', 'start', 'end', 'vehicle_id', 'plate', 'car_model',
+    'driver_id', 'driver', 'driver_mobile', 'airport_id', 'airport', 'flight', 'guest_id',
+    'guest', 'guest_phone', 'hotel_room', 'customer', 'from', 'to', 'state', 'write_date',
+]
+
+
+def invalidate_board_cache(dbname, branch_ids=None):
+    """Drop cached boards of branch_ids, or every board of dbname"""
+    with _board_cache_lock:
+        for cache_key in list(_board_cache):
+            if cache_key[0] != dbname:
+                continue
+            if branch_ids is None or cache_key[1] in branch_ids:
+                del _board_cache[cache_key]
+
+
+class CarBookingDispatchBoard(models.AbstractModel):
+    _name = 'car.booking.dispatch.board'
+    _description = 'Car Booking Dispatch Board'
+
+    @api.model
+    def _get_board_tz(self):
+        return self.env.context.get('tz') or self.env.user.tz or 'UTC'
+
+    @api.model
+    def _get_day_bounds(self, day):
+        """UTC datetimes delimiting day in the user's timezone"""
+        tz = pytz.timezone(self._get_board_tz())
+        start = tz.localize(datetime.combine(day, time.min)).astimezone(pytz.utc).replace(tzinfo=None)
+        stop = tz.localize(datetime.combine(day + timedelta(days=1), time.min)).astimezone(pytz.utc).replace(tzinfo=None)
+        return start, stop
+
+    @api.model
+    def _get_board_signature(self, branch_id, start, stop):
+        """Cheap fingerprint of the board rows: count and latest write, to the microsecond.
+
+        Filters on the line's stored branch so the (branch_id, start_date)
+        index of car_booking_line serves it.
+        """
+        self.env.cr.execute("""
+            SELECT COUNT(*), MAX(GREATEST(l.write_date, b.write_date))
+              FROM car_booking_line l
+              JOIN car_booking b ON b.id = l.car_booking_id
+             WHERE l.branch_id = %s
+               AND l.start_date >= %s
+               AND l.start_date < %s
+               AND b.state != 'cancelled'
+        """, (branch_id, start, stop))
+        return self.env.cr.fetchone()
+
+    @api.model
+    def _build_board_rows(self, branch_id, start, stop):
+        """Fetch the whole day in one query and shape it into compact dicts"""
+        self.env.cr.execute(BOARD_QUERY, {'branch_id': branch_id, 'start': start, 'stop': stop})
+        rows = []
+        for values in self.env.cr.fetchall():
+            row = dict(zip(BOARD_COLUMNS, values))
+            for key in ('start', 'end', 'write_date'):
+                row[key] = fields.Datetime.to_string(row[key]) if row[key] else False
+            for key in ('car_model', 'airport'):
+                # Translatable names are stored as jsonb
+                if isinstance(row[key], dict):
+                    row[key] = row[key].get(self.env.lang) or row[key].get('en_US') or next(iter(row[key].values()), '')
+            rows.append(row)
+        return rows
+
+    @api.model
+    def get_board(self, branch_id, day, since=None):
+        """Return the dispatch board of branch_id for day (tomorrow by default).
+
+        When since (the token of a previous response) is given, only rows
+        written in or after its second are sent in 'rows': tokens have second
+        precision, so rows of that second may come again and the client
+        replaces them by id. 'ids' always lists every row of the board so the
+        client can drop the ones that disappeared.
+        """
+        self.env['car.booking.line'].check_access('read')
+        if branch_id not in self.env.user.company_ids.ids:
+            raise AccessError("You are not allowed to see the dispatch board of this branch.")
+        # Dispatchers plan the next day by default
+        day = fields.Date.to_date(day) if day else fields.Date.context_today(self) + timedelta(days=1)
+        start, stop = self._get_day_bounds(day)
+        cache_key = (self.env.cr.dbname, branch_id, day, self._get_board_tz())
+        signature = self._get_board_signature(branch_id, start, stop)
+
+        cached = _board_cache.get(cache_key)
+        if cached and cached[0] == signature:
+            payload = cached[1]
+        else:
+            rows = self._build_board_rows(branch_id, start, stop)
+            payload = {
+                'branch_id': branch_id,
+                'day': fields.Date.to_string(day),
+                'token': fields.Datetime.to_string(signature[1]) if signature[1] else '',
+                'ids': [row['id'] for row in rows],
+                'rows': rows,
+            }
+            with _board_cache_lock:
+                if len(_board_cache) >= BOARD_CACHE_SIZE:
+                    _board_cache.pop(next(iter(_board_cache)))
+                _board_cache[cache_key] = (signature, payload)
+
+        if not since:
+            return dict(payload, delta=False)
+        return dict(
+            payload,
+            delta=True,
+            rows=[row for row in payload['rows'] if row['write_date'] and row['write_date'] >= since],
+        )
@@ -0,0 +1,312 @@
+from datetime import timedelta
+
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+SYNC_PARAM_PREFIX = 'aw_car_booking.driver_sync_'
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_DAYS_BACK = 1
+
+# Writes to these fields change what a driver sees on the phone
+SYNC_LINE_FIELDS = {
+    'car_booking_id', 'driver_name', 'start_date', 'end_date', 'fleet_vehicle_id', 'car_model_id',
+    'extra_hour', 'driver_status', 'actual_start', 'actual_end',
+}
+SYNC_BOOKING_FIELDS = {
+    'name', 'state', 'customer_name', 'guest_name', 'guest_phone', 'flight_number', 'airport_id',
+    'hotel_room_number', 'location_from', 'location_to',
+}
+
+DRIVER_STATUS_RANK = {'assigned': 0, 'departed': 1, 'completed': 2}
+
+SYNC_QUERY = """
+    SELECT l.id,
+           l.car_booking_id,
+           b.name,
+           l.start_date,
+           l.end_date,
+           v.license_plate,
+           m.name AS car_model,
+           c.name AS customer,
+           g.name AS guest,
+           b.guest_phone,
+           b.flight_number,
+           a.name AS airport,
+           b.hotel_room_number,
+           b.location_from,
+           b.location_to,
+           l.driver_status,
+           l.actual_start,
+           l.actual_end,
+           l.extra_hour,
+           l.proposed_extra_hour,
+           COALESCE(l.driver_sync_version, 0)
+      FROM car_booking_line l
+      JOIN car_booking b ON b.id = l.car_booking_id
+ LEFT JOIN fleet_vehicle v ON v.id = l.fleet_vehicle_id
+ LEFT JOIN fleet_vehicle_model m ON m.id = COALESCE(l.car_model_id, v.model_id)
+ LEFT JOIN res_partner g ON g.id = b.guest_name
+ LEFT JOIN res_partner c ON c.id = b.customer_name
+ LEFT JOIN car_airport a ON a.id = b.airport_id
+     WHERE l.driver_name = %(driver_id)s
+       AND b.state != 'cancelled'
+       AND (l.end_date IS NULL OR l.end_date >= %(horizon)s)
+       AND (%(line_ids)s::int[] IS NULL OR l.id = ANY(%(line_ids)s::int[]))
+  ORDER BY l.start_date, l.id
+"""
+
+SYNC_COLUMNS = [
+    'id', 'booking_id', 'booking', 'start', 'end', 'plate', 'car_model', 'customer', 'guest',
+    'guest_phone', 'flight', 'airport', 'hotel_room', 'from', 'to', 'driver_status',
+    'actual_start', 'actual_end', 'extra_hour', 'proposed_extra_hour', 'version',
+]
+DATETIME_COLUMNS = {'start', 'end', 'actual_start', 'actual_end'}
+TRANSLATED_COLUMNS = {'car_model', 'airport'}
+
+
+class CarBookingDriverSyncLog(models.Model):
+    """Append-only log of which driver's lines changed, in transaction order.
+
+    Sync tokens are transaction snapshots: a client holding token T is sent
+    every line logged by a transaction at or after T, which includes the
+    transactions that were still running when T was issued.
+    """
+    _name = 'car.booking.driver.sync.log'
+    _description = 'Car Booking Driver Sync Log'
+    _order = 'id desc'
+    _log_access = False
+
+    driver_id = fields.Many2one('res.partner', string='Driver', required=True, readonly=True, ondelete='cascade')
+    line_id = fields.Integer(string='Booking Line ID', required=True, readonly=True)
+    date = fields.Datetime(string='Date', required=True, readonly=True)
+
+    def init(self):
+        # Transaction ids outgrow int4, so the column is managed here
+        self.env.cr.execute("""
+            ALTER TABLE car_booking_driver_sync_log
+                ADD COLUMN IF NOT EXISTS txid bigint NOT NULL DEFAULT txid_current()
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS car_booking_driver_sync_log_driver_txid_idx
+                ON car_booking_driver_sync_log (driver_id, txid)
+        """)
+
+    @api.model
+    def _get_sync_param(self, key, default):
+        return int(self.env['ir.config_parameter'].sudo().get_param(SYNC_PARAM_PREFIX + key, default))
+
+    @api.model
+    def _touch(self, pairs):
+        """Log [(driver partner id, line id)] in one statement and bump the lines' sync version.
+
+        Also the entry point for code changing synced values in SQL, which
+        the line's write() does not see.
+        """
+        pairs = {(driver_id, line_id) for driver_id, line_id in pairs if driver_id}
+        if not pairs:
+            return
+        execute_values(self.env.cr._obj, """
+            INSERT INTO car_booking_driver_sync_log (driver_id, line_id, date)
+            SELECT v.driver_id, v.line_id, NOW() AT TIME ZONE 'UTC'
+              FROM (VALUES %s) AS v(driver_id, line_id)
+        """, sorted(pairs))
+        self.env.cr.execute("""
+            UPDATE car_booking_line
+               SET driver_sync_version = COALESCE(driver_sync_version, 0) + 1
+             WHERE id = ANY(%s)
+        """, (sorted({line_id for _driver_id, line_id in pairs}),))
+        self.env['car.booking.line'].invalidate_model(['driver_sync_version'])
+
+    @api.model
+    def _get_current_token(self):
+        self.env.cr.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _cron_prune_log(self):
+        """Drop entries past the retention; clients with older tokens get a full sync"""
+        retention = self._get_sync_param('retention_days', DEFAULT_RETENTION_DAYS)
+        self.env.cr.execute("""
+            DELETE FROM car_booking_driver_sync_log
+             WHERE date < %s
+         RETURNING txid
+        """, (fields.Datetime.now() - timedelta(days=retention),))
+        pruned = [row[0] for row in self.env.cr.fetchall()]
+        if pruned:
+            oldest_valid = max(max(pruned) + 1, self._get_sync_param('min_token', 0))
+            self.env['ir.config_parameter'].sudo().set_param(SYNC_PARAM_PREFIX + 'min_token', oldest_valid)
+        return len(pruned)
+
+    def write(self, vals):
+        raise UserError("The driver sync log cannot be modified.")
+
+
+class CarBookingLine(models.Model):
+    _inherit = 'car.booking.line'
+
+    driver_status = fields.Selection([
+        ('assigned', 'Assigned'),
+        ('departed', 'Departed'),
+        ('completed', 'Completed'),
+    ], string='Driver Status', default='assigned', copy=False,
+        help="Progress reported by the driver from the mobile app.")
+    actual_start = fields.Datetime(string='Actual Start', copy=False)
+    actual_end = fields.Datetime(string='Actual End', copy=False)
+    # Bumped in SQL by every sync log entry of the line: the version phones
+    # send back with their updates, immune to same-second edits
+    driver_sync_version = fields.Integer(string='Sync Version', default=0, readonly=True, copy=False)
+
+    # ------------------------------------------------------------------
+    #  Change log
+    # ------------------------------------------------------------------
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env['car.booking.driver.sync.log']._touch((line.driver_name.id, line.id) for line in lines)
+        return lines
+
+    def write(self, vals):
+        if not SYNC_LINE_FIELDS.intersection(vals):
+            return super().write(vals)
+        # A reassigned line is logged for the previous driver too, who then sees it removed
+        pairs = [(line.driver_name.id, line.id) for line in self]
+        result = super().write(vals)
+        pairs += [(line.driver_name.id, line.id) for line in self]
+        self.env['car.booking.driver.sync.log']._touch(pairs)
+        return result
+
+    def unlink(self):
+        self.env['car.booking.driver.sync.log']._touch((line.driver_name.id, line.id) for line in self)
+        return super().unlink()
+
+    # ------------------------------------------------------------------
+    #  Mobile API
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_sync_driver(self):
+        return self.env.user.partner_id
+
+    @api.model
+    def _get_driver_rows(self, driver, line_ids=None):
+        """Compact rows of the driver's lines, all of them or among line_ids"""
+        days_back = self.env['car.booking.driver.sync.log']._get_sync_param('days_back', DEFAULT_DAYS_BACK)
+        self.env['car.booking'].flush_model()
+        self.flush_model()
+        self.env.cr.execute(SYNC_QUERY, {
+            'driver_id': driver.id,
+            'horizon': fields.Datetime.now() - timedelta(days=days_back),
+            'line_ids': list(line_ids) if line_ids is not None else None,
+        })
+        rows = []
+        for values in self.env.cr.fetchall():
+            row = list(values)
+            for index, column in enumerate(SYNC_COLUMNS):
+                if column in DATETIME_COLUMNS:
+                    row[index] = fields.Datetime.to_string(row[index]) if row[index] else False
+                elif column in TRANSLATED_COLUMNS and isinstance(row[index], dict):
+                    # Translatable names are stored as jsonb
+                    row[index] = row[index].get(self.env.lang) or row[index].get('en_US') or next(iter(row[index].values()), '')
+            rows.append(row)
+        return rows
+
+    @api.model
+    def get_driver_sync(self, token=None):
+        """Lines of the current user's driver partner created, changed or removed since token.
+
+        Without a token, or with one older than the retained log, every line
+        is sent and 'full' is set: the client replaces its copy. Otherwise
+        'rows' holds the changed lines and 'removed' the ids to drop. Pass
+        the returned 'token' to the next call.
+        """
+        driver = self._get_sync_driver()
+        log = self.env['car.booking.driver.sync.log']
+        new_token = log._get_current_token()
+        full = not token or int(token) < log._get_sync_param('min_token', 0)
+        if full:
+            rows = self._get_driver_rows(driver)
+            removed = []
+        else:
+            self.env.cr.execute("""
+                SELECT DISTINCT line_id
+                  FROM car_booking_driver_sync_log
+                 WHERE driver_id = %s AND txid >= %s
+            """, (driver.id, int(token)))
+            changed = [row[0] for row in self.env.cr.fetchall()]
+            rows = self._get_driver_rows(driver, changed) if changed else []
+            present = {row[0] for row in rows}
+            removed = [line_id for line_id in changed if line_id not in present]
+        return {
+            'token': str(new_token),
+            'full': full,
+            'columns': SYNC_COLUMNS,
+            'rows': rows,
+            'removed': removed,
+        }
+
+    def _prepare_driver_update_vals(self, update):
+        """Values of one status update, or None when it would move the line backwards"""
+        self.ensure_one()
+        vals = {}
+        status = update.get('status')
+        if status:
+            if status not in DRIVER_STATUS_RANK or DRIVER_STATUS_RANK[status] < DRIVER_STATUS_RANK[self.driver_status or 'assigned']:
+                return None
+            vals['driver_status'] = status
+        now = fields.Datetime.now()
+        if update.get('actual_start') or (status == 'departed' and not self.actual_start):
+            vals['actual_start'] = fields.Datetime.to_datetime(update.get('actual_start')) or now
+        if update.get('actual_end') or (status == 'completed' and not self.actual_end):
+            vals['actual_end'] = fields.Datetime.to_datetime(update.get('actual_end')) or now
+        if update.get('extra_hour') is not None:
+            vals['extra_hour'] = int(update['extra_hour'])
+        return vals
+
+    @api.model
+    def apply_driver_updates(self, updates):
+        """Apply a batch of status updates sent by the driver's phone.
+
+        Each update carries the line id, the 'version' of the line the phone
+        last saw and any of status, actual_start, actual_end and extra_hour.
+        An update is refused as a conflict when the line changed on the
+        server since that version (a per-line counter) or when it would move the status
+        backwards; the current row is returned with it so the phone can
+        show the server values.
+        """
+        driver = self._get_sync_driver()
+        line_ids = [int(update['line_id']) for update in updates]
+        lines = {line.id: line for line in self.sudo().search([('id', 'in', line_ids), ('driver_name', '=', driver.id)])}
+        results = []
+        conflicts = []
+        for update in updates:
+            line_id = int(update['line_id'])
+            line = lines.get(line_id)
+            if not line or line.booking_state == 'cancelled':
+                results.append({'line_id': line_id, 'result': 'rejected'})
+                continue
+            vals = line._prepare_driver_update_vals(update)
+            # Versions from before the counter (write date strings) never match
+            if vals is None or (update.get('version') is not None and str(update['version']) != str(line.driver_sync_version)):
+                results.append({'line_id': line_id, 'result': 'conflict'})
+                conflicts.append(line_id)
+                continue
+            if vals:
+                line.write(vals)
+            results.append({'line_id': line_id, 'result': 'applied', 'version': line.driver_sync_version})
+        current = {row[0]: row for row in self._get_driver_rows(driver, conflicts)} if conflicts else {}
+        for result in results:
+            if result['result'] == 'conflict':
+                result['row'] = current.get(result['line_id'])
+        return {'columns': SYNC_COLUMNS, 'results': results}
+
+
+class CarBooking(models.Model):
+    _inherit = 'car.booking'
+
+    def write(self, vals):
+        result = super().write(vals)
+        if SYNC_BOOKING_FIELDS.intersection(vals):
+            self.env['car.booking.driver.sync.log']._touch(
+                (line.driver_name.id, line.id) for line in self.car_booking_lines)
+        return result
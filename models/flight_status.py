@@ -0,0 +1,219 @@
+import logging
+from datetime import timedelta
+
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api
+
+from .dispatch_board import invalidate_board_cache
+from .flight_status_providers import RateLimiter, get_provider
+from .telematics_kernel import parse_timestamp
+
+_logger = logging.getLogger(__name__)
+
+FLIGHT_PARAM_PREFIX = 'aw_car_booking.flight_'
+DEFAULT_LOOKAHEAD_HOURS = 12
+DEFAULT_CACHE_TTL_MINUTES = 15
+DEFAULT_REQUESTS_PER_MINUTE = 6
+
+_rate_limiters = {}
+
+
+class CarFlightStatus(models.Model):
+    _name = 'car.flight.status'
+    _description = 'Flight Status Cache'
+    _order = 'flight_date desc, flight_number'
+
+    flight_number = fields.Char(string='Flight Number', required=True, index=True)
+    flight_date = fields.Date(string='Flight Date', required=True)
+    status = fields.Char(string='Status')
+    scheduled_time = fields.Datetime(string='Scheduled Time')
+    estimated_time = fields.Datetime(string='Estimated Time')
+    delay_minutes = fields.Integer(string='Delay (Minutes)', compute='_compute_delay_minutes', store=True)
+    fetched_at = fields.Datetime(string='Fetched At')
+    expires_at = fields.Datetime(string='Expires At', index=True)
+
+    _sql_constraints = [
+        ('flight_date_uniq', 'unique(flight_number, flight_date)', 'Flight status is cached once per flight and date.'),
+    ]
+
+    @api.depends('scheduled_time', 'estimated_time')
+    def _compute_delay_minutes(self):
+        for record in self:
+            if record.scheduled_time and record.estimated_time:
+                delta = record.estimated_time - record.scheduled_time
+                record.delay_minutes = int(delta.total_seconds() // 60)
+            else:
+                record.delay_minutes = 0
+
+    # ------------------------------------------------------------------
+    #  Configuration
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_flight_param(self, key, default=None):
+        return self.env['ir.config_parameter'].sudo().get_param(FLIGHT_PARAM_PREFIX + key, default)
+
+    @api.model
+    def _get_provider(self):
+        name = self._get_flight_param('provider')
+        if not name:
+            return None
+        return get_provider(
+            name,
+            url=self._get_flight_param('provider_url'),
+            api_key=self._get_flight_param('provider_key'),
+            timeout=int(self._get_flight_param('provider_timeout', 10)),
+        )
+
+    @api.model
+    def _get_rate_limiter(self):
+        rate = int(self._get_flight_param('requests_per_minute', DEFAULT_REQUESTS_PER_MINUTE))
+        limiter = _rate_limiters.get(self.env.cr.dbname)
+        if limiter is None or limiter.capacity != max(float(rate), 1.0):
+            limiter = _rate_limiters[self.env.cr.dbname] = RateLimiter(rate)
+        return limiter
+
+    # ------------------------------------------------------------------
+    #  Polling
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_due_lines(self, lookahead_hours):
+        now = fields.Datetime.now()
+        return self.env['car.booking.line'].search([
+            ('car_booking_id.is_airport', '=', True),
+            ('flight_number', '!=', False),
+            # Only pickups still to come: shifted ones stay ahead of now
+            ('start_date', '>=', now),
+            ('start_date', '<', now + timedelta(hours=lookahead_hours)),
+            ('booking_state', 'not in', ('cancelled', 'completed', 'invoiced')),
+        ])
+
+    @api.model
+    def _cron_poll_flight_status(self):
+        """Refresh stale flight statuses for pickups due soon and shift pickup times"""
+        provider = self._get_provider()
+        if provider is None:
+            return False
+        lookahead_hours = int(self._get_flight_param('lookahead_hours', DEFAULT_LOOKAHEAD_HOURS))
+        lines = self._get_due_lines(lookahead_hours)
+        if not lines:
+            return True
+
+        flights_by_date = {}
+        for line in lines:
+            flight_date = line.car_booking_id.date_of_service or line.start_date.date()
+            flights_by_date.setdefault(flight_date, set()).add(line.flight_number.strip().upper())
+
+        now = fields.Datetime.now()
+        fresh = self.search([
+            ('flight_date', 'in', list(flights_by_date)),
+            ('expires_at', '>', now),
+        ])
+        fresh_keys = {(record.flight_number, record.flight_date) for record in fresh}
+
+        limiter = self._get_rate_limiter()
+        for flight_date, flight_numbers in flights_by_date.items():
+            stale = sorted(number for number in flight_numbers if (number, flight_date) not in fresh_keys)
+            for start in range(0, len(stale), provider.max_batch_size):
+                if not limiter.acquire():
+                    _logger.info("Flight status polling rate limit reached, resuming on next run")
+                    return self._apply_flight_delays(lines)
+                batch = stale[start:start + provider.max_batch_size]
+                try:
+                    statuses = provider.fetch(batch, flight_date)
+                except Exception as e:
+                    _logger.warning("Flight status provider failed for %s flights: %s", len(batch), e)
+                    continue
+                self._store_statuses(flight_date, statuses)
+        return self._apply_flight_delays(lines)
+
+    @api.model
+    def _store_statuses(self, flight_date, statuses):
+        """Upsert fetched statuses with a fresh expiry; records with unreadable times are skipped"""
+        if not statuses:
+            return
+        now = fields.Datetime.now()
+        ttl = int(self._get_flight_param('cache_ttl_minutes', DEFAULT_CACHE_TTL_MINUTES))
+        existing = {
+            record.flight_number: record
+            for record in self.search([('flight_date', '=', flight_date), ('flight_number', 'in', list(statuses))])
+        }
+        vals_list = []
+        for number, status in statuses.items():
+            try:
+                # Providers send ISO 8601, possibly with an offset: stored as naive UTC
+                scheduled = status.get('scheduled') and parse_timestamp(status['scheduled'])
+                estimated = status.get('estimated') and parse_timestamp(status['estimated'])
+            except (AttributeError, TypeError, ValueError) as e:
+                _logger.warning("Flight status of %s on %s skipped, unreadable time: %s", number, flight_date, e)
+                continue
+            vals = {
+                'flight_number': number,
+                'flight_date': flight_date,
+                'status': status.get('status'),
+                'scheduled_time': scheduled,
+                'estimated_time': estimated,
+                'fetched_at': now,
+                'expires_at': now + timedelta(minutes=ttl),
+            }
+            if number in existing:
+                existing[number].write(vals)
+            else:
+                vals_list.append(vals)
+        self.create(vals_list)
+
+    @api.model
+    def _apply_flight_delays(self, lines):
+        """Shift start/end of lines by the change in delay since last applied, in one UPDATE"""
+        keys = {(line.flight_number.strip().upper(), line.car_booking_id.date_of_service or line.start_date.date())
+                for line in lines}
+        statuses = self.search([
+            ('flight_number', 'in', list({number for number, _date in keys})),
+            ('flight_date', 'in', list({flight_date for _number, flight_date in keys})),
+        ])
+        delay_by_key = {(status.flight_number, status.flight_date): status.delay_minutes for status in statuses}
+
+        updates = []
+        for line in lines:
+            key = (line.flight_number.strip().upper(), line.car_booking_id.date_of_service or line.start_date.date())
+            if key not in delay_by_key:
+                continue
+            delay = delay_by_key[key]
+            shift = delay - (line.flight_delay_applied or 0)
+            if shift:
+                updates.append((line.id, shift, delay))
+        if not updates:
+            return True
+
+        # Pending ORM writes would otherwise overwrite the shifted times on flush
+        self.env['car.booking.line'].flush_model()
+        # write_date moves too: board signatures, exports and driver phones follow it
+        moved_pairs = execute_values(self.env.cr._obj, """
+            UPDATE car_booking_line l
+               SET start_date = l.start_date + v.shift * interval '1 minute',
+                   end_date = l.end_date + v.shift * interval '1 minute',
+                   flight_delay_applied = v.delay,
+                   write_date = NOW() AT TIME ZONE 'UTC',
+                   write_uid = v.uid
+              FROM (VALUES %s) AS v(id, shift, delay, uid)
+             WHERE l.id = v.id
+         RETURNING l.driver_name, l.id
+        """, [(line_id, shift, delay, self.env.uid) for line_id, shift, delay in updates], fetch=True)
+        moved = self.env['car.booking.line'].browse([line_id for line_id, _shift, _delay in updates])
+        moved.invalidate_recordset(['start_date', 'end_date', 'flight_delay_applied', 'write_date', 'write_uid'])
+        moved.modified(['start_date', 'end_date'])
+        self.env['car.booking.driver.sync.log']._touch(moved_pairs)
+        invalidate_board_cache(self.env.cr.dbname, set(moved.branch_id.ids))
+        _logger.info("Flight status: shifted pickup times of %s booking lines", len(updates))
+        return True
+
+
+class CarBookingLine(models.Model):
+    _inherit = 'car.booking.line'
+
+    flight_delay_applied = fields.Integer(
+        string='Flight Delay Applied (Minutes)',
+        readonly=True,
+        copy=False,
+        help="Delay already applied to the pickup time from flight tracking."
+    )
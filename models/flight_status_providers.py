@@ -0,0 +1,96 @@
+"""Flight status providers.
+
+A provider turns a batch of flight numbers for one service date into status
+dicts with one outbound request. Providers register themselves by name and
+are selected with the aw_car_booking.flight_provider system parameter.
+"""
+import logging
+import threading
+import time
+
+import requests
+
+_logger = logging.getLogger(__name__)
+
+PROVIDERS = {}
+
+
+def register_provider(name):
+    def decorator(cls):
+        PROVIDERS[name] = cls
+        return cls
+    return decorator
+
+
+def get_provider(name, **options):
+    provider_class = PROVIDERS.get(name)
+    if provider_class is None:
+        raise KeyError(f"Unknown flight status provider '{name}'")
+    return provider_class(**options)
+
+
+class RateLimiter:
+    """Token bucket shared by every poll of this process"""
+
+    def __init__(self, rate_per_minute):
+        self.capacity = max(float(rate_per_minute), 1.0)
+        self.tokens = self.capacity
+        self.refill_per_second = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token if one is available; never waits"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class FlightStatusProvider:
+    """Base provider: subclasses implement fetch()"""
+
+    #: Largest number of flights sent in one request
+    max_batch_size = 100
+
+    def __init__(self, url=None, api_key=None, timeout=10, **options):
+        self.url = url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.options = options
+
+    def fetch(self, flight_numbers, service_date):
+        """Return {flight_number: {'status': str, 'scheduled': datetime str,
+        'estimated': datetime str}} for the flights the provider knows."""
+        raise NotImplementedError()
+
+
+@register_provider('http_json')
+class HttpJsonFlightStatusProvider(FlightStatusProvider):
+    """POSTs {"date": ..., "flights": [...]} and expects {"flights": [{"flight_number": ...}, ...]}"""
+
+    def fetch(self, flight_numbers, service_date):
+        if not self.url:
+            raise ValueError("No flight status URL configured")
+        headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+        response = requests.post(
+            self.url,
+            json={'date': str(service_date), 'flights': list(flight_numbers)},
+            headers=headers,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        result = {}
+        for flight in response.json().get('flights', []):
+            number = flight.get('flight_number')
+            if number:
+                result[number] = {
+                    'status': flight.get('status'),
+                    'scheduled': flight.get('scheduled'),
+                    'estimated': flight.get('estimated'),
+                }
+        return result
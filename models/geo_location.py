@@ -0,0 +1,330 @@
+import logging
+
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api
+
+from .flight_status_providers import RateLimiter
+from .geocoding_providers import get_provider, normalize_place
+
+_logger = logging.getLogger(__name__)
+
+GEO_PARAM_PREFIX = 'aw_car_booking.geo_'
+DEFAULT_REQUESTS_PER_MINUTE = 60
+
+# Location field of a booking: (typed place, fallback typed place)
+LOCATION_TEXT_FIELDS = {
+    'location_from_id': ('location_from', 'From'),
+    'location_to_id': ('location_to', 'to'),
+}
+LOCATION_TRIGGER_FIELDS = {'location_from', 'location_to', 'From', 'to'}
+
+_providers = {}
+_rate_limiters = {}
+
+
+class CarBookingLocation(models.Model):
+    """A place named on bookings, cities or airports, geocoded once"""
+    _name = 'car.booking.location'
+    _description = 'Car Booking Location'
+    _order = 'name'
+
+    name = fields.Char(string='Name', required=True)
+    key = fields.Char(string='Key', required=True, readonly=True, index=True)
+    latitude = fields.Float(string='Latitude', digits=(10, 7))
+    longitude = fields.Float(string='Longitude', digits=(10, 7))
+    geocode_state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Geocoded'),
+        ('failed', 'Not Found'),
+    ], string='Geocoding', default='pending', required=True)
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(key)', 'Each place is stored once.'),
+    ]
+
+    # ------------------------------------------------------------------
+    #  Configuration
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_geo_param(self, key, default=None):
+        return self.env['ir.config_parameter'].sudo().get_param(GEO_PARAM_PREFIX + key, default)
+
+    @api.model
+    def _get_provider(self):
+        name = self._get_geo_param('provider')
+        if not name:
+            return None
+        options = {
+            'url': self._get_geo_param('provider_url'),
+            'api_key': self._get_geo_param('provider_key'),
+            'timeout': int(self._get_geo_param('provider_timeout', 10)),
+        }
+        # Providers may load a gazetteer, so they are built once per process and configuration
+        cache_key = (name, *options.values())
+        if cache_key not in _providers:
+            _providers[cache_key] = get_provider(name, **options)
+        return _providers[cache_key]
+
+    @api.model
+    def _get_rate_limiter(self):
+        rate = int(self._get_geo_param('requests_per_minute', DEFAULT_REQUESTS_PER_MINUTE))
+        limiter = _rate_limiters.get(self.env.cr.dbname)
+        if limiter is None or limiter.capacity != max(float(rate), 1.0):
+            limiter = _rate_limiters[self.env.cr.dbname] = RateLimiter(rate)
+        return limiter
+
+    # ------------------------------------------------------------------
+    #  Lookup
+    # ------------------------------------------------------------------
+    @api.model
+    def _find_or_create(self, names, create=True):
+        """{name: location} for free-text names; unknown places are created (not geocoded yet)
+        unless create is False, and are then left out"""
+        keys = {name: normalize_place(name) for name in names if name and normalize_place(name)}
+        if not keys:
+            return {}
+        # Places are shared by every user, whoever typed them first
+        locations = {location.key: location for location in self.sudo().search([('key', 'in', list(set(keys.values())))])}
+        missing = {}
+        for name, key in keys.items():
+            if key not in locations:
+                missing.setdefault(key, name.strip())
+        if missing and create:
+            # Another transaction may be adding the same place: the first row stored wins
+            now = fields.Datetime.now()
+            execute_values(self.env.cr._obj, """
+                INSERT INTO car_booking_location (name, key, geocode_state, create_uid, create_date, write_uid, write_date)
+                SELECT v.name, v.key, 'pending', v.uid, v.now, v.uid, v.now
+                  FROM (VALUES %s) AS v(name, key, uid, now)
+                    ON CONFLICT (key) DO NOTHING
+            """, [(name, key, self.env.uid, now) for key, name in sorted(missing.items())])
+            for location in self.sudo().search([('key', 'in', list(missing))]):
+                locations[location.key] = location
+        return {name: locations[key] for name, key in keys.items() if key in locations}
+
+    def _geocode(self):
+        """Geocode the pending locations, one provider request per batch"""
+        provider = self._get_provider()
+        pending = self.filtered(lambda location: location.geocode_state == 'pending')
+        if provider is None or not pending:
+            return False
+        limiter = self._get_rate_limiter()
+        for start in range(0, len(pending), provider.max_batch_size):
+            if not limiter.acquire():
+                _logger.info("Geocoding rate limit reached, resuming on next run")
+                return False
+            batch = pending[start:start + provider.max_batch_size]
+            try:
+                found = provider.geocode(batch.mapped('name'))
+            except Exception as e:
+                _logger.warning("Geocoding provider failed for %s places: %s", len(batch), e)
+                continue
+            for location in batch:
+                if location.name in found:
+                    latitude, longitude = found[location.name]
+                    location.write({'latitude': latitude, 'longitude': longitude, 'geocode_state': 'done'})
+                else:
+                    location.geocode_state = 'failed'
+        return True
+
+    @api.model
+    def _cron_geocode(self):
+        """Geocode the pending places, then route the bookings still without a distance"""
+        self.search([('geocode_state', '=', 'pending')])._geocode()
+        self.env['car.booking']._fill_missing_routes()
+        return True
+
+    def action_geocode(self):
+        self.filtered(lambda location: location.geocode_state == 'failed').geocode_state = 'pending'
+        self._geocode()
+        return True
+
+
+class CarBookingDistance(models.Model):
+    """Distance and duration between two locations, stored once per unordered pair"""
+    _name = 'car.booking.distance'
+    _description = 'Car Booking Distance Matrix'
+    _order = 'from_location_id, to_location_id'
+
+    from_location_id = fields.Many2one('car.booking.location', string='From', required=True, ondelete='cascade')
+    to_location_id = fields.Many2one('car.booking.location', string='To', required=True, ondelete='cascade')
+    distance_km = fields.Float(string='Distance (km)', readonly=True)
+    duration_minutes = fields.Float(string='Duration (Minutes)', readonly=True)
+    computed_at = fields.Datetime(string='Computed On', readonly=True)
+
+    _sql_constraints = [
+        ('pair_uniq', 'unique(from_location_id, to_location_id)', 'A pair of locations is stored once.'),
+        ('pair_order', 'CHECK(from_location_id < to_location_id)', 'Pairs are stored with the smaller location first.'),
+    ]
+
+    @api.model
+    def get_matrix(self, pairs, compute_missing=True):
+        """{(from id, to id): (km, minutes)} for location id pairs.
+
+        A->B and B->A share one row. Known pairs are read in one query;
+        unless compute_missing is False, the missing ones are geocoded and
+        routed on the spot, in provider batches, and stored. Pairs that
+        cannot be resolved are left out.
+        """
+        keys = {(min(a, b), max(a, b)) for a, b in pairs if a and b and a != b}
+        result = {}
+        if keys:
+            rows = execute_values(self.env.cr._obj, """
+                SELECT d.from_location_id, d.to_location_id, d.distance_km, d.duration_minutes
+                  FROM car_booking_distance d
+                  JOIN (VALUES %s) AS v(from_id, to_id)
+                    ON d.from_location_id = v.from_id AND d.to_location_id = v.to_id
+            """, sorted(keys), fetch=True)
+            result = {(row[0], row[1]): (row[2], row[3]) for row in rows}
+            missing = keys - set(result)
+            if missing and compute_missing:
+                result.update(self._compute_pairs(missing))
+        matrix = {}
+        for a, b in pairs:
+            if a == b and a:
+                matrix[(a, b)] = (0.0, 0.0)
+            elif (min(a, b), max(a, b)) in result:
+                matrix[(a, b)] = result[(min(a, b), max(a, b))]
+        return matrix
+
+    @api.model
+    def _compute_pairs(self, keys):
+        locations = self.env['car.booking.location'].sudo().browse(list({location_id for key in keys for location_id in key}))
+        locations._geocode()
+        provider = locations._get_provider()
+        coordinates = {
+            location.id: (location.latitude, location.longitude)
+            for location in locations if location.geocode_state == 'done'
+        }
+        routable = sorted(key for key in keys if key[0] in coordinates and key[1] in coordinates)
+        if provider is None or not routable:
+            return {}
+        computed = {}
+        limiter = locations._get_rate_limiter()
+        for start in range(0, len(routable), provider.max_batch_size):
+            if not limiter.acquire():
+                break
+            batch = routable[start:start + provider.max_batch_size]
+            try:
+                routes = provider.route([(coordinates[a], coordinates[b]) for a, b in batch])
+            except Exception as e:
+                _logger.warning("Routing provider failed for %s pairs: %s", len(batch), e)
+                continue
+            computed.update(zip(batch, routes))
+        if computed:
+            # Concurrent requests may compute the same pair; the first one stored wins
+            execute_values(self.env.cr._obj, """
+                INSERT INTO car_booking_distance
+                       (from_location_id, to_location_id, distance_km, duration_minutes, computed_at,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT v.from_id, v.to_id, v.km, v.minutes, v.now, v.uid, v.now, v.uid, v.now
+                  FROM (VALUES %s) AS v(from_id, to_id, km, minutes, uid, now)
+                    ON CONFLICT (from_location_id, to_location_id) DO NOTHING
+            """, [(a, b, km, minutes, self.env.uid, fields.Datetime.now()) for (a, b), (km, minutes) in computed.items()])
+        return computed
+
+
+class BookingCity(models.Model):
+    _inherit = 'booking.city'
+
+    location_id = fields.Many2one(
+        'car.booking.location', string='Location', compute='_compute_location_id', store=True, readonly=False)
+
+    @api.depends('name')
+    def _compute_location_id(self):
+        locations = self.env['car.booking.location']._find_or_create(self.mapped('name'))
+        for city in self:
+            city.location_id = locations.get(city.name, False)
+
+
+class Airport(models.Model):
+    _inherit = 'car.airport'
+
+    location_id = fields.Many2one(
+        'car.booking.location', string='Location', compute='_compute_location_id', store=True, readonly=False)
+
+    @api.depends('name')
+    def _compute_location_id(self):
+        locations = self.env['car.booking.location']._find_or_create(self.mapped('name'))
+        for airport in self:
+            airport.location_id = locations.get(airport.name, False)
+
+
+class CarBooking(models.Model):
+    _inherit = 'car.booking'
+
+    location_from_id = fields.Many2one(
+        'car.booking.location', string='Pickup Location',
+        compute='_compute_location_ids', store=True, readonly=False, index=True)
+    location_to_id = fields.Many2one(
+        'car.booking.location', string='Drop-off Location',
+        compute='_compute_location_ids', store=True, readonly=False, index=True)
+    route_distance_km = fields.Float(
+        string='Route Distance (km)', compute='_compute_route', store=True,
+        help="From the distance matrix; a pair not routed yet is filled in by the hourly geocoding job.")
+    route_duration_minutes = fields.Float(string='Route Duration (Minutes)', compute='_compute_route', store=True)
+
+    @api.depends('location_from', 'location_to', 'From', 'to')
+    def _compute_location_ids(self):
+        # Forms only look places up: the unknown ones are created once the booking is saved
+        create = all(self._ids)
+        names = [booking[primary] or booking[fallback]
+                 for booking in self for primary, fallback in LOCATION_TEXT_FIELDS.values()]
+        locations = self.env['car.booking.location']._find_or_create(names, create=create)
+        for booking in self:
+            for field_name, (primary, fallback) in LOCATION_TEXT_FIELDS.items():
+                booking[field_name] = locations.get(booking[primary] or booking[fallback], False)
+
+    def _resolve_typed_locations(self):
+        """Create and set the places typed on the bookings that a form could only look up"""
+        todo = [
+            (booking, field_name, booking[primary] or booking[fallback])
+            for booking in self
+            for field_name, (primary, fallback) in LOCATION_TEXT_FIELDS.items()
+            if not booking[field_name] and (booking[primary] or booking[fallback])
+        ]
+        if todo:
+            locations = self.env['car.booking.location']._find_or_create([name for _booking, _field, name in todo])
+            for booking, field_name, name in todo:
+                if name in locations:
+                    booking[field_name] = locations[name]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        bookings = super().create(vals_list)
+        bookings._resolve_typed_locations()
+        return bookings
+
+    def write(self, vals):
+        result = super().write(vals)
+        if LOCATION_TRIGGER_FIELDS.intersection(vals):
+            self._resolve_typed_locations()
+        return result
+
+    @api.depends('location_from_id', 'location_to_id')
+    def _compute_route(self):
+        # Stored pairs only: reading or editing a booking never calls the provider
+        matrix = self.env['car.booking.distance'].get_matrix(
+            [(booking.location_from_id.id, booking.location_to_id.id) for booking in self
+             if booking.location_from_id and booking.location_to_id], compute_missing=False)
+        for booking in self:
+            km, minutes = matrix.get((booking.location_from_id.id, booking.location_to_id.id), (0.0, 0.0))
+            booking.route_distance_km = km
+            booking.route_duration_minutes = minutes
+
+    @api.model
+    def _fill_missing_routes(self):
+        """Route the location pairs of bookings without a distance, then store it on them"""
+        bookings = self.search([
+            ('location_from_id', '!=', False),
+            ('location_to_id', '!=', False),
+            ('route_distance_km', '=', 0),
+        ]).filtered(lambda booking: booking.location_from_id != booking.location_to_id)
+        if not bookings:
+            return
+        self.env['car.booking.distance'].get_matrix(
+            [(booking.location_from_id.id, booking.location_to_id.id) for booking in bookings])
+        for field_name in ('route_distance_km', 'route_duration_minutes'):
+            self.env.add_to_compute(self._fields[field_name], bookings)
+        bookings.flush_recordset(['route_distance_km', 'route_duration_minutes'])
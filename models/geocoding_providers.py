@@ -0,0 +1,114 @@
+"""Geocoding and routing providers.
+
+A provider turns a batch of place names into coordinates, and a batch of
+coordinate pairs into road distances and durations, with one request per
+batch. Providers register themselves by name and are selected with the
+aw_car_booking.geo_provider system parameter; the gazetteer provider works
+offline from a CSV file and is the one to use for tests and demos.
+"""
+import csv
+import math
+import re
+
+import requests
+
+PROVIDERS = {}
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def register_provider(name):
+    def decorator(cls):
+        PROVIDERS[name] = cls
+        return cls
+    return decorator
+
+
+def get_provider(name, **options):
+    provider_class = PROVIDERS.get(name)
+    if provider_class is None:
+        raise KeyError(f"Unknown geocoding provider '{name}'")
+    return provider_class(**options)
+
+
+def normalize_place(name):
+    """Key under which a free-text place is stored: lower case, single spaces, no punctuation"""
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', name or '')).strip().lower()
+
+
+def haversine_km(latitude_1, longitude_1, latitude_2, longitude_2):
+    latitude_1, longitude_1, latitude_2, longitude_2 = map(math.radians, (latitude_1, longitude_1, latitude_2, longitude_2))
+    a = (math.sin((latitude_2 - latitude_1) / 2) ** 2
+         + math.cos(latitude_1) * math.cos(latitude_2) * math.sin((longitude_2 - longitude_1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GeoProvider:
+    """Base provider: subclasses implement geocode(), and route() when they know the roads"""
+
+    #: Largest number of places or pairs sent in one request
+    max_batch_size = 100
+    #: Straight-line distance times this factor estimates the road distance
+    road_factor = 1.3
+    #: Average speed used to estimate durations
+    average_speed_kmh = 50.0
+
+    def __init__(self, url=None, api_key=None, timeout=10, **options):
+        self.url = url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.options = options
+
+    def geocode(self, names):
+        """Return {name: (latitude, longitude)} for the names the provider knows"""
+        raise NotImplementedError()
+
+    def route(self, pairs):
+        """Return [(km, minutes)] for [((lat, lon), (lat, lon))], estimated from the straight line"""
+        result = []
+        for (latitude_1, longitude_1), (latitude_2, longitude_2) in pairs:
+            km = haversine_km(latitude_1, longitude_1, latitude_2, longitude_2) * self.road_factor
+            result.append((km, km / self.average_speed_kmh * 60.0))
+        return result
+
+
+@register_provider('gazetteer')
+class GazetteerGeoProvider(GeoProvider):
+    """Offline lookup in a CSV file (the provider URL) with name, latitude and longitude columns"""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.places = {}
+        if self.url:
+            with open(self.url, encoding='utf-8', newline='') as gazetteer:
+                for row in csv.DictReader(gazetteer):
+                    self.places[normalize_place(row['name'])] = (float(row['latitude']), float(row['longitude']))
+
+    def geocode(self, names):
+        return {name: self.places[normalize_place(name)] for name in names if normalize_place(name) in self.places}
+
+
+@register_provider('http_json')
+class HttpJsonGeoProvider(GeoProvider):
+    """POSTs {"places": [...]} to <url>/geocode and {"pairs": [[lat, lon, lat, lon], ...]} to <url>/route"""
+
+    def _post(self, path, payload):
+        if not self.url:
+            raise ValueError("No geocoding URL configured")
+        headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+        response = requests.post(f"{self.url.rstrip('/')}/{path}", json=payload, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def geocode(self, names):
+        result = {}
+        for place in self._post('geocode', {'places': list(names)}).get('places', []):
+            if place.get('name') and place.get('latitude') is not None and place.get('longitude') is not None:
+                result[place['name']] = (float(place['latitude']), float(place['longitude']))
+        return result
+
+    def route(self, pairs):
+        routes = self._post('route', {'pairs': [[*origin, *destination] for origin, destination in pairs]}).get('routes', [])
+        if len(routes) != len(pairs):
+            return super().route(pairs)
+        return [(float(route['km']), float(route['minutes'])) for route in routes]
@@ -0,0 +1,225 @@
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import psutil
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools import config
+from odoo.tools.pdf import PdfFileReader, PdfFileWriter
+
+_logger = logging.getLogger(__name__)
+
+INVOICE_REPORT = 'aw_car_booking.action_report_car_booking_invoice'
+MASS_PRINT_PARAM_PREFIX = 'aw_car_booking.mass_print_'
+DEFAULT_WORKERS = 2
+DEFAULT_CHUNK_SIZE = 50
+DEFAULT_MEMORY_MB = 1024
+DEFAULT_PDF_MAX_INVOICES = 500
+
+
+class CarBookingInvoicePrintJob(models.Model):
+    """Background rendering of many car booking invoices into one file.
+
+    Chunks of invoices are rendered in parallel, each worker thread with its
+    own cursor and its own wkhtmltopdf process, and written to disk as soon
+    as they are done; only the finished file is kept.
+    """
+    _name = 'car.booking.invoice.print.job'
+    _description = 'Car Booking Invoice Mass Print'
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', required=True, default=lambda self: fields.Datetime.to_string(fields.Datetime.now()))
+    move_ids = fields.Many2many('account.move', string='Invoices', required=True)
+    output_format = fields.Selection([
+        ('zip', 'ZIP of PDFs'),
+        ('pdf', 'Single merged PDF'),
+    ], string='Output', default='zip', required=True,
+        help="A merged PDF is built in memory and limited in size; large batches are printed as a ZIP of chunk PDFs.")
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='draft', required=True, readonly=True)
+    total_count = fields.Integer(string='Invoices to Print', readonly=True)
+    done_count = fields.Integer(string='Printed', readonly=True)
+    progress = fields.Float(string='Progress', compute='_compute_progress')
+    output_path = fields.Char(string='Output File', readonly=True, copy=False)
+    output_size = fields.Integer(string='Output Size (Bytes)', readonly=True, copy=False)
+    error = fields.Text(string='Error', readonly=True, copy=False)
+
+    @api.depends('total_count', 'done_count')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = 100.0 * job.done_count / job.total_count if job.total_count else 0.0
+
+    # ------------------------------------------------------------------
+    #  Configuration
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_print_param(self, key, default):
+        return int(self.env['ir.config_parameter'].sudo().get_param(MASS_PRINT_PARAM_PREFIX + key, default))
+
+    def _get_output_dir(self):
+        path = os.path.join(config.filestore(self.env.cr.dbname), 'car_booking_mass_print')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    # ------------------------------------------------------------------
+    #  Actions
+    # ------------------------------------------------------------------
+    def action_start(self):
+        for job in self:
+            if job.state not in ('draft', 'failed'):
+                raise UserError("Only draft or failed print jobs can be started.")
+            max_invoices = self._get_print_param('pdf_max_invoices', DEFAULT_PDF_MAX_INVOICES)
+            if job.output_format == 'pdf' and len(job.move_ids) > max_invoices:
+                raise UserError(
+                    f"A single merged PDF is limited to {max_invoices} invoices, as it is built in memory. "
+                    f"Print the {len(job.move_ids)} invoices as a ZIP of PDFs instead.")
+        self.write({'state': 'queued', 'done_count': 0, 'error': False})
+        self.env.ref('aw_car_booking.ir_cron_car_booking_mass_print')._trigger()
+        return True
+
+    def action_download(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/car_booking/mass_print/{self.id}',
+            'target': 'self',
+        }
+
+    def unlink(self):
+        for job in self:
+            if job.output_path and os.path.isfile(job.output_path):
+                os.remove(job.output_path)
+        return super().unlink()
+
+    # ------------------------------------------------------------------
+    #  Rendering
+    # ------------------------------------------------------------------
+    @api.model
+    def _cron_process_jobs(self):
+        for job in self.search([('state', '=', 'queued')], order='id'):
+            job._run()
+
+    def _render_chunk(self, move_ids):
+        """Render one chunk on a dedicated cursor; safe to call from a worker thread"""
+        with self.env.registry.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            pdf_content, _content_type = env['ir.actions.report']._render_qweb_pdf(INVOICE_REPORT, move_ids)
+        return pdf_content
+
+    def _run(self):
+        self.ensure_one()
+        workers = max(self._get_print_param('workers', DEFAULT_WORKERS), 1)
+        chunk_size = max(self._get_print_param('chunk_size', DEFAULT_CHUNK_SIZE), 1)
+        memory_cap = self._get_print_param('memory_mb', DEFAULT_MEMORY_MB) * 1024 * 1024
+        move_ids = self.move_ids.sorted('name').ids
+        chunks = [move_ids[start:start + chunk_size] for start in range(0, len(move_ids), chunk_size)]
+        self.write({'state': 'running', 'total_count': len(move_ids), 'done_count': 0})
+        self.env.cr.commit()
+
+        work_dir = tempfile.mkdtemp(prefix='car_booking_print_')
+        process = psutil.Process()
+        try:
+            chunk_paths = {}
+            pending = {}
+            next_chunk = 0
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                while next_chunk < len(chunks) or pending:
+                    # Keep at most `workers` chunks in flight, and none while over the memory cap
+                    while next_chunk < len(chunks) and len(pending) < workers \
+                            and (not pending or process.memory_info().rss < memory_cap):
+                        pending[executor.submit(self._render_chunk, chunks[next_chunk])] = next_chunk
+                        next_chunk += 1
+                    finished, _running = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        index = pending.pop(future)
+                        path = os.path.join(work_dir, f'{index:05d}.pdf')
+                        with open(path, 'wb') as chunk_file:
+                            chunk_file.write(future.result())
+                        chunk_paths[index] = path
+                        self.done_count += len(chunks[index])
+                    self.env.cr.commit()
+            output_path = self._assemble_output([chunk_paths[index] for index in range(len(chunks))], chunks)
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.exception("Car booking invoice mass print %s failed", self.id)
+            self.write({'state': 'failed', 'error': str(e)})
+            self.env.cr.commit()
+            return False
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        if self.output_path and self.output_path != output_path and os.path.isfile(self.output_path):
+            os.remove(self.output_path)
+        self.write({'state': 'done', 'output_path': output_path, 'output_size': os.path.getsize(output_path)})
+        self.env.cr.commit()
+        _logger.info("Car booking invoice mass print %s: %s invoices in %s chunks", self.id, len(move_ids), len(chunks))
+        return True
+
+    def _assemble_output(self, chunk_paths, chunks):
+        """Zip or merge the chunk files into the job's output file"""
+        moves = {move.id: move for move in self.env['account.move'].browse([mid for chunk in chunks for mid in chunk])}
+        base = os.path.join(self._get_output_dir(), f'job_{self.id}')
+        if self.output_format == 'zip':
+            output_path = base + '.zip'
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for path, chunk in zip(chunk_paths, chunks):
+                    first, last = moves[chunk[0]].name, moves[chunk[-1]].name
+                    entry = f"{first}_{last}.pdf" if first != last else f"{first}.pdf"
+                    archive.write(path, entry.replace('/', '-'))
+            return output_path
+
+        # The writer holds every page of the merged document until it is written:
+        # action_start caps single-PDF jobs at pdf_max_invoices, larger ones get the ZIP
+        output_path = base + '.pdf'
+        self._merge_pdf_files(chunk_paths, output_path)
+        return output_path
+
+    @api.model
+    def _merge_pdf_files(self, paths, output_path):
+        """Concatenate the pages of the PDF files at `paths` into `output_path`"""
+        writer = PdfFileWriter()
+        streams = []
+        try:
+            for path in paths:
+                stream = open(path, 'rb')
+                streams.append(stream)
+                reader = PdfFileReader(stream, strict=False)
+                for page_number in range(reader.getNumPages()):
+                    writer.addPage(reader.getPage(page_number))
+            with open(output_path, 'wb') as output_file:
+                writer.write(output_file)
+        finally:
+            for stream in streams:
+                stream.close()
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def action_mass_print_car_booking_invoices(self):
+        """Queue a background print job for the selected car booking invoices"""
+        moves = self.filtered(lambda move: move.car_booking_id and move.move_type == 'out_invoice')
+        if not moves:
+            raise UserError("None of the selected entries is a car booking invoice.")
+        job = self.env['car.booking.invoice.print.job'].create({
+            'name': f"{len(moves)} invoices - {fields.Datetime.to_string(fields.Datetime.now())}",
+            'move_ids': [(6, 0, moves.ids)],
+        })
+        job.action_start()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'car.booking.invoice.print.job',
+            'res_id': job.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
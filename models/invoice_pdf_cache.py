@@ -0,0 +1,62 @@
+import hashlib
+
+from odoo import models
+
+INVOICE_REPORT = 'aw_car_booking.action_report_car_booking_invoice'
+INVOICE_TEMPLATE_KEYS = [
+    'aw_car_booking.car_booking_invoice_template',
+    'aw_car_booking.car_booking_invoice_header',
+    'aw_car_booking.car_booking_invoice_footer',
+]
+PDF_CACHE_PREFIX = 'Car_Booking_Invoice_'
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def _get_car_booking_pdf_fingerprint(self):
+        """Hash of everything the printed invoice depends on; any edit, including
+        to the company header/footer images or the templates, changes it"""
+        self.ensure_one()
+        views = self.env['ir.ui.view'].sudo().search([('key', 'in', INVOICE_TEMPLATE_KEYS)])
+        inputs = [
+            self.name,
+            self.write_date,
+            max(self.line_ids.mapped('write_date'), default=None),
+            self.partner_id.write_date,
+            self.company_id.write_date,
+            self.car_booking_id.write_date,
+            self.env.ref(INVOICE_REPORT).sudo().write_date,
+            sorted(views.mapped('write_date')),
+            self.env.lang,
+        ]
+        return hashlib.sha256(repr(inputs).encode()).hexdigest()[:16]
+
+    def _get_car_booking_pdf_cache_name(self):
+        """Attachment name under which the PDF of a posted invoice is kept (False: do not cache)"""
+        self.ensure_one()
+        if self.state != 'posted':
+            return False
+        return f"{PDF_CACHE_PREFIX}{self.name}_{self._get_car_booking_pdf_fingerprint()}.pdf"
+
+    def _clear_car_booking_pdf_cache(self):
+        self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', 'account.move'),
+            ('res_id', 'in', self.ids),
+            ('name', '=like', f'{PDF_CACHE_PREFIX}%.pdf'),
+        ]).unlink()
+
+    def button_draft(self):
+        self._clear_car_booking_pdf_cache()
+        return super().button_draft()
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    def _prepare_pdf_report_attachment_vals_list(self, report, streams):
+        vals_list = super()._prepare_pdf_report_attachment_vals_list(report, streams)
+        if report.report_name == 'aw_car_booking.car_booking_invoice_template' and vals_list:
+            # The new fingerprinted PDF supersedes whatever was cached for the invoice
+            self.env['account.move'].browse([vals['res_id'] for vals in vals_list])._clear_car_booking_pdf_cache()
+        return vals_list
@@ -12,4 +12,23 @@ class ResCompany(models.Model):
     image_field_2 = fields.Binary(
         string='Footer Image', 
         help='Image to be displayed in the footer of reports'
-    ) 
\ No newline at end of file
+    )
+
+    # Report-resolution copies, regenerated by the ORM whenever the originals
+    # are uploaded: the templates embed these on every page instead of the
+    # full-size images.
+    report_header_image = fields.Image(
+        string='Header Image (Reports)',
+        related='image_field_1',
+        max_width=1200,
+        max_height=400,
+        store=True
+    )
+
+    report_footer_image = fields.Image(
+        string='Footer Image (Reports)',
+        related='image_field_2',
+        max_width=1200,
+        max_height=120,
+        store=True
+    )
@@ -5,4 +5,9 @@ class ResPartner(models.Model):
 
     id_no = fields.Char(string='Driver ID No')
     customized_mobile = fields.Char(string='Customized Mobile')
-    national_identity_number = fields.Char(string='National Identity Number')
\ No newline at end of file
+    national_identity_number = fields.Char(string='National Identity Number')
+    is_driver = fields.Boolean(
+        string='Driver',
+        index=True,
+        help="Chauffeur offered by the auto-assignment to the lines of the partner's company (branch)."
+    )
\ No newline at end of file
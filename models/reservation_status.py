@@ -0,0 +1,97 @@
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Reservation lifecycle: created -> invoice_released -> paid -> active -> finished.
+# The cron only ever moves bookings forward, from the statuses listed for each
+# transition. Trips only become active or finished once paid: a started or
+# ended trip whose invoice is still open keeps its unpaid status instead of
+# skipping 'paid' for good.
+RESERVATION_FROM_STATUSES = {
+    'paid': ('created', 'invoice_released'),
+    'active': ('paid',),
+    'finished': ('paid', 'active'),
+}
+# Booking states in which a trip can actually be running or done
+OPERATIONAL_STATES = ('confirm', 'scheduled', 'departed', 'completed', 'invoiced')
+
+# One statement per transition: {condition} is the extra predicate on booking b
+RESERVATION_TRANSITIONS = [
+    ('paid', """
+        EXISTS (SELECT 1 FROM account_move m
+                 WHERE m.id = b.invoice_id AND m.payment_state = 'paid')
+    """),
+    ('active', """
+        b.state IN %(operational_states)s
+        AND EXISTS (SELECT 1 FROM car_booking_line l
+                     WHERE l.car_booking_id = b.id AND l.start_date <= %(now)s)
+    """),
+    ('finished', """
+        b.state IN %(operational_states)s
+        AND (SELECT MAX(l.end_date) FROM car_booking_line l WHERE l.car_booking_id = b.id) <= %(now)s
+    """),
+]
+
+
+class CarBooking(models.Model):
+    _inherit = 'car.booking'
+
+    def init(self):
+        super().init()
+        # The cron only looks at bookings still moving through the lifecycle
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS car_booking_open_reservation_idx
+                ON car_booking (reservation_status)
+             WHERE reservation_status IN ('created', 'invoice_released', 'paid', 'active')
+        """)
+
+    @api.model
+    def _advance_reservation_status(self, to_status, condition, now):
+        """Move every booking in one of to_status' source statuses and matching condition
+        to to_status in one UPDATE.
+
+        Returns [(booking id, previous status)] of the bookings moved.
+        """
+        from_statuses = RESERVATION_FROM_STATUSES[to_status]
+        self.env.cr.execute(f"""
+            UPDATE car_booking b
+               SET reservation_status = %(to_status)s,
+                   write_uid = %(uid)s,
+                   write_date = %(now)s
+              FROM car_booking old
+             WHERE old.id = b.id
+               AND b.reservation_status IN %(from_statuses)s
+               AND {condition}
+         RETURNING b.id, old.reservation_status
+        """, {
+            'to_status': to_status,
+            'from_statuses': from_statuses,
+            'operational_states': OPERATIONAL_STATES,
+            'uid': self.env.uid,
+            'now': now,
+        })
+        moved = self.env.cr.fetchall()
+        if moved:
+            # Keep the stored related copy on the lines in step
+            self.env.cr.execute("""
+                UPDATE car_booking_line
+                   SET reservation_status = %s
+                 WHERE car_booking_id = ANY(%s)
+            """, (to_status, [booking_id for booking_id, _old in moved]))
+        return moved
+
+    @api.model
+    def _cron_update_reservation_status(self):
+        """Advance reservation statuses: paid invoices, started and ended trips"""
+        self.env.flush_all()
+        now = fields.Datetime.now()
+        result = {}
+        for to_status, condition in RESERVATION_TRANSITIONS:
+            moved = self._advance_reservation_status(to_status, condition, now)
+            result[to_status] = moved
+            _logger.info("Reservation status: %s bookings moved to %s", len(moved), to_status)
+        self.invalidate_model(['reservation_status', 'write_uid', 'write_date'])
+        self.env['car.booking.line'].invalidate_model(['reservation_status'])
+        return result
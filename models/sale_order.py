@@ -11,6 +11,13 @@ class SaleOrder(models.Model):
         help="Reference to the car booking created from this sales order"
     )
 
+    car_booking_archive_id = fields.Many2one(
+        'car.booking.archive',
+        string='Archived Car Booking',
+        readonly=True,
+        help="Archive stub of the car booking once it has been moved to cold storage"
+    )
+
     custom_amount_untaxed = fields.Monetary(
         string='Custom Untaxed Amount',
         compute='_compute_custom_amounts',
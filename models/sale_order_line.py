@@ -2,6 +2,8 @@ from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 import logging
 
+from . import booking_kernel
+
 _logger = logging.getLogger(__name__)
 
 
@@ -72,32 +74,23 @@ class SaleOrderLine(models.Model):
                 additional_charges = line.additional_charges or 0.0
                 discount = line.discount or 0.0
                 
-                # Calculate base amount: duration * qty * price_unit
-                base_amount = duration * qty * price_unit
-                
-                # Add additional charges
-                subtotal_with_charges = base_amount + additional_charges
-                
-                # Apply discount
-                discount_amount = subtotal_with_charges * (discount / 100.0)
-                subtotal_after_discount = subtotal_with_charges - discount_amount
+                # duration * qty * price_unit + additional charges, less discount
+                subtotal_after_discount = booking_kernel.order_line_subtotal(
+                    duration, qty, price_unit, additional_charges, discount)
                 
                 # Calculate taxes as Price Excluded (add on top)
-                tax_amount = 0.0
-                for tax in line.tax_id:
-                    if tax.amount_type == 'percent':
-                        # Calculate VAT as Price Excluded (add on top)
-                        tax_amount += subtotal_after_discount * (tax.amount / 100.0)
-                    else:
-                        # For other tax types, use standard computation
-                        taxes_res = tax.compute_all(
-                    subtotal_after_discount,
-                    line.order_id.currency_id,
-                    line.product_uom_qty,
-                    product=line.product_id,
-                    partner=line.order_id.partner_shipping_id
-                )
-                        tax_amount += taxes_res['total_included'] - taxes_res['total_excluded']
+                percent_taxes = line.tax_id.filtered(lambda tax: tax.amount_type == 'percent')
+                tax_amount = booking_kernel.excluded_tax(subtotal_after_discount, percent_taxes.mapped('amount'))
+                for tax in line.tax_id - percent_taxes:
+                    # For other tax types, use standard computation
+                    taxes_res = tax.compute_all(
+                        subtotal_after_discount,
+                        line.order_id.currency_id,
+                        line.product_uom_qty,
+                        product=line.product_id,
+                        partner=line.order_id.partner_shipping_id
+                    )
+                    tax_amount += taxes_res['total_included'] - taxes_res['total_excluded']
                 
                 # Set the computed values
                 line.price_subtotal = subtotal_after_discount
@@ -105,7 +98,8 @@ class SaleOrderLine(models.Model):
                 line.price_total = subtotal_after_discount + tax_amount
                 
                 # Debug logging
-                _logger.info(f'Line {line.id}: duration={duration}, qty={qty}, price_unit={price_unit}, additional_charges={additional_charges}, base_amount={base_amount}, subtotal_with_charges={subtotal_with_charges}, final_subtotal={subtotal_after_discount}')
+                _logger.debug('Line %s: duration=%s, qty=%s, price_unit=%s, additional_charges=%s, final_subtotal=%s',
+                              line.id, duration, qty, price_unit, additional_charges, subtotal_after_discount)
             else:
                 # Use standard calculation for non-car booking lines
                 super()._compute_amount()
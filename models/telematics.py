@@ -0,0 +1,397 @@
+import glob
+import gzip
+import logging
+import os
+import shutil
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+from . import telematics_kernel as kernel
+
+_logger = logging.getLogger(__name__)
+
+TELEMATICS_PARAM_PREFIX = 'aw_car_booking.telematics_'
+DEFAULT_BATCH_SIZE = 20000
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_OVERRUN_HOURS = 6
+DEFAULT_LEAD_MINUTES = 60
+DEFAULT_TOLERANCE_MINUTES = 15
+LINE_CHUNK_SIZE = 1000
+FILE_PATTERNS = ('*.csv', '*.csv.gz', '*.ndjson', '*.ndjson.gz', '*.jsonl', '*.jsonl.gz')
+
+# Actual hours and km of each line from the moving points of its vehicle:
+# the window runs from shortly before the booked start until the booked end
+# plus the allowed overrun, and never into the next line of the vehicle.
+# Without odometer readings, km are summed from consecutive positions.
+# Only lines whose values change are written (and stamped, so incremental
+# exports and the driver sync pick them up).
+USAGE_QUERY = """
+    WITH windows AS (
+        SELECT l.id,
+               l.fleet_vehicle_id AS vehicle_id,
+               l.start_date - %(lead)s AS window_start,
+               LEAST(l.end_date + %(overrun)s, COALESCE(n.next_start, 'infinity')) AS window_end
+          FROM car_booking_line l
+     LEFT JOIN LATERAL (
+                SELECT MIN(o.start_date) AS next_start
+                  FROM car_booking_line o
+                 WHERE o.fleet_vehicle_id = l.fleet_vehicle_id
+                   AND o.start_date > l.start_date
+               ) n ON TRUE
+         WHERE l.id = ANY(%(line_ids)s)
+           AND l.fleet_vehicle_id IS NOT NULL
+           AND l.start_date IS NOT NULL
+           AND l.end_date IS NOT NULL
+    ),
+    moves AS (
+        SELECT w.id,
+               p.timestamp,
+               p.odometer,
+               p.latitude,
+               p.longitude,
+               LAG(p.latitude) OVER track AS prev_latitude,
+               LAG(p.longitude) OVER track AS prev_longitude
+          FROM windows w
+          JOIN car_booking_telematics_point p
+            ON p.vehicle_id = w.vehicle_id
+           AND p.timestamp >= w.window_start
+           AND p.timestamp < w.window_end
+         WHERE p.timestamp >= %(date_from)s
+           AND p.timestamp < %(date_to)s
+           AND (p.speed IS NULL OR p.speed > 0)
+        WINDOW track AS (PARTITION BY w.id ORDER BY p.timestamp)
+    ),
+    usage AS (
+        SELECT id,
+               EXTRACT(EPOCH FROM MAX(timestamp) - MIN(timestamp)) / 3600.0 AS hours,
+               COALESCE(
+                   MAX(odometer) - MIN(odometer),
+                   SUM(2 * 6371 * ASIN(SQRT(
+                       POWER(SIN(RADIANS(latitude - prev_latitude) / 2), 2)
+                       + COS(RADIANS(prev_latitude)) * COS(RADIANS(latitude))
+                       * POWER(SIN(RADIANS(longitude - prev_longitude) / 2), 2)
+                   )))
+               ) AS km
+          FROM moves
+      GROUP BY id
+    ),
+    computed AS (
+        SELECT l.id,
+               u.hours::float8 AS hours,
+               u.km::float8 AS km,
+               CASE WHEN u.hours IS NOT NULL
+                    THEN GREATEST(0, CEIL(u.hours - COALESCE(l.total_hours, 0) - %(tolerance)s))::int
+               END AS proposed
+          FROM car_booking_line l
+     LEFT JOIN usage u ON u.id = l.id
+         WHERE l.id = ANY(%(line_ids)s)
+    )
+    UPDATE car_booking_line l
+       SET telematics_hours = c.hours,
+           telematics_km = c.km,
+           proposed_extra_hour = c.proposed,
+           write_uid = %(uid)s,
+           write_date = NOW() AT TIME ZONE 'UTC'
+      FROM computed c
+     WHERE l.id = c.id
+       AND (l.telematics_hours IS DISTINCT FROM c.hours
+            OR l.telematics_km IS DISTINCT FROM c.km
+            OR l.proposed_extra_hour IS DISTINCT FROM c.proposed)
+ RETURNING l.driver_name, l.id
+"""
+
+
+class CarBookingTelematicsPoint(models.Model):
+    """GPS/odometer points, in a table partitioned by day.
+
+    The table is created by init() rather than the ORM so that it can be
+    range partitioned: points are loaded with COPY, the partitions a batch
+    needs are created on the fly and old days are dropped as a whole.
+    """
+    _name = 'car.booking.telematics.point'
+    _description = 'Vehicle Telematics Point'
+    _auto = False
+    _log_access = False
+    _order = 'timestamp'
+
+    vehicle_id = fields.Many2one('fleet.vehicle', string='Vehicle', readonly=True)
+    timestamp = fields.Datetime(string='Timestamp', readonly=True)
+    latitude = fields.Float(string='Latitude', readonly=True)
+    longitude = fields.Float(string='Longitude', readonly=True)
+    odometer = fields.Float(string='Odometer (km)', readonly=True)
+    speed = fields.Float(string='Speed (km/h)', readonly=True)
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE TABLE IF NOT EXISTS car_booking_telematics_point (
+                id bigserial,
+                vehicle_id integer NOT NULL,
+                timestamp timestamp NOT NULL,
+                latitude real,
+                longitude real,
+                odometer double precision,
+                speed real
+            ) PARTITION BY RANGE (timestamp)
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS car_booking_telematics_point_vehicle_timestamp_idx
+                ON car_booking_telematics_point (vehicle_id, timestamp)
+        """)
+
+    @api.model
+    def _partition_name(self, day):
+        return f"car_booking_telematics_point_{day:%Y%m%d}"
+
+    @api.model
+    def _ensure_partitions(self, days):
+        for day in sorted(days):
+            self.env.cr.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self._partition_name(day)}
+                    PARTITION OF car_booking_telematics_point
+                    FOR VALUES FROM (%s) TO (%s)
+            """, (day, day + timedelta(days=1)))
+
+    @api.model
+    def _copy_points(self, rows):
+        """Bulk load [(vehicle id, timestamp, lat, lon, odometer, speed)] with COPY"""
+        self.env.cr._obj.copy_expert("""
+            COPY car_booking_telematics_point (vehicle_id, timestamp, latitude, longitude, odometer, speed)
+            FROM STDIN WITH (FORMAT csv)
+        """, kernel.copy_buffer(rows))
+
+    @api.model
+    def _drop_old_partitions(self, retention_days):
+        oldest = fields.Date.today() - timedelta(days=retention_days)
+        self.env.cr.execute("""
+            SELECT c.relname
+              FROM pg_inherits i
+              JOIN pg_class c ON c.oid = i.inhrelid
+              JOIN pg_class parent ON parent.oid = i.inhparent
+             WHERE parent.relname = 'car_booking_telematics_point'
+               AND c.relname < %s
+        """, (self._partition_name(oldest),))
+        for (name,) in self.env.cr.fetchall():
+            self.env.cr.execute(f'DROP TABLE IF EXISTS "{name}"')
+
+
+class CarBookingTelematicsImport(models.Model):
+    _name = 'car.booking.telematics.import'
+    _description = 'Vehicle Telematics Import'
+    _order = 'id desc'
+
+    name = fields.Char(string='File', required=True, readonly=True)
+    source = fields.Selection([
+        ('folder', 'Drop Folder'),
+        ('upload', 'Upload'),
+    ], string='Source', required=True, readonly=True)
+    state = fields.Selection([
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', readonly=True)
+    point_count = fields.Integer(string='Points', readonly=True)
+    skipped_count = fields.Integer(string='Skipped Rows', readonly=True)
+    date_from = fields.Datetime(string='First Point', readonly=True)
+    date_to = fields.Datetime(string='Last Point', readonly=True)
+    line_count = fields.Integer(string='Lines Updated', readonly=True)
+    error = fields.Text(string='Error', readonly=True)
+
+    # ------------------------------------------------------------------
+    #  Configuration
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_telematics_param(self, key, default=None):
+        return self.env['ir.config_parameter'].sudo().get_param(TELEMATICS_PARAM_PREFIX + key, default)
+
+    @api.model
+    def _get_vehicle_keys(self):
+        """Vehicle id by license plate, VIN and database id, as device files name them"""
+        keys = {}
+        for vehicle in self.env['fleet.vehicle'].with_context(active_test=False).search_read([], ['license_plate', 'vin_sn']):
+            keys[str(vehicle['id'])] = vehicle['id']
+            for key in (vehicle['vin_sn'], vehicle['license_plate']):
+                if key:
+                    keys[key.strip().upper()] = vehicle['id']
+        return keys
+
+    # ------------------------------------------------------------------
+    #  Parsing
+    # ------------------------------------------------------------------
+    @api.model
+    def _iter_records(self, text_stream, name):
+        """Yield one dict per point, reading the stream line by line"""
+        return kernel.iter_records(text_stream, name)
+
+    @api.model
+    def _parse_timestamp(self, value):
+        return kernel.parse_timestamp(value)
+
+    @api.model
+    def _parse_point(self, record, vehicle_keys):
+        """(vehicle id, timestamp, lat, lon, odometer, speed), or None for an unusable row"""
+        return kernel.parse_point(record, vehicle_keys)
+
+    # ------------------------------------------------------------------
+    #  Ingestion
+    # ------------------------------------------------------------------
+    @api.model
+    def ingest_stream(self, text_stream, name, source='upload'):
+        """Load a CSV or NDJSON stream of points in batches, then refresh the matching lines.
+
+        Only one batch is held in memory at a time, whatever the file size.
+        """
+        self.env['car.booking.telematics.point'].check_access('create')
+        points = self.env['car.booking.telematics.point'].sudo()
+        batch_size = max(int(self._get_telematics_param('batch_size', DEFAULT_BATCH_SIZE)), 1)
+        vehicle_keys = self._get_vehicle_keys()
+        known_days = set()
+        vehicle_ids = set()
+        batch = []
+        point_count = skipped_count = 0
+        date_from = date_to = None
+
+        def flush(batch):
+            days = {point[1].date() for point in batch} - known_days
+            if days:
+                points._ensure_partitions(days)
+                known_days.update(days)
+            points._copy_points(batch)
+
+        for record in self._iter_records(text_stream, name):
+            point = self._parse_point(record, vehicle_keys)
+            if point is None:
+                skipped_count += 1
+                continue
+            batch.append(point)
+            vehicle_ids.add(point[0])
+            date_from = min(date_from, point[1]) if date_from else point[1]
+            date_to = max(date_to, point[1]) if date_to else point[1]
+            if len(batch) >= batch_size:
+                flush(batch)
+                point_count += len(batch)
+                batch = []
+        if batch:
+            flush(batch)
+            point_count += len(batch)
+
+        line_count = 0
+        if point_count:
+            overrun = timedelta(hours=int(self._get_telematics_param('overrun_hours', DEFAULT_OVERRUN_HOURS)))
+            lines = self.env['car.booking.line'].sudo().search([
+                ('fleet_vehicle_id', 'in', list(vehicle_ids)),
+                ('start_date', '<=', date_to),
+                ('end_date', '>=', date_from - overrun),
+            ])
+            lines._compute_telematics_usage()
+            line_count = len(lines)
+        _logger.info("Car booking telematics: %s points (%s rows skipped) from %s, %s lines updated",
+                     point_count, skipped_count, name, line_count)
+        return self.create({
+            'name': name,
+            'source': source,
+            'state': 'done',
+            'point_count': point_count,
+            'skipped_count': skipped_count,
+            'date_from': date_from,
+            'date_to': date_to,
+            'line_count': line_count,
+        })
+
+    @api.model
+    def _open_file(self, path):
+        if path.endswith('.gz'):
+            return gzip.open(path, 'rt', encoding='utf-8', newline='')
+        return open(path, encoding='utf-8', newline='')
+
+    @api.model
+    def _cron_ingest_folder(self):
+        """Load every file of the drop folder, moving each to processed/ or failed/"""
+        folder = self._get_telematics_param('dir')
+        if folder:
+            paths = sorted({path for pattern in FILE_PATTERNS for path in glob.glob(os.path.join(folder, pattern))})
+            for path in paths:
+                name = os.path.basename(path)
+                try:
+                    with self._open_file(path) as text_stream:
+                        self.ingest_stream(text_stream, name, source='folder')
+                    self.env.cr.commit()
+                    target = 'processed'
+                except Exception as e:
+                    self.env.cr.rollback()
+                    _logger.exception("Car booking telematics: import of %s failed", path)
+                    self.create({'name': name, 'source': 'folder', 'state': 'failed', 'error': str(e)})
+                    self.env.cr.commit()
+                    target = 'failed'
+                os.makedirs(os.path.join(folder, target), exist_ok=True)
+                shutil.move(path, os.path.join(folder, target, name))
+        retention = int(self._get_telematics_param('retention_days', DEFAULT_RETENTION_DAYS))
+        self.env['car.booking.telematics.point'].sudo()._drop_old_partitions(retention)
+        return True
+
+
+class CarBookingLine(models.Model):
+    _inherit = 'car.booking.line'
+
+    telematics_hours = fields.Float(string='GPS Hours', readonly=True, copy=False,
+                                    help="Hours between the first and last movement of the vehicle around this line.")
+    telematics_km = fields.Float(string='GPS Km', readonly=True, copy=False)
+    proposed_extra_hour = fields.Integer(string='Proposed Extra Hours', readonly=True, copy=False,
+                                         help="Hours driven beyond the booked duration, from the GPS log.")
+
+    def _compute_telematics_usage(self):
+        """Set GPS hours, km and proposed extra hours of the lines from the stored points, set-wise"""
+        imports = self.env['car.booking.telematics.import']
+        lead = timedelta(minutes=int(imports._get_telematics_param('lead_minutes', DEFAULT_LEAD_MINUTES)))
+        overrun = timedelta(hours=int(imports._get_telematics_param('overrun_hours', DEFAULT_OVERRUN_HOURS)))
+        tolerance = int(imports._get_telematics_param('tolerance_minutes', DEFAULT_TOLERANCE_MINUTES)) / 60.0
+        lines = self.filtered(lambda line: line.fleet_vehicle_id and line.start_date and line.end_date)
+        self.flush_recordset(['fleet_vehicle_id', 'start_date', 'end_date', 'total_hours'])
+        changed_pairs = []
+        for start in range(0, len(lines), LINE_CHUNK_SIZE):
+            chunk = lines[start:start + LINE_CHUNK_SIZE]
+            self.env.cr.execute(USAGE_QUERY, {
+                'line_ids': chunk.ids,
+                'lead': lead,
+                'overrun': overrun,
+                'tolerance': tolerance,
+                'uid': self.env.uid,
+                # Bounds of every window of the chunk, so only the partitions concerned are scanned
+                'date_from': min(chunk.mapped('start_date')) - lead,
+                'date_to': max(chunk.mapped('end_date')) + overrun,
+            })
+            changed_pairs += self.env.cr.fetchall()
+        self.invalidate_recordset(['telematics_hours', 'telematics_km', 'proposed_extra_hour', 'write_uid', 'write_date'])
+        # Drivers see the proposed extra hours on the phone
+        self.env['car.booking.driver.sync.log']._touch(changed_pairs)
+
+    def action_compute_telematics(self):
+        self._compute_telematics_usage()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'GPS Usage',
+                'type': 'info',
+                'message': f"GPS usage computed for {len(self)} lines.",
+                'sticky': False,
+            },
+        }
+
+    def action_apply_proposed_extra_hour(self):
+        """Copy the proposed extra hours into extra_hour, one write per distinct value"""
+        lines = self.filtered(lambda line: line.proposed_extra_hour and line.proposed_extra_hour != line.extra_hour)
+        if not lines:
+            raise UserError("None of the selected lines has a new proposed extra hour value.")
+        for value in set(lines.mapped('proposed_extra_hour')):
+            lines.filtered(lambda line: line.proposed_extra_hour == value).write({'extra_hour': value})
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Extra Hours',
+                'type': 'success',
+                'message': f"Extra hours updated on {len(lines)} lines.",
+                'sticky': False,
+            },
+        }
@@ -0,0 +1,77 @@
+"""Parsing of vehicle GPS/odometer exports into rows ready for COPY.
+
+Plain Python on purpose: no ORM access, so the per-point cost of an import
+can be profiled on synthetic files without a database. A point is the tuple
+(vehicle id, timestamp, latitude, longitude, odometer, speed), timestamps
+being naive UTC.
+"""
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+# Accepted spellings of each column in device exports
+POINT_KEYS = {
+    'vehicle': ('vehicle', 'plate', 'license_plate', 'vin', 'vehicle_id'),
+    'timestamp': ('timestamp', 'time', 'ts', 'datetime'),
+    'latitude': ('lat', 'latitude'),
+    'longitude': ('lon', 'lng', 'longitude'),
+    'odometer': ('odometer', 'odometer_km', 'odo'),
+    'speed': ('speed', 'speed_kmh'),
+}
+
+
+def iter_records(text_stream, name):
+    """Yield one dict per point, reading the stream line by line.
+
+    An NDJSON line that is not valid JSON, or not a JSON object, yields an
+    empty dict: parse_point rejects it, so it is counted as a skipped row
+    instead of aborting the import.
+    """
+    if '.csv' in name.lower():
+        yield from csv.DictReader(text_stream)
+        return
+    for line in text_stream:
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield record if isinstance(record, dict) else {}
+
+
+def parse_timestamp(value):
+    """Naive UTC datetime from epoch seconds or an ISO 8601 string"""
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.replace('.', '', 1).isdigit()):
+        return datetime.fromtimestamp(float(value), timezone.utc).replace(tzinfo=None)
+    parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_point(record, vehicle_keys):
+    """Point of a record, or None for an unusable row; vehicle_keys maps upper-cased plates/VINs to ids"""
+    values = {}
+    for key, aliases in POINT_KEYS.items():
+        values[key] = next((record[alias] for alias in aliases if record.get(alias) not in (None, '')), None)
+    vehicle_id = vehicle_keys.get(str(values['vehicle']).strip().upper()) if values['vehicle'] is not None else None
+    if not vehicle_id or values['timestamp'] is None:
+        return None
+    try:
+        return (
+            vehicle_id,
+            parse_timestamp(values['timestamp']),
+            *(float(values[key]) if values[key] is not None else None
+              for key in ('latitude', 'longitude', 'odometer', 'speed')),
+        )
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def copy_buffer(points):
+    """CSV text stream of points, in the column order of the COPY statement"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(points)
+    buffer.seek(0)
+    return buffer
@@ -1,6 +1,175 @@
-from odoo import models, fields
+from odoo import models, fields, api, tools
+
+
+# Name fragments service types were picked by before mappings existed, per
+# booking type; still used when a booking type has no mapping.
+BOOKING_TYPE_NAME_HINTS = {
+    'with_driver': ('transfer', 'with driver'),
+    'rental': ('rental', 'without driver'),
+}
+
 
 class TypeOfService(models.Model):
     _name = 'type.of.service'
 
-    name = fields.Char(string='Type of Service', required=True, translate=True)
\ No newline at end of file
+    name = fields.Char(string='Type of Service', required=True, translate=True)
+    mapping_ids = fields.One2many(
+        'type.of.service.mapping', 'service_type_id',
+        string='Default For',
+        help="Products, product categories and booking types that default to this service type."
+    )
+
+    @api.model
+    @tools.ormcache()
+    def _get_service_type_map(self):
+        """All mappings and service type names in two queries.
+
+        {('product'|'category'|'booking_type', key): service type id,
+         ('names', None): ((service type id, (lowercase names...)), ...) by id,
+         ('configured', None): whether any mapping exists}
+        """
+        self.env.cr.execute("""
+            SELECT m.product_id, m.product_category_id, m.booking_type, m.service_type_id
+              FROM type_of_service_mapping m
+              JOIN type_of_service s ON s.id = m.service_type_id
+          ORDER BY m.sequence DESC, m.id DESC
+        """)
+        rows = self.env.cr.fetchall()
+        mapping = {('configured', None): bool(rows)}
+        # Reverse order so the lowest sequence wins when keys collide
+        for product_id, category_id, booking_type, service_type_id in rows:
+            if product_id:
+                mapping[('product', product_id)] = service_type_id
+            if category_id:
+                mapping[('category', category_id)] = service_type_id
+            if booking_type:
+                mapping[('booking_type', booking_type)] = service_type_id
+        # Every translation of the name, for the name heuristics
+        self.env.cr.execute("SELECT id, name FROM type_of_service ORDER BY id")
+        mapping[('names', None)] = tuple(
+            (service_type_id, tuple(value.lower() for value in (names or {}).values() if value))
+            for service_type_id, names in self.env.cr.fetchall()
+        )
+        return mapping
+
+    @api.model
+    def _match_service_type_name(self, mapping, fragments):
+        """First service type whose name contains one of fragments (case-insensitive)"""
+        fragments = [fragment.lower() for fragment in fragments if fragment]
+        for service_type_id, names in mapping[('names', None)]:
+            if any(fragment in name for fragment in fragments for name in names):
+                return service_type_id
+        return False
+
+    @api.model
+    def _resolve_service_type_id(self, product=None, booking_type=None):
+        """Most specific service type: mapped product, then its mapped
+        categories (closest first), then mapped booking type; failing those
+        the service type named after the product or the booking type. The
+        first service type is only used while no mapping exists at all."""
+        mapping = self._get_service_type_map()
+        if product:
+            if ('product', product.id) in mapping:
+                return mapping[('product', product.id)]
+            category = product.categ_id
+            if category:
+                for category_id in reversed([int(cid) for cid in category.parent_path.split('/') if cid]):
+                    if ('category', category_id) in mapping:
+                        return mapping[('category', category_id)]
+        if booking_type and ('booking_type', booking_type) in mapping:
+            return mapping[('booking_type', booking_type)]
+        service_type_id = (
+            (product and self._match_service_type_name(mapping, [product.name]))
+            or self._match_service_type_name(mapping, BOOKING_TYPE_NAME_HINTS.get(booking_type, ()))
+        )
+        if service_type_id:
+            return service_type_id
+        if not mapping[('configured', None)] and mapping[('names', None)]:
+            return mapping[('names', None)][0][0]
+        return False
+
+    @api.model
+    def resolve_for_lines(self, lines):
+        """{line id: service type id} for lines without a service type, using the cached map"""
+        lines.product_id.categ_id.mapped('parent_path')
+        return {
+            line.id: self._resolve_service_type_id(line.product_id, line.car_booking_id.booking_type)
+            for line in lines
+            if not line.type_of_service_id
+        }
+
+    @api.model
+    def _seed_mappings(self):
+        """Turn the name heuristics into editable mappings, once.
+
+        Runs on install and upgrade; does nothing as soon as any mapping
+        exists. Booking types get the service type their name hints match,
+        products already used on booking lines the service type named after
+        them.
+        """
+        Mapping = self.env['type.of.service.mapping']
+        if Mapping.search_count([], limit=1):
+            return False
+        mapping = self._get_service_type_map()
+        vals_list = []
+        for booking_type, fragments in BOOKING_TYPE_NAME_HINTS.items():
+            service_type_id = self._match_service_type_name(mapping, fragments)
+            if service_type_id:
+                vals_list.append({'service_type_id': service_type_id, 'booking_type': booking_type})
+        self.env.cr.execute("SELECT DISTINCT product_id FROM car_booking_line WHERE product_id IS NOT NULL")
+        products = self.env['product.product'].browse([row[0] for row in self.env.cr.fetchall()])
+        for product in products.exists():
+            service_type_id = self._match_service_type_name(mapping, [product.name])
+            if service_type_id:
+                vals_list.append({'service_type_id': service_type_id, 'product_id': product.id})
+        Mapping.create(vals_list)
+        return True
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if 'name' in vals:
+            self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
+
+
+class TypeOfServiceMapping(models.Model):
+    _name = 'type.of.service.mapping'
+    _description = 'Default Service Type Mapping'
+    _order = 'sequence, id'
+
+    sequence = fields.Integer(string='Sequence', default=10)
+    service_type_id = fields.Many2one(
+        'type.of.service', string='Type of Service', required=True, ondelete='cascade', index=True)
+    product_id = fields.Many2one('product.product', string='Product', index=True)
+    product_category_id = fields.Many2one('product.category', string='Product Category', index=True)
+    booking_type = fields.Selection([
+        ('with_driver', 'Car with Driver(Limousine)'),
+        ('rental', 'Rental')
+    ], string='Type of Booking')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
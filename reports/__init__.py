@@ -0,0 +1 @@
+from . import car_booking_report
@@ -0,0 +1,59 @@
+"""QR codes for printed documents, cached per worker as ready-to-use data URIs.
+
+Reports ask for all the codes of a batch at once: cache hits are returned
+directly and misses are drawn in a small thread pool (reportlab, no ORM
+access) before being cached under (value, size).
+"""
+import base64
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from reportlab.graphics.barcode import createBarcodeDrawing
+
+from odoo.addons.aw_car_booking.models.lru_cache import TTLCache
+
+_logger = logging.getLogger(__name__)
+
+QR_CACHE_SIZE = 4096
+QR_CACHE_TTL = 24 * 3600
+QR_WORKERS = 4
+
+_qr_cache = TTLCache(maxsize=QR_CACHE_SIZE, ttl=QR_CACHE_TTL)
+
+
+def render_qr(value, size):
+    """PNG data URI of a QR code for value, size pixels wide and high"""
+    drawing = createBarcodeDrawing('QR', value=value, width=size, height=size, barBorder=0)
+    return 'data:image/png;base64,' + base64.b64encode(drawing.asString('png')).decode()
+
+
+def get_qr_data_uris(values, size=100):
+    """{value: data URI or None} for every value, drawing only the cache misses"""
+    result = {}
+    missing = []
+    for value in set(filter(None, values)):
+        uri = _qr_cache.get((value, size))
+        if uri is None:
+            missing.append(value)
+        else:
+            result[value] = uri
+    if not missing:
+        return result
+
+    def draw(value):
+        try:
+            return render_qr(value, size)
+        except Exception:
+            _logger.warning("Could not draw QR code for %r", value, exc_info=True)
+            return None
+
+    if len(missing) == 1:
+        uris = [draw(missing[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(QR_WORKERS, len(missing))) as executor:
+            uris = list(executor.map(draw, missing))
+    for value, uri in zip(missing, uris):
+        result[value] = uri
+        if uri:
+            _qr_cache.set((value, size), uri)
+    return result
@@ -0,0 +1,4 @@
+from . import test_driver_sync
+from . import test_flight_status
+from . import test_geo_location
+from . import test_invoice_pdf_cache
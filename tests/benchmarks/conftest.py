@@ -0,0 +1,29 @@
+"""Benchmarks of the plain-Python kernels, run with pytest and pytest-benchmark.
+
+The kernels live in the addon's models package, whose __init__ imports
+odoo; they are loaded here straight from their file so no Odoo install is
+needed:
+
+    python -m pytest tests/benchmarks
+"""
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+MODELS_DIR = Path(__file__).resolve().parents[2] / 'models'
+
+
+@pytest.fixture(scope='session')
+def load_kernel():
+    """Import models/<name>.py on its own and return the module"""
+    loaded = {}
+
+    def load(name):
+        if name not in loaded:
+            spec = importlib.util.spec_from_file_location(f'aw_car_booking_{name}', MODELS_DIR / f'{name}.py')
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            loaded[name] = module
+        return loaded[name]
+    return load
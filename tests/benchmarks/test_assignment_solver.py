@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+LINES = 2000
+VEHICLES = 400
+CAR_MODELS = 20
+PLACES = ['Airport', 'Hotel Hilton', 'Hotel Marriott', 'Downtown', 'Business Park', 'Harbour']
+
+
+@pytest.fixture(scope='module')
+def solver(load_kernel):
+    return load_kernel('assignment_solver')
+
+
+@pytest.fixture(scope='module')
+def day_of_lines():
+    """One busy branch day: 2,000 lines of 1 to 10 hours over 400 vehicles of 20 car models"""
+    generator = random.Random(42)
+    jobs = []
+    for job_id in range(1, LINES + 1):
+        start = generator.randrange(0, 20 * 60, 15)
+        end = start + generator.randrange(60, 10 * 60, 15)
+        jobs.append((job_id, job_id % CAR_MODELS, start, end, generator.choice(PLACES), generator.choice(PLACES)))
+    resources = [(vehicle_id, vehicle_id % CAR_MODELS) for vehicle_id in range(1, VEHICLES + 1)]
+    # A tenth of the fleet is already booked in the morning
+    busy = {vehicle_id: [(0, 4 * 60, 'Airport')] for vehicle_id in range(1, VEHICLES + 1, 10)}
+    return jobs, resources, busy
+
+
+def test_assignment_is_valid(solver, day_of_lines):
+    jobs, resources, busy = day_of_lines
+    assignment, unassigned = solver.solve(jobs, resources, busy)
+    assert len(assignment) + len(unassigned) == len(jobs)
+    groups = dict(resources)
+    by_resource = {}
+    for job_id, group, start, end, _location_from, _location_to in jobs:
+        if job_id in assignment:
+            assert groups[assignment[job_id]] == group
+            by_resource.setdefault(assignment[job_id], []).append((start, end))
+    for resource_id, intervals in by_resource.items():
+        intervals += [interval[:2] for interval in busy.get(resource_id, ())]
+        intervals.sort()
+        assert all(previous[1] <= current[0] for previous, current in zip(intervals, intervals[1:]))
+
+
+def test_assignment_is_deterministic(solver, day_of_lines):
+    jobs, resources, busy = day_of_lines
+    assert solver.solve(jobs, resources, busy) == solver.solve(list(reversed(jobs)), resources, busy)
+
+
+def test_benchmark_solve_branch_day(benchmark, solver, day_of_lines):
+    jobs, resources, busy = day_of_lines
+    assignment, _unassigned = benchmark(solver.solve, jobs, resources, busy)
+    assert assignment
@@ -0,0 +1,94 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+ROWS = 10000
+
+
+@pytest.fixture(scope='module')
+def kernel(load_kernel):
+    return load_kernel('booking_kernel')
+
+
+@pytest.fixture(scope='module')
+def lines():
+    """10,000 synthetic booking lines: (start, end, qty, unit price, extra hours, extra hour charge)"""
+    generator = random.Random(7)
+    origin = datetime(2026, 1, 1, 6)
+    rows = []
+    for _index in range(ROWS):
+        start = origin + timedelta(hours=generator.randrange(0, 24 * 365))
+        end = start + timedelta(hours=generator.randrange(1, 24 * 10))
+        rows.append((start, end, generator.randint(1, 3), generator.choice([150.0, 250.0, 400.0]),
+                     generator.choice([0, 0, 0, 1, 2]), 40.0))
+    return rows
+
+
+def test_duration_conventions(kernel):
+    start, end = datetime(2026, 10, 19, 22), datetime(2026, 10, 20, 2)
+    assert kernel.inclusive_days(start, end) == 2
+    assert kernel.exclusive_days(start, end) == 1
+    assert kernel.fractional_days(start, end) == pytest.approx(4 / 24)
+    assert kernel.elapsed_hours(start, end) == 4
+    assert kernel.inclusive_days(date(2026, 10, 20), date(2026, 10, 19)) == 1
+    assert kernel.exclusive_days(date(2026, 10, 20), date(2026, 10, 19)) == 0
+    assert kernel.inclusive_days(start, False) == 0.0
+
+
+def test_amounts_and_vat(kernel):
+    assert kernel.line_amount(2, 250.0, 3, 2, 40.0) == 1580.0
+    assert kernel.line_amount(0, 250.0, 0, 0, 40.0) == 250.0
+    assert kernel.order_line_subtotal(2, 1, 100.0, 20.0, 10) == pytest.approx(198.0)
+    assert kernel.booking_line_vat(1000.0, [15.0]) == pytest.approx(150.0)
+    assert kernel.booking_line_vat(-10.0, [15.0]) == 0.0
+
+
+def test_batch_forms_match_scalar_forms(kernel, lines):
+    durations = kernel.durations(kernel.inclusive_days, [(start, end) for start, end, *_rest in lines])
+    assert durations == [kernel.inclusive_days(start, end) for start, end, *_rest in lines]
+    rows = [(qty, price, duration, extra, charge)
+            for (_start, _end, qty, price, extra, charge), duration in zip(lines, durations)]
+    assert kernel.line_amounts(rows) == [kernel.line_amount(*row) for row in rows]
+    vat_rows = [(amount, [15.0]) for amount in kernel.line_amounts(rows)]
+    assert kernel.booking_line_vats(vat_rows) == [kernel.booking_line_vat(*row) for row in vat_rows]
+
+
+def test_benchmark_line_scalar(benchmark, kernel, lines):
+    """One line priced through the scalar functions"""
+    start, end, qty, price, extra, charge = lines[0]
+
+    def price_line():
+        amount = kernel.line_amount(qty, price, kernel.inclusive_days(start, end), extra, charge)
+        return amount + kernel.booking_line_vat(amount, [15.0])
+    assert benchmark(price_line) > 0
+
+
+def test_benchmark_lines_scalar_loop(benchmark, kernel, lines):
+    """10,000 lines priced one scalar call at a time"""
+    def price_lines():
+        totals = []
+        for start, end, qty, price, extra, charge in lines:
+            amount = kernel.line_amount(qty, price, kernel.inclusive_days(start, end), extra, charge)
+            totals.append(amount + kernel.booking_line_vat(amount, [15.0]))
+        return totals
+    assert len(benchmark(price_lines)) == ROWS
+
+
+def test_benchmark_lines_batch(benchmark, kernel, lines):
+    """10,000 lines priced through the batch forms, as the recordset computes do"""
+    def price_lines():
+        durations = kernel.durations(kernel.inclusive_days, [(start, end) for start, end, *_rest in lines])
+        amounts = kernel.line_amounts([
+            (qty, price, duration, extra, charge)
+            for (_start, _end, qty, price, extra, charge), duration in zip(lines, durations)
+        ])
+        vats = kernel.booking_line_vats([(amount, [15.0]) for amount in amounts])
+        return [amount + vat for amount, vat in zip(amounts, vats)]
+    assert len(benchmark(price_lines)) == ROWS
+
+
+def test_benchmark_order_line_subtotals(benchmark, kernel, lines):
+    rows = [(kernel.fractional_days(start, end), qty, price, extra * charge, 5.0)
+            for start, end, qty, price, extra, charge in lines]
+    assert len(benchmark(kernel.order_line_subtotals, rows)) == ROWS
@@ -0,0 +1,91 @@
+"""Nightly demand forecast fit: sparse hourly history into trend, season and sigma.
+
+The benchmark fits SERIES series over three years of hours (the default
+forecast_history_days), chunk by chunk as the cron does, and records the
+series fitted per second and the peak memory of the fit in extra_info.
+"""
+import tracemalloc
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+SERIES = 400
+HOURS = 156 * 168  # three years on whole weeks
+CHUNK = 100  # demand_forecast_kernel.DEFAULT_CHUNK_SERIES
+
+
+@pytest.fixture(scope='module')
+def kernel(load_kernel):
+    return load_kernel('demand_forecast_kernel')
+
+
+def _history(series_count, hour_count, seed=7):
+    """Sparse (series, hour, value) triples: trend plus a weekly profile plus noise, ~40% of hours busy"""
+    rng = np.random.default_rng(seed)
+    hours = np.arange(hour_count)
+    weekly = 2 + np.sin(2 * np.pi * (hours % 168) / 168) + np.sin(2 * np.pi * (hours % 24) / 24)
+    series, hour, value = [], [], []
+    for row in range(series_count):
+        start = int(rng.integers(0, hour_count // 4))
+        level = weekly[start:] + 0.0001 * hours[start:] + rng.normal(0, 0.3, hour_count - start)
+        busy = np.flatnonzero(level > 2.2) + start
+        series.append(np.full(busy.size, row))
+        hour.append(busy)
+        value.append(np.round(level[busy - start]))
+    return np.concatenate(series), np.concatenate(hour), np.concatenate(value)
+
+
+@pytest.fixture(scope='module')
+def history():
+    return _history(SERIES, HOURS)
+
+
+def test_chunked_fit_matches_the_whole_matrix(kernel):
+    series_index, hour_index, values = _history(7, 20 * 168)
+    now_index = 20 * 168 - 5
+    known = hour_index < now_index
+    series_index, hour_index, values = series_index[known], hour_index[known], values[known]
+    matrix = kernel.dense_series(series_index, hour_index, values, 7, now_index)
+    expected = kernel.fit_seasonal_trend(kernel.mask_unknown(matrix, series_index, hour_index, now_index))
+    # Shuffled triples and a chunk size that does not divide the series count
+    order = np.random.default_rng(1).permutation(series_index.size)
+    chunked = kernel.fit_in_chunks(series_index[order], hour_index[order], values[order], 7, now_index, 3)
+    for got, want in zip(chunked, expected):
+        np.testing.assert_allclose(got, want)
+
+
+def test_series_without_history_is_flat(kernel):
+    intercept, slope, season, sigma = kernel.fit_in_chunks(
+        np.array([1, 1]), np.array([0, 200]), np.array([2.0, 2.0]), 3, 336, 2)
+    assert intercept[0] == slope[0] == sigma[0] == 0
+    assert not season[0].any()
+    assert intercept.shape == (3,) and season.shape == (3, 168)
+
+
+def test_chunks_bound_the_peak_memory(kernel, history):
+    rows = history[0] < 40
+    sample = tuple(column[rows] for column in history)
+
+    def peak(chunk_size):
+        tracemalloc.start()
+        kernel.fit_in_chunks(*sample, 40, HOURS, chunk_size)
+        usage = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return usage
+
+    assert peak(10) * 2 < peak(40)
+
+
+def test_benchmark_fit_three_years(benchmark, kernel, history):
+    """Fit SERIES series over HOURS hours, CHUNK series at a time"""
+    intercept, slope, season, sigma = benchmark.pedantic(
+        kernel.fit_in_chunks, args=(*history, SERIES, HOURS, CHUNK), rounds=3)
+    assert intercept.shape == (SERIES,) and season.shape == (SERIES, 168)
+    assert np.isfinite(sigma).all()
+    if benchmark.stats:  # None under --benchmark-disable
+        benchmark.extra_info['series_per_second'] = round(SERIES / benchmark.stats.stats.mean)
+        tracemalloc.start()
+        kernel.fit_in_chunks(*history, SERIES, HOURS, CHUNK)
+        benchmark.extra_info['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20)
+        tracemalloc.stop()
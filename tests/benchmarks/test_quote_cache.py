@@ -0,0 +1,73 @@
+from datetime import date, datetime
+
+import pytest
+
+# Key of a rate card lookup as built by the quote endpoint:
+# (dbname, service type, company, date, (partner, car model, -, city, region, business type, full day type))
+RATE_KEY = ('prod', 3, 1, date(2026, 10, 19), (42, 7, None, 5, 'central', 'corporate', None))
+
+
+@pytest.fixture(scope='module')
+def lru_cache(load_kernel):
+    return load_kernel('lru_cache')
+
+
+@pytest.fixture(scope='module')
+def kernel(load_kernel):
+    return load_kernel('booking_kernel')
+
+
+def test_least_recently_used_entry_is_evicted(lru_cache):
+    cache = lru_cache.TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+
+def test_expired_entry_is_recomputed(lru_cache):
+    cache = lru_cache.TTLCache(maxsize=8, ttl=60)
+    cache.set('card', 'old', ttl=-1)
+    assert cache.get_or_set('card', lambda: 'new') == 'new'
+    assert cache.get('card') == 'new'
+
+
+def test_benchmark_rate_cache_hit(benchmark, lru_cache):
+    """Cost of a quote whose rate card is already memoized"""
+    cache = lru_cache.TTLCache(maxsize=4096, ttl=60)
+    cache.set(RATE_KEY, (250.0, 40.0))
+    assert benchmark(cache.get, RATE_KEY, False) == (250.0, 40.0)
+
+
+def test_benchmark_rate_cache_churn(benchmark, lru_cache):
+    """Misses on a full cache: every set evicts the least recently used key"""
+    cache = lru_cache.TTLCache(maxsize=4096, ttl=60)
+    keys = [RATE_KEY[:4] + ((partner_id,) + RATE_KEY[4][1:],) for partner_id in range(8192)]
+
+    def churn():
+        for key in keys:
+            if cache.get(key, False) is False:
+                cache.set(key, (250.0, 40.0))
+    benchmark(churn)
+    assert len(cache) == 4096
+
+
+def test_benchmark_quote_pricing(benchmark, lru_cache, kernel):
+    """Everything the endpoint computes in Python for a quote, with warm caches"""
+    rate_cache = lru_cache.TTLCache(maxsize=4096, ttl=60)
+    tax_cache = lru_cache.TTLCache(maxsize=256, ttl=300)
+    rate_cache.set(RATE_KEY, (250.0, 40.0))
+    tax_cache.set(('prod', 1, ()), [(1, 'percent', 15.0)])
+    start, end = datetime(2026, 10, 19, 8), datetime(2026, 10, 21, 18)
+
+    def quote():
+        unit_price, extra_hour_charges = rate_cache.get(RATE_KEY)
+        duration = kernel.inclusive_days(start, end)
+        amount = kernel.line_amount(2, unit_price, duration, 3, extra_hour_charges)
+        taxes = tax_cache.get(('prod', 1, ()))
+        vat = kernel.booking_line_vat(amount, [percent for _id, amount_type, percent in taxes if amount_type == 'percent'])
+        return amount + vat
+    assert benchmark(quote) == pytest.approx((2 * 250.0 * 3 + 3 * 40.0) * 1.15)
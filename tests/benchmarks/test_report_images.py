@@ -0,0 +1,82 @@
+"""Embedded header/footer image cost: the uploaded original against the
+report-resolution copy stored in report_header_image/report_footer_image.
+
+The copies are made the way Odoo's Image fields resize (thumbnail with
+Lanczos to max_width x max_height, same format). What each printed page
+pays for is the data URI built by image_data_uri() plus the decode of that
+image by the PDF renderer.
+"""
+import base64
+import io
+import random
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+# Bounds of the stored report copies (models/res_company.py)
+HEADER_MAX = (1200, 400)
+FOOTER_MAX = (1200, 120)
+PAGES = 50
+
+
+def _upload(width, height, seed):
+    """A scanned-letterhead-like PNG: smooth gradient with light noise"""
+    rng = random.Random(seed)
+    image = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    noise = Image.frombytes('L', (width, height), rng.randbytes(width * height))
+    image = Image.merge('RGB', [Image.blend(band, noise, 0.1) for band in image.split()])
+    output = io.BytesIO()
+    image.save(output, format='PNG')
+    return output.getvalue()
+
+
+def _report_copy(data, max_size):
+    image = Image.open(io.BytesIO(data))
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, format=Image.open(io.BytesIO(data)).format)
+    return output.getvalue()
+
+
+def _image_data_uri(data):
+    return f"data:image/png;base64,{base64.b64encode(data).decode()}"
+
+
+@pytest.fixture(scope='module')
+def images():
+    header, footer = _upload(3508, 1000, 1), _upload(3508, 300, 2)
+    return {
+        'original': (header, footer),
+        'report': (_report_copy(header, HEADER_MAX), _report_copy(footer, FOOTER_MAX)),
+    }
+
+
+def test_report_copies_are_bounded_and_smaller(images):
+    for data, original, max_size in zip(images['report'], images['original'], (HEADER_MAX, FOOTER_MAX)):
+        width, height = Image.open(io.BytesIO(data)).size
+        assert width <= max_size[0] and height <= max_size[1]
+        assert len(data) < len(original)
+
+
+@pytest.mark.parametrize('variant', ['original', 'report'])
+def test_benchmark_embedded_bytes_per_print(benchmark, images, variant):
+    """Data URIs of the header and footer for every page of a print run"""
+    header, footer = images[variant]
+
+    def embed():
+        return sum(len(_image_data_uri(header)) + len(_image_data_uri(footer)) for _page in range(PAGES))
+
+    benchmark.extra_info['html_bytes'] = benchmark(embed)
+
+
+@pytest.mark.parametrize('variant', ['original', 'report'])
+def test_benchmark_decode_per_page(benchmark, images, variant):
+    """Decoding the header and footer once, as the renderer does on each page"""
+    header, footer = images[variant]
+
+    def decode():
+        for data in (header, footer):
+            Image.open(io.BytesIO(data)).load()
+
+    benchmark(decode)
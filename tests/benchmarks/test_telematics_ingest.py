@@ -0,0 +1,110 @@
+"""Python side of a telematics import: parsing device rows into COPY batches.
+
+The target load is 10M points a day (about 2000 vehicles reporting every 17
+seconds). The benchmarks parse a 100k-point sample file, and record the
+throughput and the extrapolated time for a day's volume in extra_info. The
+COPY itself and the usage query run in PostgreSQL and are not covered.
+"""
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+DAILY_POINTS = 10_000_000
+SAMPLE_POINTS = 100_000
+VEHICLES = 2000
+BATCH_SIZE = 20000  # telematics.DEFAULT_BATCH_SIZE
+
+
+@pytest.fixture(scope='module')
+def kernel(load_kernel):
+    return load_kernel('telematics_kernel')
+
+
+@pytest.fixture(scope='module')
+def vehicle_keys():
+    return {f'ABC {number:04d}': number + 1 for number in range(VEHICLES)}
+
+
+def _sample_records(count):
+    start = datetime(2026, 10, 19)
+    for index in range(count):
+        vehicle = index % VEHICLES
+        yield {
+            'plate': f'abc {vehicle:04d}',
+            'timestamp': (start + timedelta(seconds=17 * (index // VEHICLES))).isoformat() + 'Z',
+            'lat': f'{24.7 + vehicle * 1e-4:.6f}',
+            'lon': f'{46.6 + index * 1e-7:.6f}',
+            'odometer': f'{10000 + index * 0.01:.2f}',
+            'speed': '42.5',
+        }
+
+
+@pytest.fixture(scope='module')
+def sample_csv():
+    lines = ['plate,timestamp,lat,lon,odometer,speed']
+    lines += [','.join(record.values()) for record in _sample_records(SAMPLE_POINTS)]
+    return '\n'.join(lines) + '\n'
+
+
+@pytest.fixture(scope='module')
+def sample_ndjson():
+    return ''.join(json.dumps(record) + '\n' for record in _sample_records(SAMPLE_POINTS))
+
+
+def _ingest(kernel, text, name, vehicle_keys):
+    """Same loop as ingest_stream, without the database: returns (points, skipped)"""
+    batch, points, skipped = [], 0, 0
+    for record in kernel.iter_records(io.StringIO(text), name):
+        point = kernel.parse_point(record, vehicle_keys)
+        if point is None:
+            skipped += 1
+            continue
+        batch.append(point)
+        if len(batch) >= BATCH_SIZE:
+            kernel.copy_buffer(batch)
+            points += len(batch)
+            batch = []
+    if batch:
+        kernel.copy_buffer(batch)
+        points += len(batch)
+    return points, skipped
+
+
+def test_parse_point_aliases_and_timestamps(kernel, vehicle_keys):
+    iso = kernel.parse_point({'license_plate': ' abc 0001 ', 'time': '2026-10-19T03:00:00+03:00',
+                              'latitude': '24.7', 'lng': 46.6}, vehicle_keys)
+    epoch = kernel.parse_point({'vehicle_id': 'ABC 0001', 'ts': 1792368000, 'odo': '12.5'}, vehicle_keys)
+    assert iso == (2, datetime(2026, 10, 19), 24.7, 46.6, None, None)
+    assert epoch == (2, datetime(2026, 10, 19), None, None, 12.5, None)
+
+
+def test_unusable_rows_are_skipped(kernel, vehicle_keys):
+    assert kernel.parse_point({'plate': 'UNKNOWN', 'timestamp': '2026-10-19T00:00:00'}, vehicle_keys) is None
+    assert kernel.parse_point({'plate': 'ABC 0001'}, vehicle_keys) is None
+    assert kernel.parse_point({'plate': 'ABC 0001', 'timestamp': '2026-10-19T00:00:00', 'lat': 'n/a'}, vehicle_keys) is None
+
+
+def test_malformed_ndjson_lines_are_skipped(kernel, vehicle_keys):
+    good = json.dumps({'plate': 'ABC 0001', 'timestamp': '2026-10-19T00:00:00Z'})
+    text = '\n'.join([good, '{"plate": "ABC 0001", "timestamp"', '[1, 2]', '"text"', 'null',
+                      json.dumps({'plate': 'ABC 0001', 'timestamp': ['2026-10-19']}), good]) + '\n'
+    assert _ingest(kernel, text, 'points.ndjson', vehicle_keys) == (2, 5)
+
+
+def test_copy_buffer_matches_copy_columns(kernel):
+    buffer = kernel.copy_buffer([(2, datetime(2026, 10, 19, 1, 2, 3), 24.7, 46.6, None, 42.5)])
+    assert buffer.read() == '2,2026-10-19 01:02:03,24.7,46.6,,42.5\r\n'
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'ndjson'])
+def test_benchmark_ingest_sample(benchmark, kernel, vehicle_keys, sample_csv, sample_ndjson, fmt):
+    """Parse and batch SAMPLE_POINTS points, extrapolated to a day of DAILY_POINTS"""
+    text = sample_csv if fmt == 'csv' else sample_ndjson
+    points, skipped = benchmark.pedantic(_ingest, args=(kernel, text, f'sample.{fmt}', vehicle_keys), rounds=3)
+    assert (points, skipped) == (SAMPLE_POINTS, 0)
+    if benchmark.stats:  # None under --benchmark-disable
+        points_per_second = SAMPLE_POINTS / benchmark.stats.stats.mean
+        benchmark.extra_info['points_per_second'] = round(points_per_second)
+        benchmark.extra_info['seconds_per_day_of_points'] = round(DAILY_POINTS / points_per_second)
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestDriverSync(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.driver_user = new_test_user(cls.env, login='sync_driver', groups='base.group_user')
+        start = fields.Datetime.now().replace(microsecond=0) + timedelta(hours=2)
+        booking = cls.env['car.booking'].create({
+            'customer_name': cls.env['res.partner'].create({'name': 'Sync Customer'}).id,
+            'date_of_service': start.date(),
+        })
+        cls.line = cls.env['car.booking.line'].create({
+            'car_booking_id': booking.id,
+            'driver_name': cls.driver_user.partner_id.id,
+            'start_date': start,
+            'end_date': start + timedelta(hours=3),
+        })
+        cls.Line = cls.env['car.booking.line'].with_user(cls.driver_user)
+
+    def _synced_version(self):
+        sync = self.Line.get_driver_sync()
+        row = next(row for row in sync['rows'] if row[0] == self.line.id)
+        return row[sync['columns'].index('version')]
+
+    def test_version_moves_on_every_change(self):
+        version = self._synced_version()
+        self.line.write({'extra_hour': 1})
+        self.assertEqual(self._synced_version(), version + 1)
+
+    def test_stale_version_conflicts_within_the_same_second(self):
+        version = self._synced_version()
+        first = self.Line.apply_driver_updates([{'line_id': self.line.id, 'version': version, 'status': 'departed'}])
+        applied = first['results'][0]
+        self.assertEqual(applied['result'], 'applied')
+        self.assertEqual(applied['version'], self._synced_version())
+        # Same transaction, same write_date: only the counter tells the edits apart
+        second = self.Line.apply_driver_updates([{'line_id': self.line.id, 'version': version, 'extra_hour': 2}])
+        conflict = second['results'][0]
+        self.assertEqual(conflict['result'], 'conflict')
+        self.assertEqual(conflict['row'][second['columns'].index('driver_status')], 'departed')
+        self.assertEqual(self.line.extra_hour, 0)
+        retry = self.Line.apply_driver_updates([{'line_id': self.line.id, 'version': applied['version'], 'extra_hour': 2}])
+        self.assertEqual(retry['results'][0]['result'], 'applied')
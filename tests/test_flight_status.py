@@ -0,0 +1,126 @@
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+class FlightStatusStub(BaseHTTPRequestHandler):
+    """Answers like the http_json provider, from the class-level flights dict"""
+
+    flights = {}
+    requests = []
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.requests.append(payload)
+        body = json.dumps({'flights': [
+            dict(self.flights[number], flight_number=number)
+            for number in payload['flights'] if number in self.flights
+        ]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@tagged('post_install', '-at_install')
+class TestFlightStatus(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), FlightStatusStub)
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.addClassCleanup(cls.server_thread.join)
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+        params = cls.env['ir.config_parameter'].sudo()
+        params.set_param('aw_car_booking.flight_provider', 'http_json')
+        params.set_param('aw_car_booking.flight_provider_url', f'http://127.0.0.1:{cls.server.server_port}/flights')
+        params.set_param('aw_car_booking.flight_requests_per_minute', 600)
+
+        cls.now = fields.Datetime.now().replace(microsecond=0)
+        cls.pickup = cls.now + timedelta(hours=2)
+        cls.driver = cls.env['res.partner'].create({'name': 'Stub Driver'})
+        booking = cls.env['car.booking'].create({
+            'customer_name': cls.env['res.partner'].create({'name': 'Stub Customer'}).id,
+            'is_airport': True,
+            'flight_number': 'sv 123',
+            'date_of_service': cls.pickup.date(),
+        })
+        cls.line = cls.env['car.booking.line'].create({
+            'car_booking_id': booking.id,
+            'driver_name': cls.driver.id,
+            'start_date': cls.pickup,
+            'end_date': cls.pickup + timedelta(hours=3),
+        })
+
+    def setUp(self):
+        super().setUp()
+        FlightStatusStub.requests.clear()
+
+    def _announce(self, delay_minutes):
+        FlightStatusStub.flights = {'SV 123': {
+            'status': 'delayed' if delay_minutes else 'scheduled',
+            'scheduled': fields.Datetime.to_string(self.pickup),
+            'estimated': fields.Datetime.to_string(self.pickup + timedelta(minutes=delay_minutes)),
+        }}
+
+    def _sync_log_count(self):
+        return self.env['car.booking.driver.sync.log'].search_count([('line_id', '=', self.line.id)])
+
+    def test_delay_shifts_pickup_once(self):
+        self._announce(45)
+        logged = self._sync_log_count()
+        self.env['car.flight.status']._cron_poll_flight_status()
+
+        self.assertEqual(len(FlightStatusStub.requests), 1)
+        self.assertEqual(FlightStatusStub.requests[0]['flights'], ['SV 123'])
+        self.assertEqual(self.line.start_date, self.pickup + timedelta(minutes=45))
+        self.assertEqual(self.line.end_date, self.pickup + timedelta(hours=3, minutes=45))
+        self.assertEqual(self.line.flight_delay_applied, 45)
+        self.assertGreater(self._sync_log_count(), logged, "The driver's phone is told about the new pickup time")
+
+        # The cached status is reused and the delay is not applied twice
+        self.env['car.flight.status']._cron_poll_flight_status()
+        self.assertFalse(FlightStatusStub.requests[1:])
+        self.assertEqual(self.line.start_date, self.pickup + timedelta(minutes=45))
+
+    def test_updated_delay_shifts_by_difference(self):
+        self._announce(45)
+        self.env['car.flight.status']._cron_poll_flight_status()
+        self._announce(20)
+        self.env['car.flight.status'].search([('flight_number', '=', 'SV 123')]).expires_at = self.now
+        self.env['car.flight.status']._cron_poll_flight_status()
+
+        self.assertEqual(len(FlightStatusStub.requests), 2)
+        self.assertEqual(self.line.start_date, self.pickup + timedelta(minutes=20))
+        self.assertEqual(self.line.flight_delay_applied, 20)
+
+    def test_past_pickups_are_not_polled(self):
+        self._announce(45)
+        self.line.write({'start_date': self.now - timedelta(hours=1), 'end_date': self.now + timedelta(hours=2)})
+        self.env['car.flight.status']._cron_poll_flight_status()
+
+        self.assertFalse(FlightStatusStub.requests)
+        self.assertEqual(self.line.start_date, self.now - timedelta(hours=1))
+
+    def test_iso_times_are_stored_in_utc_and_bad_records_skipped(self):
+        day = self.pickup.date()
+        self.env['car.flight.status']._store_statuses(day, {
+            'SV 124': {'status': 'delayed', 'scheduled': f'{day}T12:00:00+03:00', 'estimated': f'{day}T12:30:00Z'},
+            'SV 125': {'status': 'scheduled', 'scheduled': 'tomorrow morning'},
+        })
+        stored = self.env['car.flight.status'].search([('flight_date', '=', day), ('flight_number', 'in', ['SV 124', 'SV 125'])])
+        self.assertEqual(stored.mapped('flight_number'), ['SV 124'])
+        self.assertEqual(fields.Datetime.to_string(stored.scheduled_time), f'{day} 09:00:00')
+        self.assertEqual(fields.Datetime.to_string(stored.estimated_time), f'{day} 12:30:00')
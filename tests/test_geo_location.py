@@ -0,0 +1,98 @@
+import csv
+import os
+import tempfile
+
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.aw_car_booking.models.geocoding_providers import GazetteerGeoProvider, haversine_km
+
+AIRPORT = ('King Khalid International Airport', 24.9576, 46.6988)
+MALL = ('Riyadh Park Mall', 24.7560, 46.6290)
+
+
+@tagged('post_install', '-at_install')
+class TestGeoLocation(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The offline provider, reading a gazetteer written for the test
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8', delete=False) as gazetteer:
+            writer = csv.writer(gazetteer)
+            writer.writerow(['name', 'latitude', 'longitude'])
+            writer.writerows([AIRPORT, MALL])
+        cls.addClassCleanup(os.unlink, gazetteer.name)
+
+        params = cls.env['ir.config_parameter'].sudo()
+        params.set_param('aw_car_booking.geo_provider', 'gazetteer')
+        params.set_param('aw_car_booking.geo_provider_url', gazetteer.name)
+        params.set_param('aw_car_booking.geo_requests_per_minute', 600)
+        cls.customer = cls.env['res.partner'].create({'name': 'Geo Customer'})
+        km = haversine_km(*AIRPORT[1:], *MALL[1:]) * GazetteerGeoProvider.road_factor
+        cls.route = (km, km / GazetteerGeoProvider.average_speed_kmh * 60.0)
+
+    def _locations(self, *names):
+        return self.env['car.booking.location'].search([('name', 'in', list(names))])
+
+    def _booking(self, location_from, location_to):
+        return self.env['car.booking'].create({
+            'customer_name': self.customer.id,
+            'location_from': location_from,
+            'location_to': location_to,
+        })
+
+    def test_find_or_create_keeps_the_stored_place(self):
+        Location = self.env['car.booking.location']
+        # As if another transaction had just stored the same place
+        self.env.cr.execute("""
+            INSERT INTO car_booking_location (name, key, geocode_state) VALUES ('Riyadh Park Mall', 'riyadh park mall', 'pending')
+        """)
+        found = Location._find_or_create(['Riyadh  Park Mall!', AIRPORT[0]])
+        self.assertEqual(found['Riyadh  Park Mall!'], self._locations(MALL[0]))
+        self.assertEqual(Location._find_or_create([AIRPORT[0]]), {AIRPORT[0]: found[AIRPORT[0]]})
+        self.assertEqual(Location.search_count([('key', 'in', ['riyadh park mall', 'king khalid international airport'])]), 2)
+        self.assertEqual(set(self._locations(AIRPORT[0], MALL[0]).mapped('geocode_state')), {'pending'},
+                         "looking places up must not geocode them")
+
+    def test_form_only_looks_places_up(self):
+        draft = self.env['car.booking'].new({
+            'customer_name': self.customer.id,
+            'location_from': AIRPORT[0],
+            'location_to': MALL[0],
+        })
+        self.assertFalse(draft.location_from_id)
+        self.assertFalse(self._locations(AIRPORT[0], MALL[0]))
+        booking = self.env['car.booking'].create({
+            'customer_name': self.customer.id,
+            'location_from': AIRPORT[0],
+            'location_to': MALL[0],
+            # What the form sends for places it did not find
+            'location_from_id': False,
+            'location_to_id': False,
+        })
+        self.assertEqual(booking.location_from_id.name, AIRPORT[0])
+        self.assertEqual(booking.location_to_id.name, MALL[0])
+
+    def test_route_is_read_from_matrix_and_filled_by_cron(self):
+        booking = self._booking(AIRPORT[0], MALL[0])
+        self.assertEqual(booking.route_distance_km, 0.0)
+        places = booking.location_from_id | booking.location_to_id
+        self.assertEqual(set(places.mapped('geocode_state')), {'pending'},
+                         "saving or reading a booking must not geocode its places")
+
+        self.env['car.booking.location']._cron_geocode()
+        self.assertEqual((booking.location_from_id.latitude, booking.location_from_id.longitude), AIRPORT[1:])
+        self.assertAlmostEqual(booking.route_distance_km, self.route[0], places=2)
+        self.assertAlmostEqual(booking.route_duration_minutes, self.route[1], places=2)
+
+        # The way back reuses the stored pair
+        back = self._booking(MALL[0], AIRPORT[0])
+        self.assertAlmostEqual(back.route_distance_km, self.route[0], places=2)
+        self.assertEqual(self.env['car.booking.distance'].search_count([('from_location_id', 'in', places.ids)]), 1)
+
+    def test_places_missing_from_the_gazetteer_fail(self):
+        booking = self._booking(AIRPORT[0], 'Somewhere Unknown')
+        self.env['car.booking.location']._cron_geocode()
+        self.assertEqual(booking.location_from_id.geocode_state, 'done')
+        self.assertEqual(booking.location_to_id.geocode_state, 'failed')
+        self.assertEqual(booking.route_distance_km, 0.0)
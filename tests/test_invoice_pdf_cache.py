@@ -0,0 +1,76 @@
+import logging
+import time
+from unittest import SkipTest
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+INVOICE_REPORT = 'aw_car_booking.action_report_car_booking_invoice'
+
+
+@tagged('post_install', '-at_install')
+class TestInvoicePdfCache(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if cls.env['ir.actions.report'].get_wkhtmltopdf_state() != 'ok':
+            raise SkipTest("wkhtmltopdf is needed to time real renders")
+        customer = cls.env['res.partner'].create({'name': 'Cache Customer'})
+        booking = cls.env['car.booking'].create({'customer_name': customer.id})
+        cls.invoice = cls.env['account.move'].create({
+            'move_type': 'out_invoice',
+            'partner_id': customer.id,
+            'car_booking_id': booking.id,
+            'invoice_line_ids': [(0, 0, {'name': 'Sedan - full day', 'quantity': 1, 'price_unit': 500.0})],
+        })
+        cls.invoice.action_post()
+
+    def _print(self):
+        """Render the invoice like the print button does; returns (seconds, wkhtmltopdf runs)"""
+        report_class = type(self.env['ir.actions.report'])
+        with patch.object(report_class, '_run_wkhtmltopdf', autospec=True,
+                          side_effect=report_class._run_wkhtmltopdf) as renders:
+            started = time.perf_counter()
+            self.env['ir.actions.report'].with_context(force_report_rendering=True)._render_qweb_pdf(
+                INVOICE_REPORT, self.invoice.ids)
+            return time.perf_counter() - started, renders.call_count
+
+    def _cached_pdfs(self):
+        return self.env['ir.attachment'].search([
+            ('res_model', '=', 'account.move'),
+            ('res_id', '=', self.invoice.id),
+            ('name', '=like', 'Car_Booking_Invoice_%.pdf'),
+        ])
+
+    def test_reprint_is_served_from_cache(self):
+        first_print, first_renders = self._print()
+        reprint, reprint_renders = self._print()
+        _logger.info("Car booking invoice PDF: first print %.3fs, reprint %.3fs", first_print, reprint)
+        self.assertEqual(first_renders, 1)
+        self.assertEqual(reprint_renders, 0, "an unchanged posted invoice must not be rendered again")
+        self.assertLess(reprint, first_print)
+        self.assertEqual(len(self._cached_pdfs()), 1)
+
+    def test_new_fingerprint_replaces_cached_pdf(self):
+        self._print()
+        previous = self._cached_pdfs()
+        # Within one test transaction every write shares the same write_date: age the invoice instead
+        self.env.cr.execute("UPDATE account_move SET write_date = write_date - interval '1 hour' WHERE id = %s",
+                            (self.invoice.id,))
+        self.invoice.invalidate_recordset(['write_date'])
+        _seconds, renders = self._print()
+        self.assertEqual(renders, 1)
+        cached = self._cached_pdfs()
+        self.assertEqual(len(cached), 1, "the previous cached PDF must be removed")
+        self.assertNotEqual(cached, previous)
+
+    def test_draft_invoice_is_not_cached(self):
+        self.invoice.button_draft()
+        self.assertFalse(self._cached_pdfs())
+        self._print()
+        _seconds, renders = self._print()
+        self.assertEqual(renders, 1)
+        self.assertFalse(self._cached_pdfs())